@@ -1,48 +1,3634 @@
-import tkinter as tk
-from tkinter import ttk, filedialog, messagebox, scrolledtext
-import pandas as pd
+import time
+
+# Marco zero do relatório de tempo de inicialização
+STARTUP_STARTED = time.perf_counter()
+
+try:
+    import tkinter as tk
+    from tkinter import ttk, filedialog, messagebox, scrolledtext
+except ImportError:
+    # O modo em lote (linha de comando) funciona sem Tk
+    tk = None
 import os
 import json
+import glob
+import argparse
+import csv
+import functools
+import itertools
+import gzip
+import zlib
+import hashlib
+import importlib
+import importlib.util
+import zipfile
+import tempfile
+import uuid
 import xml.etree.ElementTree as ET
 from pathlib import Path
 import re
 import sys
+import math
+import mmap
+import multiprocessing
+import queue
+import threading
+import bisect
+import operator
+import unicodedata
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime
+from html.parser import HTMLParser
+
+
+# Bibliotecas de terceiros que precisam ser instaladas. São importadas só no
+# primeiro uso (pandas, PyPDF2/pypdf, openpyxl, tabula), para a
+# janela abrir sem pagar o custo de carregar formatos que a sessão não usa.
+@functools.lru_cache(maxsize=None)
+def load_library(*module_names):
+    """Importa o primeiro módulo disponível entre ``module_names`` (resultado em cache)"""
+    for module_name in module_names:
+        try:
+            return importlib.import_module(module_name)
+        except ImportError:
+            continue
+    raise ImportError(f"Biblioteca necessária não instalada: {' ou '.join(module_names)}")
+
+
+def library_available(module_name):
+    """Verifica se um módulo está instalado sem importá-lo"""
+    return importlib.util.find_spec(module_name) is not None
+
+
+class StartupTimer:
+    """Marcos de tempo da inicialização da janela, para acompanhar regressões.
+
+    Ativado pela variável de ambiente ``CONVERSOR_STARTUP_REPORT``: com valor
+    ``1`` o relatório só é impresso; com qualquer outro valor ele também é
+    acrescentado (uma linha JSON por execução) ao arquivo indicado.
+    """
+
+    ENV_VAR = "CONVERSOR_STARTUP_REPORT"
+
+    def __init__(self):
+        self.marks = [('modulo_importado', time.perf_counter() - STARTUP_STARTED)]
+
+    def mark(self, name):
+        self.marks.append((name, time.perf_counter() - STARTUP_STARTED))
+
+    def report_after_paint(self, root):
+        """Registra o marco 'janela_pintada' no primeiro ciclo ocioso do mainloop e emite o relatório"""
+        def painted():
+            self.mark('janela_pintada')
+            self.report()
+        # O redesenho da janela também roda como tarefa ociosa; o after_idle
+        # aninhado garante que o marco seja registrado depois dele
+        root.after_idle(lambda: root.after_idle(painted))
+
+    def report(self):
+        """Imprime e, se configurado, grava o relatório"""
+        target = os.environ.get(self.ENV_VAR)
+        if not target:
+            return
+        print("⏱️ Tempo de inicialização:", file=sys.stderr)
+        for name, seconds in self.marks:
+            print(f"   • {name}: {seconds * 1000:.0f} ms", file=sys.stderr)
+        if target != "1":
+            entry = {'data': datetime.now().isoformat(timespec='seconds'),
+                     'marcos_ms': {name: round(seconds * 1000, 1) for name, seconds in self.marks}}
+            try:
+                with open(target, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            except OSError as e:
+                print(f"Erro ao gravar relatório de inicialização: {e}", file=sys.stderr)
+
+
+CASE_FIELDS = ('historia_requisito', 'teste', 'dado', 'quando', 'entao')
+
+# Incrementar sempre que o parsing mudar, para invalidar o cache de casos
+PARSER_VERSION = 6
+
+# Elementos XML reconhecidos como casos de teste
+XML_TEST_TAGS = ('testcase', 'test', 'scenario')
+
+# Chaves que identificam um objeto JSON como caso de teste
+JSON_TEST_KEYS = ('test', 'testcase', 'scenario', 'cenario')
+
+# Cabeçalhos de tabela (normalizados) reconhecidos para cada campo do caso de teste
+TABLE_HEADER_ALIASES = {
+    'historia_requisito': ('historia', 'história', 'historia/requisito', 'história/requisito', 'requisito',
+                           'user story', 'feature', 'funcionalidade', 'story', 'requirement'),
+    'teste': ('cenário', 'cenario', 'scenario', 'teste', 'caso de teste', 'test', 'test case',
+              'descrição teste', 'descrição', 'título'),
+    'dado': ('dado', 'dado que', 'given', 'pré-condições', 'pré-condição', 'pre-condições',
+             'precondição', 'precondition', 'preconditions', 'entrada', 'contexto'),
+    'quando': ('quando', 'when', 'passos', 'passo', 'steps', 'ação', 'acao', 'action'),
+    'entao': ('então', 'entao', 'then', 'resultado esperado', 'resultado', 'expected',
+              'expected result', 'saída esperada'),
+}
+
+
+def normalize_header(text):
+    """Normaliza um cabeçalho de coluna para comparação (minúsculas, espaços simples)"""
+    return ' '.join(str(text).replace(':', ' ').split()).lower()
+
+
+def map_table_headers(headers, extra_aliases=None):
+    """Mapeia índices de coluna para campos do caso; retorna {} se não parecer tabela de testes"""
+    aliases = {}
+    for field, names in TABLE_HEADER_ALIASES.items():
+        for name in names:
+            aliases.setdefault(name, field)
+    for name, field in (extra_aliases or {}).items():
+        aliases.setdefault(normalize_header(name), field)
+    
+    mapping = {}
+    for index, header in enumerate(headers):
+        field = aliases.get(normalize_header(header))
+        if field and field not in mapping.values():
+            mapping[index] = field
+    
+    # Exige ao menos duas colunas reconhecidas, uma delas de conteúdo do teste
+    fields = set(mapping.values())
+    if len(fields) < 2 or not fields & {'teste', 'dado', 'quando', 'entao'}:
+        return {}
+    return mapping
+
+
+_TABLE_HEADER_WORDS = {
+    'cenário': 'teste', 'cenario': 'teste', 'scenario': 'teste',
+    'dado': 'dado', 'given': 'dado', 'pré-condições': 'dado',
+    'quando': 'quando', 'when': 'quando', 'passos': 'quando',
+    'então': 'entao', 'entao': 'entao', 'then': 'entao', 'resultado esperado': 'entao',
+}
+_TABLE_HEADER_RE = re.compile(r'\b(' + '|'.join(sorted(map(re.escape, _TABLE_HEADER_WORDS), key=len, reverse=True)) + r')\b')
+
+
+def table_row_lines(cells):
+    """Linhas de texto de uma linha de tabela: ``"rótulo: valor"`` com duas células preenchidas, senão uma por célula"""
+    cells = [cell for cell in cells if cell]
+    return [f"{cells[0]}: {cells[1]}"] if len(cells) == 2 else cells
+
+
+def rows_to_test_cases(rows, mapping):
+    """Gera casos a partir de linhas de tabela, usando o mapeamento {índice da coluna: campo}"""
+    for row in rows:
+        test_case = {key: '' for key in CASE_FIELDS}
+        for index, field in mapping.items():
+            if index < len(row):
+                # Quebras de linha dentro da célula viram espaços
+                test_case[field] = ' '.join(str(row[index]).split())
+        if any(test_case[field] for field in ('teste', 'dado', 'quando', 'entao')):
+            yield test_case
+
+
+def looks_like_table_page(text):
+    """Heurística barata: alguma linha curta da página cita cabeçalhos de dois campos diferentes"""
+    for line in text.lower().split('\n'):
+        if len(line.split()) > 12:
+            continue
+        fields = {_TABLE_HEADER_WORDS[match] for match in _TABLE_HEADER_RE.findall(line)}
+        if len(fields) >= 2:
+            return True
+    return False
+
+
+# Namespace do WordprocessingML (conteúdo de word/document.xml)
+WORD_NS = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+
+
+def extract_after_colon(text):
+    """Extrai texto após dois pontos, se existir"""
+    if ':' in text:
+        return text.split(':', 1)[1].strip()
+    return text.strip()
+
+
+# Palavras-chave Gherkin por idioma (estendidas/substituídas por gherkin_keywords.json).
+# As seções seguem o Gherkin; 'story' e 'test' são as palavras que o parser de
+# texto livre procura em qualquer ponto da linha para achar requisitos e cenários.
+GHERKIN_KEYWORDS = {
+    'pt': {
+        'feature': ['funcionalidade', 'característica', 'caracteristica'],
+        'background': ['contexto', 'cenário de fundo', 'cenario de fundo', 'fundo'],
+        'scenario': ['cenário', 'cenario', 'exemplo'],
+        'scenario_outline': ['esquema do cenário', 'esquema do cenario', 'delineação do cenário',
+                             'delineacao do cenario'],
+        'examples': ['exemplos', 'cenários', 'cenarios'],
+        'given': ['dado que', 'dado', 'dada', 'dados', 'dadas'],
+        'when': ['quando'],
+        'then': ['então', 'entao'],
+        'and': ['e'],
+        'but': ['mas'],
+        'story': ['historia', 'requisito'],
+        'test': ['cenário', 'teste'],
+    },
+    'en': {
+        'feature': ['feature', 'ability', 'business need'],
+        'background': ['background'],
+        'scenario': ['scenario', 'example'],
+        'scenario_outline': ['scenario outline', 'scenario template'],
+        'examples': ['examples', 'scenarios'],
+        'given': ['given'],
+        'when': ['when'],
+        'then': ['then'],
+        'and': ['and'],
+        'but': ['but'],
+        'story': ['feature'],
+        'test': ['scenario'],
+    },
+    'es': {
+        'feature': ['característica', 'necesidad del negocio', 'requisito'],
+        'background': ['antecedentes'],
+        'scenario': ['escenario', 'ejemplo'],
+        'scenario_outline': ['esquema del escenario'],
+        'examples': ['ejemplos'],
+        'given': ['dado', 'dada', 'dados', 'dadas'],
+        'when': ['cuando'],
+        'then': ['entonces'],
+        'and': ['y', 'e'],
+        'but': ['pero'],
+        'story': ['historia de usuario', 'requisito'],
+        'test': ['escenario', 'caso de prueba'],
+    },
+    'fr': {
+        'feature': ['fonctionnalité', 'besoin métier'],
+        'background': ['contexte'],
+        'scenario': ['scénario', 'exemple'],
+        'scenario_outline': ['plan du scénario', 'plan du scenario'],
+        'examples': ['exemples'],
+        'given': ['étant donné que', 'étant donné', 'etant donne', 'soit', 'sachant que'],
+        'when': ['quand', 'lorsque', "lorsqu'"],
+        'then': ['alors', 'donc'],
+        'and': ['et'],
+        'but': ['mais'],
+        'story': ['fonctionnalité', 'exigence'],
+        'test': ['scénario', 'cas de test'],
+    },
+    'de': {
+        'feature': ['funktionalität', 'funktion'],
+        'background': ['grundlage', 'hintergrund', 'voraussetzungen'],
+        'scenario': ['szenario', 'beispiel'],
+        'scenario_outline': ['szenariogrundriss', 'szenarien'],
+        'examples': ['beispiele'],
+        'given': ['angenommen', 'gegeben sei', 'gegeben seien'],
+        'when': ['wenn'],
+        'then': ['dann'],
+        'and': ['und'],
+        'but': ['aber'],
+        'story': ['funktionalität', 'anforderung'],
+        'test': ['szenario', 'testfall'],
+    },
+}
+
+# Idiomas sempre ativos no parser; o idioma detectado no documento é somado a eles
+DEFAULT_GHERKIN_LANGUAGES = ('pt', 'en')
+
+# Campo do caso de teste preenchido por cada tipo de passo
+STEP_SECTIONS = (('given', 'dado'), ('when', 'quando'), ('then', 'entao'))
+
+# Seções de cabeçalho de arquivos .feature (``Palavra: título``)
+HEADER_SECTIONS = ('feature', 'background', 'scenario_outline', 'scenario', 'examples')
+
+
+def _alternation(words):
+    """Alternativa regex das palavras, das mais longas para as mais curtas (a mais longa vence)"""
+    words = sorted(set(words), key=len, reverse=True)
+    return '|'.join(map(re.escape, words)) if words else '(?!)'
+
+
+class KeywordMatcher:
+    """Expressões de palavras-chave compiladas uma única vez para um conjunto de idiomas.
+
+    Todos os idiomas ativos entram na mesma alternativa, de modo que a
+    classificação de uma linha custa um único ``match`` qualquer que seja o
+    número de idiomas. As expressões são aplicadas à linha em minúsculas; as
+    posições valem para a linha original porque palavras-chave e separadores
+    não mudam de tamanho em ``lower()``.
+    """
+
+    def __init__(self, table):
+        def words(*sections):
+            return [word for keywords in table.values() for section in sections for word in keywords.get(section, ())]
+
+        self.languages = tuple(table)
+        self.step_fields = {}
+        for section, field in STEP_SECTIONS:
+            for word in words(section):
+                self.step_fields.setdefault(word, field)
+        self.header_sections = {}
+        for section in HEADER_SECTIONS:
+            for word in words(section):
+                self.header_sections.setdefault(word, section)
+        
+        steps = _alternation(self.step_fields)
+        step_words = [word for section, _ in STEP_SECTIONS for word in words(section)] + words('and', 'but')
+        
+        # Parser de texto livre: cenário tem prioridade sobre requisito; passos só no início da linha.
+        # ``lastgroup`` é o tipo da linha e, nos passos, ``end()`` inclui os separadores seguintes
+        self.classify = re.compile(
+            f'(?P<teste>.*?(?:{_alternation(words("test"))}))'
+            f'|(?P<historia_requisito>.*?(?:{_alternation(words("story"))}))'
+            f'|(?P<passo>{steps})[\\s:,]*',
+            re.DOTALL).match
+        self._step = re.compile(steps).match
+        self._prefix = re.compile(f'(?:{_alternation(step_words)})[\\s:,]*').match
+        # Palavra-chave de passo inteira em qualquer ponto do texto (métricas de qualidade): sem os
+        # limites de palavra, conjunções curtas ("y", "et", "e") casariam dentro de qualquer palavra
+        self.step_pattern = re.compile(f'(?<!\\w)(?:{_alternation(step_words)})(?!\\w)')
+        self._contains = self.step_pattern.search
+        # Arquivos .feature: palavras-chave ancoradas no início da linha
+        self.feature_header = re.compile(
+            f'({_alternation(self.header_sections)})\\s*:\\s*(.*)', re.DOTALL).fullmatch
+        self.feature_step = re.compile(
+            f'({_alternation(step_words + ["*"])})\\s+(.*)', re.DOTALL).fullmatch
+        # Detecção de idioma: palavra-chave inteira no início da linha (conjunções são ambíguas demais)
+        self._languages_of = {}
+        for language, keywords in table.items():
+            for section, section_words in keywords.items():
+                if section not in ('and', 'but'):
+                    for word in section_words:
+                        self._languages_of.setdefault(word, []).append(language)
+        self._leading_keyword = re.compile(
+            f"({_alternation(self._languages_of)})(?:(?<=')|(?!\\w))").match
+
+    def step_field(self, lower_text):
+        """Campo do passo que inicia o texto (em minúsculas), ou ``None``"""
+        match = self._step(lower_text)
+        return self.step_fields[match.group()] if match else None
+
+    def clean(self, text):
+        """Remove a palavra-chave de passo (e separadores) do início do texto"""
+        match = self._prefix(text.lower())
+        if match:
+            return text[match.end():].strip()
+        return text.strip()
+
+    def contains(self, text):
+        """Texto cita alguma palavra-chave de passo"""
+        return bool(text) and self._contains(text.lower()) is not None
+
+    def line_languages(self, lower_line):
+        """Idiomas cuja palavra-chave inicia a linha (em minúsculas)"""
+        match = self._leading_keyword(lower_line)
+        return self._languages_of[match.group(1)] if match else ()
+
+
+@functools.lru_cache(maxsize=32)
+def _compile_keyword_matcher(frozen_table):
+    return KeywordMatcher({language: dict(sections) for language, sections in frozen_table})
+
+
+def keyword_matcher(languages=DEFAULT_GHERKIN_LANGUAGES, keywords=None):
+    """Matcher dos idiomas informados, compilado uma vez por conjunto de idiomas e palavras"""
+    keywords = GHERKIN_KEYWORDS if keywords is None else keywords
+    frozen = tuple((language, tuple((section, tuple(words)) for section, words in sorted(keywords[language].items())))
+                   for language in languages if language in keywords)
+    return _compile_keyword_matcher(frozen)
+
+
+_LANGUAGE_COMMENT_RE = re.compile(r'#\s*language\s*:\s*([\w-]+)')
+
+
+def detect_gherkin_languages(lines, keywords=None, default=DEFAULT_GHERKIN_LANGUAGES):
+    """Idiomas do parser para um documento: os padrão mais o dominante nas linhas de amostra.
+
+    Um comentário ``# language: xx`` (convenção do Gherkin) decide; senão cada
+    linha que começa com palavra-chave (seções, passos, requisito/cenário)
+    conta um ponto para os idiomas que a têm. Empates ficam com o idioma que
+    aparece primeiro na tabela.
+    """
+    keywords = GHERKIN_KEYWORDS if keywords is None else keywords
+    matcher = keyword_matcher(tuple(keywords), keywords)
+    scores = dict.fromkeys(keywords, 0)
+    for line in lines:
+        line = line.strip().lower()
+        declared = _LANGUAGE_COMMENT_RE.match(line)
+        if declared and declared.group(1) in keywords:
+            return tuple(dict.fromkeys(default + (declared.group(1),)))
+        for language in matcher.line_languages(line):
+            scores[language] += 1
+    dominant = max(scores, key=scores.get, default=None)
+    if dominant is None or not scores[dominant]:
+        return default
+    return tuple(dict.fromkeys(default + (dominant,)))
+
+
+def clean_gherkin_keyword(text):
+    """Remove palavras-chave Gherkin e limpa espaços."""
+    return keyword_matcher().clean(text)
+
+
+def fallback_case(index, para, length=None):
+    """Monta o caso fallback do parágrafo ``index`` (``para`` pode vir truncado, com ``length`` original)"""
+    length = len(para) if length is None else length
+    return {
+        'historia_requisito': f"Requisito {index+1}",
+        'teste': f"Cenário {index+1}: {para[:80]}..." if length > 80 else para,
+        'dado': "Contexto a ser definido",
+        'quando': "Ação a ser especificada",
+        'entao': "Resultado esperado a ser determinado"
+    }
+
+
+def create_fallback_cases(content):
+    """Cria casos de teste fallback"""
+    paragraphs = [p for p in content.split('\n\n') if p.strip() and len(p.strip()) > 20]
+    return [fallback_case(i, para) for i, para in enumerate(paragraphs[:10])]
+
+
+def extract_pdf_page_range(file_path, start, stop):
+    """Extrai o texto das páginas [start, stop) de um PDF (executada nos processos do pool)"""
+    PyPDF2 = load_library('PyPDF2', 'pypdf')
+    with open(file_path, 'rb') as file:
+        pdf_reader = PyPDF2.PdfReader(file)
+        return [(pdf_reader.pages[i].extract_text() or "") + "\n" for i in range(start, stop)]
+
+
+def pdf_page_digest(page):
+    """Hash do fluxo de conteúdo de uma página de PDF (identifica a página mesmo se ela mudar de posição)"""
+    contents = page.get_contents()
+    data = contents.get_data() if contents is not None else b''
+    return hashlib.blake2b(data, digest_size=16).digest()
+
+
+class JsonCaseStream:
+    """Percorre um arquivo JSON incrementalmente, gerando casos de teste ao completá-los.
+
+    Valores de até ``MATERIALIZE_LIMIT`` caracteres são decodificados de uma vez
+    (em C, via ``raw_decode``) e analisados com ``extract_from_json_object``.
+    Listas e objetos maiores são percorridos item a item, de modo que a memória
+    fica limitada ao maior caso de teste, não ao arquivo.
+
+    Limitação: um objeto maior que o limite cuja chave de teste só aparece
+    depois de um valor grande é tratado como contêiner (os casos aninhados já
+    foram gerados) e vira caso apenas com as chaves lidas a partir daí.
+    """
+
+    READ_SIZE = 64 * 1024
+    MATERIALIZE_LIMIT = 1024 * 1024
+    _WHITESPACE = re.compile(r'[ \t\n\r]*')
+    _NUMBER_TAIL = re.compile(r'[0-9eE.+\-]*')
+
+    def __init__(self, file, converter):
+        self.file = file
+        self.converter = converter
+        self.decoder = json.JSONDecoder()
+        self.buffer = ''
+        self.pos = 0
+        self.eof = False
+        self.document = None
+        self.materialized = False
+        self.head = ''
+
+    def _fill(self):
+        """Lê mais texto, descartando o que já foi consumido; retorna False no fim do arquivo"""
+        if self.converter.progress is not None:
+            # Em segundo plano: atende ao cancelamento a cada bloco lido
+            self.converter.progress.advance()
+        chunk = self.file.read(max(self.READ_SIZE, len(self.buffer) - self.pos))
+        if not chunk:
+            self.eof = True
+            return False
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def _peek(self):
+        """Pula espaços e retorna o próximo caractere ('' no fim do arquivo)"""
+        while True:
+            self.pos = self._WHITESPACE.match(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill():
+                return ''
+
+    def _expect(self, char):
+        if self._peek() != char:
+            raise json.JSONDecodeError(f"Esperado '{char}'", self.buffer, self.pos)
+        self.pos += 1
+
+    def _decode(self, limit=None):
+        """Decodifica o próximo valor inteiro; retorna (True, valor) ou (False, None) se passar de ``limit``"""
+        self._peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+                if limit is not None and len(self.buffer) - self.pos > limit:
+                    return False, None
+                self._fill()
+                continue
+            # Um número no fim do buffer pode continuar no próximo bloco
+            if not self.eof and self._NUMBER_TAIL.fullmatch(self.buffer, end) and self._fill():
+                continue
+            self.pos = end
+            return True, value
+
+    def iter_test_cases(self):
+        """Gera os casos de teste do documento inteiro"""
+        self._peek()
+        self.head = self.buffer[self.pos:self.pos + self.READ_SIZE]
+        if self._peek() in ('[', '{'):
+            self.materialized, self.document = self._decode(self.MATERIALIZE_LIMIT)
+        if self.materialized:
+            yield from self.converter.iter_json_object_cases(self.document)
+        else:
+            yield from self._walk()
+        if self._peek():
+            raise json.JSONDecodeError("Conteúdo extra após o JSON", self.buffer, self.pos)
+
+    def fallback_text(self):
+        """Texto para os casos fallback (o documento inteiro quando coube na memória)"""
+        return str(self.document) if self.materialized else self.head
+
+    def _walk(self):
+        char = self._peek()
+        if char not in ('[', '{'):
+            if not char:
+                raise json.JSONDecodeError("Fim inesperado do JSON", self.buffer, self.pos)
+            self._decode()
+            return
+        
+        materialized, value = self._decode(self.MATERIALIZE_LIMIT)
+        if materialized:
+            yield from self.converter.iter_json_object_cases(value)
+        elif char == '[':
+            yield from self._walk_array()
+        else:
+            yield from self._walk_object()
+
+    def _walk_array(self):
+        self._expect('[')
+        if self._peek() == ']':
+            self.pos += 1
+            return
+        while True:
+            yield from self._walk()
+            char = self._peek()
+            self.pos += 1
+            if char == ']':
+                return
+            if char != ',':
+                raise json.JSONDecodeError("Esperado ',' ou ']'", self.buffer, self.pos - 1)
+
+    def _walk_object(self):
+        self._expect('{')
+        retained = {}
+        is_test_case = False
+        streamed = False
+        
+        char = self._peek()
+        while char != '}':
+            _, key = self._decode()
+            if not isinstance(key, str):
+                raise json.JSONDecodeError("Chave de objeto inválida", self.buffer, self.pos)
+            self._expect(':')
+            is_test_case = is_test_case or key.lower() in JSON_TEST_KEYS
+            
+            if is_test_case or self._peek() not in ('[', '{'):
+                retained[key] = self._decode()[1]
+            else:
+                materialized, value = self._decode(self.MATERIALIZE_LIMIT)
+                if materialized:
+                    retained[key] = value
+                else:
+                    # Valor grande: o objeto é um contêiner; libera o que foi retido
+                    streamed = True
+                    for item in retained.values():
+                        yield from self.converter.iter_json_object_cases(item)
+                    retained = {}
+                    yield from self._walk()
+            
+            if streamed and not is_test_case:
+                for item in retained.values():
+                    yield from self.converter.iter_json_object_cases(item)
+                retained = {}
+            
+            char = self._peek()
+            if char == ',':
+                self.pos += 1
+                self._peek()
+            elif char != '}':
+                raise json.JSONDecodeError("Esperado ',' ou '}'", self.buffer, self.pos)
+        self.pos += 1
+        
+        if is_test_case:
+            test_case = self.converter.create_test_case_from_json(retained)
+            if test_case:
+                yield test_case
+        else:
+            for item in retained.values():
+                yield from self.converter.iter_json_object_cases(item)
+
+
+class TestCase:
+    """Caso de teste compacto: um atributo por campo (``__slots__``), sem dicionário por instância.
+
+    Mantém a interface de dicionário usada no resto do código (``case['dado']``,
+    ``'teste' in case``, ``keys``/``values``/``items``/``get``) e ``dict(case)``.
+    """
+
+    __slots__ = CASE_FIELDS
+
+    def __init__(self, historia_requisito='', teste='', dado='', quando='', entao=''):
+        self.historia_requisito = historia_requisito
+        self.teste = teste
+        self.dado = dado
+        self.quando = quando
+        self.entao = entao
+
+    @classmethod
+    def from_mapping(cls, case):
+        """Cria o registro a partir de um dicionário (campos ausentes ficam vazios)"""
+        return cls(*[case.get(field, '') for field in CASE_FIELDS])
+
+    def __getitem__(self, field):
+        if field not in _CASE_FIELD_SET:
+            raise KeyError(field)
+        return getattr(self, field)
+
+    def __setitem__(self, field, value):
+        if field not in _CASE_FIELD_SET:
+            raise KeyError(field)
+        setattr(self, field, value)
+
+    def __contains__(self, field):
+        return field in _CASE_FIELD_SET
+
+    def __iter__(self):
+        return iter(CASE_FIELDS)
+
+    def __len__(self):
+        return len(CASE_FIELDS)
+
+    def __eq__(self, other):
+        if isinstance(other, (TestCase, dict)):
+            return dict(self.items()) == dict(other.items())
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"TestCase({dict(self.items())!r})"
+
+    def keys(self):
+        return CASE_FIELDS
+
+    def values(self):
+        return [getattr(self, field) for field in CASE_FIELDS]
+
+    def items(self):
+        return [(field, getattr(self, field)) for field in CASE_FIELDS]
+
+    def get(self, field, default=None):
+        return getattr(self, field) if field in _CASE_FIELD_SET else default
+
+    def copy(self):
+        return TestCase(*self.values())
+
+
+_CASE_FIELD_SET = frozenset(CASE_FIELDS)
+_FIELD_GETTERS = tuple(operator.attrgetter(field) for field in CASE_FIELDS)
+
+
+def split_table_row(line):
+    """Células de uma linha de tabela Gherkin (``| a | b |``); ``\\|`` é um pipe literal"""
+    line = line.strip()
+    if line.startswith('|'):
+        line = line[1:]
+    if line.endswith('|') and not line.endswith('\\|'):
+        line = line[:-1]
+    return tuple(cell.strip().replace('\\|', '|') for cell in re.split(r'(?<!\\)\|', line))
+
+
+class ScenarioOutline:
+    """Esquema do cenário: um caso modelo com ``<parâmetros>`` e as linhas de Exemplos.
+
+    Cada linha vira um ``TestCase`` concreto só quando pedida (``case``/iteração),
+    com os parâmetros substituídos em todos os campos; assim uma tabela com
+    milhares de exemplos segue para a exportação sem ser materializada.
+    """
+
+    __slots__ = ('template', 'examples', '_count')
+
+    _PLACEHOLDER_RE = re.compile(r'<([^<>]+)>')
+
+    def __init__(self, template, examples):
+        self.template = template
+        # [(cabeçalho, [linha, ...]), ...], um item por tabela de Exemplos
+        self.examples = examples
+        self._count = sum(len(rows) for _, rows in examples)
+
+    def __len__(self):
+        return self._count
+
+    def __iter__(self):
+        for header, rows in self.examples:
+            for row in rows:
+                yield self._expand(header, row)
+
+    def case(self, offset):
+        """Caso concreto da linha ``offset`` (contando todas as tabelas de Exemplos)"""
+        for header, rows in self.examples:
+            if offset < len(rows):
+                return self._expand(header, rows[offset])
+            offset -= len(rows)
+        raise IndexError(offset)
+
+    def _expand(self, header, row):
+        values = dict(zip(header, row))
+
+        def substitute(text):
+            return self._PLACEHOLDER_RE.sub(lambda match: values.get(match.group(1), match.group(0)), text)
+        
+        fields = [substitute(value) if '<' in value else value for value in self.template.values()]
+        if fields[1] == self.template.teste:
+            # Título sem parâmetros: identifica a linha de exemplo
+            fields[1] = f"{fields[1]} ({', '.join(row)})"
+        return TestCase(*fields)
+
+
+class TestCaseStore:
+    """Coleção de casos de teste compartilhada por extração, pré-visualização, qualidade e exportação.
+
+    Guarda ``TestCase`` (convertendo dicionários na entrada) e internaliza o
+    requisito, que se repete em todos os casos de uma mesma história. As etapas
+    recebem a mesma instância em vez de cópias; edições passam por
+    ``set_value``, que copia o caso antes de alterá-lo (os casos extraídos
+    continuam intactos e podem ser reaproveitados pela reanálise incremental)
+    e guarda os valores originais para ``carry_edits``.
+
+    Esquemas do cenário (``ScenarioOutline``) ficam guardados compactos e contam
+    como um caso por linha de Exemplos: o índice global é localizado com somas
+    prefixadas (busca binária) e o caso é expandido na hora. Uma linha editada
+    vira um ``TestCase`` próprio, guardado à parte.
+    """
+
+    def __init__(self, cases=()):
+        self._entries = []
+        # Índice global seguinte ao último caso de cada entrada (somas prefixadas)
+        self._ends = []
+        self._has_outlines = False
+        self._overrides = {}
+        # Índice -> valores extraídos originais dos casos editados
+        self._originals = {}
+        self._requirements = {}
+        # Chamados com (valores antigos, valores novos) a cada inclusão ou edição
+        self._listeners = []
+        # Incrementada a cada inclusão, edição ou limpeza (detecta cópias derivadas desatualizadas)
+        self.version = 0
+        self.extend(cases)
+
+    def add_listener(self, listener):
+        """Registra ``listener(old, new)``: tuplas de valores na ordem de ``CASE_FIELDS``.
+
+        ``old`` é None quando o caso é incluído; ``clear`` chama ``listener(None, None)``.
+        """
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener):
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def _notify(self, old, new):
+        for listener in self._listeners:
+            listener(old, new)
+
+    def _intern(self, value):
+        return self._requirements.setdefault(value, value) if isinstance(value, str) else value
+
+    def append(self, case):
+        if isinstance(case, ScenarioOutline):
+            case.template.historia_requisito = self._intern(case.template.historia_requisito)
+            if not len(case):
+                case = case.template
+            else:
+                self._has_outlines = True
+        elif not isinstance(case, TestCase):
+            case = TestCase.from_mapping(case)
+        if isinstance(case, TestCase):
+            case.historia_requisito = self._intern(case.historia_requisito)
+        self._entries.append(case)
+        self._ends.append(len(self) + (len(case) if isinstance(case, ScenarioOutline) else 1))
+        self.version += 1
+        if self._listeners:
+            for added in (case if isinstance(case, ScenarioOutline) else (case,)):
+                self._notify(None, tuple(added.values()))
+
+    def extend(self, cases):
+        for case in cases:
+            self.append(case)
+
+    def entries(self):
+        """Entradas como guardadas: ``TestCase`` ou ``ScenarioOutline`` não expandido"""
+        return iter(self._entries)
+
+    def _locate(self, index):
+        """(entrada, deslocamento dentro dela) do caso de índice global ``index``"""
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        if not self._has_outlines:
+            return index, 0
+        position = bisect.bisect_right(self._ends, index)
+        start = self._ends[position - 1] if position else 0
+        return position, index - start
+
+    def _editable(self, index):
+        """Caso do índice pronto para edição (cópia própria, com os valores originais guardados)"""
+        position, offset = self._locate(index)
+        entry = self._entries[position]
+        outline = isinstance(entry, ScenarioOutline)
+        if index in self._originals:
+            return self._overrides[index] if outline else entry
+        
+        original = entry.case(offset) if outline else entry
+        self._originals[index] = tuple(original.values())
+        case = original.copy()
+        if outline:
+            self._overrides[index] = case
+        else:
+            self._entries[position] = case
+        return case
+
+    def set_value(self, index, field, value):
+        """Altera um campo de um caso"""
+        if field == 'historia_requisito':
+            value = self._intern(value)
+        if index < 0:
+            index += len(self)
+        case = self._editable(index)
+        old = tuple(case.values()) if self._listeners else None
+        case[field] = value
+        self.version += 1
+        if self._listeners:
+            self._notify(old, tuple(case.values()))
+
+    def edits(self):
+        """Pares (valores originais, caso editado) das edições manuais"""
+        return [(original, self[index]) for index, original in self._originals.items()]
+
+    def carry_edits(self, previous):
+        """Reaplica as edições de ``previous`` nos casos cujo conteúdo extraído não mudou.
+
+        Retorna quantas edições foram mantidas.
+        """
+        pending = {}
+        for original, edited in previous.edits():
+            pending.setdefault(original, []).append(edited)
+        if not pending:
+            return 0
+        
+        matches = []
+        for index, case in enumerate(self):
+            edited = pending.get(tuple(case.values()))
+            if edited:
+                matches.append((index, edited.pop(0)))
+        for index, edited in matches:
+            case = self._editable(index)
+            old = tuple(case.values())
+            for field in CASE_FIELDS:
+                case[field] = edited[field]
+            self.version += 1
+            self._notify(old, tuple(case.values()))
+        return len(matches)
+
+    def snapshot(self):
+        """Cópia para leitura em outra thread: edições posteriores neste store não a alteram.
+
+        Casos não editados são compartilhados (uma edição sempre troca o caso por
+        uma cópia); só os já editados, alterados no lugar, são copiados.
+        """
+        copy = TestCaseStore()
+        copy._entries = list(self._entries)
+        copy._ends = list(self._ends)
+        copy._has_outlines = self._has_outlines
+        copy._overrides = {index: case.copy() for index, case in self._overrides.items()}
+        copy._originals = dict(self._originals)
+        copy._requirements = self._requirements
+        copy.version = self.version
+        if not self._has_outlines:
+            for index in self._originals:
+                copy._entries[index] = copy._entries[index].copy()
+        else:
+            for index in self._originals:
+                position, _ = self._locate(index)
+                if not isinstance(copy._entries[position], ScenarioOutline):
+                    copy._entries[position] = copy._entries[position].copy()
+        return copy
+
+    def clear(self):
+        self._entries = []
+        self._ends = []
+        self._has_outlines = False
+        self._overrides = {}
+        self._originals = {}
+        self._requirements = {}
+        self.version += 1
+        self._notify(None, None)
+
+    def rows(self):
+        """Valores dos casos como listas, na ordem de ``CASE_FIELDS``"""
+        for case in self:
+            yield case.values()
+
+    def columns(self):
+        """Uma tupla de valores por campo, na ordem de ``CASE_FIELDS`` (leitura colunar)"""
+        cases = self._entries if not self._has_outlines else list(self)
+        return tuple(list(map(getter, cases)) for getter in _FIELD_GETTERS)
+
+    def __len__(self):
+        return self._ends[-1] if self._ends else 0
+
+    def __iter__(self):
+        if not self._has_outlines:
+            yield from self._entries
+            return
+        index = 0
+        for entry in self._entries:
+            if isinstance(entry, ScenarioOutline):
+                for case in entry:
+                    yield self._overrides.get(index, case)
+                    index += 1
+            else:
+                yield entry
+                index += 1
+
+    def __getitem__(self, index):
+        position, offset = self._locate(index)
+        entry = self._entries[position]
+        if isinstance(entry, ScenarioOutline):
+            if index < 0:
+                index += len(self)
+            return self._overrides.get(index) or entry.case(offset)
+        return entry
+
+
+class FallbackCollector:
+    """Coleta, linha a linha, os parágrafos usados por ``create_fallback_cases``.
+
+    Reproduz ``content.split('\\n\\n')`` sem guardar o texto: de cada parágrafo
+    mantém apenas os primeiros caracteres, o tamanho e as posições do primeiro e
+    do último caractere não-branco (o suficiente para o filtro ``strip()``).
+    """
+
+    LIMIT = 10
+    HEAD_SIZE = 81
+
+    def __init__(self):
+        self.paragraphs = []
+        self._boundary_pending = False
+        self._reset()
+
+    def _reset(self):
+        self._lines = 0
+        self._head = ''
+        self._length = 0
+        self._first = None
+        self._last = None
+
+    @property
+    def full(self):
+        return len(self.paragraphs) >= self.LIMIT
+
+    def add_line(self, line):
+        if self._boundary_pending:
+            # A linha vazia anterior era um separador "\n\n": fecha o parágrafo
+            self._boundary_pending = False
+            self._finish()
+        elif line == '' and self._lines:
+            self._boundary_pending = True
+            return
+
+        if self._lines:
+            self._append('\n')
+        self._lines += 1
+        self._append(line)
+
+    def _append(self, text):
+        if text.strip():
+            if self._first is None:
+                self._first = self._length + len(text) - len(text.lstrip())
+            self._last = self._length + len(text.rstrip())
+        if len(self._head) < self.HEAD_SIZE:
+            self._head += text[:self.HEAD_SIZE - len(self._head)]
+        self._length += len(text)
+
+    def _finish(self):
+        stripped = (self._last - self._first) if self._first is not None else 0
+        if stripped > 20 and not self.full:
+            self.paragraphs.append((self._head, self._length))
+        self._reset()
+
+    def close(self):
+        """Fecha o último parágrafo e retorna os casos fallback"""
+        if self._boundary_pending:
+            self._boundary_pending = False
+            self._append('\n')
+        self._finish()
+        return [fallback_case(i, head, length) for i, (head, length) in enumerate(self.paragraphs)]
+
+
+class TestCaseParser:
+    """Parser incremental, linha a linha, de casos de teste em texto.
+
+    Mantém a máquina de estados (``current_case`` e ``current_gherkin_field``)
+    entre chamadas de ``feed``, de modo que o documento pode ser entregue em
+    blocos (ex.: uma página de PDF por vez) com memória limitada a um bloco.
+    """
+
+    # Linhas lidas para detectar o idioma, quando ele não é informado (também
+    # usadas pelo BlockReparser, para que as duas análises escolham os mesmos idiomas)
+    DETECT_LINES = 200
+
+    def __init__(self, languages=None, keywords=None):
+        self.current_case = {key: '' for key in CASE_FIELDS}
+        self.current_gherkin_field = None
+        self._partial_line = ''
+        self._has_cases = False
+        self._fallback = FallbackCollector()
+        self._keywords = GHERKIN_KEYWORDS if keywords is None else keywords
+        # Blocos de Exemplos do caso atual: [cabeçalho, linhas]
+        self._examples = []
+        self._in_examples = False
+        # Sem idiomas definidos, as primeiras linhas ficam retidas até a detecção
+        self._pending = None
+        if languages:
+            self._use_languages(languages)
+        else:
+            self._pending = []
+
+    def _use_languages(self, languages):
+        self.languages = tuple(languages)
+        self.matcher = keyword_matcher(self.languages, self._keywords)
+        self._classify = self.matcher.classify
+
+    def _detect_languages(self):
+        """Escolhe os idiomas pelas primeiras ``DETECT_LINES`` linhas retidas e as devolve para processamento"""
+        lines, self._pending = self._pending, None
+        self._use_languages(detect_gherkin_languages(lines[:self.DETECT_LINES], self._keywords))
+        return lines
+
+    def feed(self, text):
+        """Processa um bloco de texto e retorna os casos concluídos nele."""
+        lines = (self._partial_line + text).split('\n')
+        # A última linha pode continuar no próximo bloco
+        self._partial_line = lines.pop()
+        if self._pending is not None:
+            self._pending.extend(lines)
+            if len(self._pending) < self.DETECT_LINES:
+                return []
+            lines = self._detect_languages()
+        return self._feed_lines(lines)
+
+    def snapshot(self):
+        """Estado da máquina de estados entre duas linhas (chave da reanálise por blocos)"""
+        return (tuple(self.current_case.items()), self.current_gherkin_field, self._in_examples,
+                tuple((header, tuple(rows)) for header, rows in self._examples))
+
+    def restore(self, state):
+        """Volta ao estado de ``snapshot``"""
+        case, self.current_gherkin_field, self._in_examples, examples = state
+        self.current_case = dict(case)
+        self._examples = [[header, list(rows)] for header, rows in examples]
+
+    def is_block_boundary(self, line):
+        """A linha abre um novo bloco (cenário ou requisito), sem alterar o estado"""
+        match = self._classify(line.strip().lower())
+        return match is not None and match.lastgroup != 'passo'
+
+    def _feed_lines(self, lines):
+        test_cases = []
+        for line in lines:
+            test_case = self.feed_line(line)
+            if test_case is not None:
+                test_cases.append(test_case)
+        return test_cases
+
+    def _feed_remaining(self):
+        """Processa as linhas retidas para a detecção e a linha incompleta"""
+        if self._pending is not None:
+            # A linha incompleta também entra na amostra, como no BlockReparser
+            self._pending.append(self._partial_line)
+            self._partial_line = ''
+            return self._feed_lines(self._detect_languages())
+        test_cases = []
+        test_case = self.feed_line(self._partial_line)
+        self._partial_line = ''
+        if test_case is not None:
+            test_cases.append(test_case)
+        return test_cases
+
+    def flush(self):
+        """Conclui o caso em aberto antes de casos de outra fonte (ex.: tabelas de PDF).
+
+        O requisito atual continua valendo para os cenários seguintes.
+        """
+        test_cases = self._feed_remaining()
+        current_case = self.current_case
+        if any(value for field, value in current_case.items() if field != 'historia_requisito'):
+            test_cases.append(self._emit())
+            self.current_case = {key: '' for key in CASE_FIELDS}
+            self.current_case['historia_requisito'] = current_case['historia_requisito'].strip()
+        self.current_gherkin_field = None
+        return test_cases
+
+    def close(self, allow_fallback=True):
+        """Finaliza a análise e retorna os casos restantes (ou os casos fallback)."""
+        test_cases = self._feed_remaining()
+
+        # Adiciona o último caso
+        if any(self.current_case.values()):
+            test_cases.append(self._emit())
+
+        if not self._has_cases:
+            return self._fallback.close() if allow_fallback else []
+        return test_cases
+
+    def _emit(self):
+        current_case = self.current_case
+        test_case = TestCase(*[current_case[field].strip() for field in CASE_FIELDS])
+        examples = [(header, rows) for header, rows in self._examples if header and rows]
+        if examples:
+            # Esquema do cenário: expandido sob demanda pelo TestCaseStore
+            test_case = ScenarioOutline(test_case, examples)
+        self._examples = []
+        self._in_examples = False
+        self._has_cases = True
+        self._fallback = None
+        return test_case
+
+    def _add_example_row(self, line):
+        """Linha ``| a | b |`` de Exemplos: a primeira do bloco é o cabeçalho"""
+        cells = split_table_row(line)
+        block = self._examples[-1]
+        if block[0] is None:
+            block[0] = cells
+        else:
+            block[1].append(cells)
+
+    def feed_line(self, line):
+        """Processa uma linha; retorna o caso concluído por ela, se houver."""
+        if self._fallback is not None and not self._fallback.full:
+            self._fallback.add_line(line)
+
+        current_case = self.current_case
+        line = line.strip()
+        
+        if not line:
+            self.current_gherkin_field = None
+            return None
+        
+        if self._in_examples:
+            if line.startswith('|'):
+                self._add_example_row(line)
+                return None
+            self._in_examples = False
+            
+        lower_line = line.lower()
+        match = self._classify(lower_line)
+        kind = match.lastgroup if match else None
+
+        # DETECÇÃO DE REQUISITO/FEATURE
+        if kind == 'historia_requisito':
+            test_case = self._emit() if any(current_case.values()) else None
+            self.current_case = {key: '' for key in CASE_FIELDS}
+            self.current_case['historia_requisito'] = extract_after_colon(line)
+            self.current_gherkin_field = None
+            self._examples = []
+            return test_case
+                
+        # DETECÇÃO DE CENÁRIO/TESTE
+        elif kind == 'teste':
+            test_case = None
+            if current_case['teste'] and any(current_case.values()):
+                test_case = self._emit()
+                self.current_case = {
+                    'historia_requisito': current_case['historia_requisito'].strip(),
+                    'teste': '', 'dado': '', 'quando': '', 'entao': ''
+                }
+                
+            self.current_case['teste'] = extract_after_colon(line)
+            self.current_gherkin_field = None
+            return test_case
+            
+        # DETECÇÃO E MUDANÇA DE ESTADO GHERKIN
+        elif kind is not None:
+            field = self.matcher.step_fields[match.group('passo')]
+            self.current_gherkin_field = field
+            current_case[field] += line[match.end():].strip() + " "
+            return None
+        
+        # EXEMPLOS DE ESQUEMA DO CENÁRIO (linhas "| a | b |" a seguir)
+        header = self.matcher.feature_header(lower_line)
+        if header and self.matcher.header_sections[header.group(1)] == 'examples':
+            self._examples.append([None, []])
+            self._in_examples = True
+            self.current_gherkin_field = None
+        
+        # CONTINUAÇÃO DE TEXTO
+        elif self.current_gherkin_field:
+            current_case[self.current_gherkin_field] += line + " "
+        
+        return None
+
+
+class FeatureFileParser(TestCaseParser):
+    """Parser nativo de arquivos .feature (Gherkin).
+
+    Reconhece palavras-chave só no início da linha (``Funcionalidade:``,
+    ``Cenário:``, ``Dado``...), soma os passos de ``Contexto``/``Background`` a
+    cada cenário e não aplica as heurísticas nem o fallback do parser genérico.
+    Um cenário seguido de tabelas ``Exemplos`` vira um ``ScenarioOutline``.
+    """
+
+    def __init__(self, languages=None, keywords=None):
+        super().__init__(languages, keywords)
+        self._fallback = None
+        self._background = {'dado': '', 'quando': '', 'entao': ''}
+        self._section = None
+
+    def close(self, allow_fallback=False):
+        return super().close(allow_fallback=False)
+
+    def snapshot(self):
+        return super().snapshot() + (tuple(self._background.items()), self._section)
+
+    def restore(self, state):
+        super().restore(state[:-2])
+        self._background = dict(state[-2])
+        self._section = state[-1]
+
+    def is_block_boundary(self, line):
+        header = self.matcher.feature_header(line.strip().lower())
+        return header is not None and self.matcher.header_sections[header.group(1)] in (
+            'feature', 'scenario', 'scenario_outline')
+
+    def feed_line(self, line):
+        line = line.strip()
+        if not line or line.startswith('#') or line.startswith('@'):
+            return None
+        
+        lower_line = line.lower()
+        header = self.matcher.feature_header(lower_line)
+        if header:
+            section = self.matcher.header_sections[header.group(1)]
+            title = line[header.start(2):].strip()
+            self.current_gherkin_field = None
+            if section == 'feature':
+                test_case = self._emit() if any(self.current_case.values()) else None
+                self.current_case = {key: '' for key in CASE_FIELDS}
+                self.current_case['historia_requisito'] = title
+                self._background = {'dado': '', 'quando': '', 'entao': ''}
+                self._section = 'feature'
+                return test_case
+            if section == 'background':
+                self._section = 'background'
+                return None
+            if section == 'examples':
+                self._section = 'examples'
+                self._examples.append([None, []])
+                return None
+            
+            self._section = 'scenario'
+            current_case = self.current_case
+            test_case = None
+            if any(current_case[key] for key in ('teste', 'dado', 'quando', 'entao')):
+                test_case = self._emit()
+            self.current_case = {'historia_requisito': current_case['historia_requisito'].strip(), 'teste': title}
+            self.current_case.update(self._background)
+            return test_case
+        
+        if self._section == 'examples':
+            if line.startswith('|'):
+                self._add_example_row(line)
+            return None
+        
+        step = self.matcher.feature_step(lower_line)
+        if step:
+            # Conjunções (E, Mas, *) continuam o campo do passo anterior
+            field = self.matcher.step_fields.get(step.group(1)) or self.current_gherkin_field or 'dado'
+            self.current_gherkin_field = field
+            text = line[step.start(2):].strip()
+        elif self.current_gherkin_field:
+            # Tabelas de dados e docstrings continuam o passo atual
+            text = line
+        else:
+            # Descrições livres de funcionalidade/cenário
+            return None
+        
+        target = self._background if self._section == 'background' else self.current_case
+        target[self.current_gherkin_field] += text + " "
+        return None
+
+
+class BlockReparser:
+    """Reanálise incremental de um documento de texto, bloco a bloco.
+
+    O texto é dividido em blocos que começam nas linhas de cenário/requisito
+    (``is_block_boundary`` do parser). A chave de cada bloco é o hash do estado
+    do parser na entrada do bloco mais o texto do bloco; blocos com chave já
+    conhecida reaproveitam os casos emitidos e o estado de saída da análise
+    anterior, os demais são analisados de novo. Como o estado de entrada faz
+    parte da chave, uma edição só reprocessa o bloco alterado e o seguinte
+    (que recebe o caso em aberto), e o resultado é idêntico ao de uma análise
+    completa (exceto o fallback de documentos sem casos, que fica a cargo do
+    chamador).
+    """
+
+    def __init__(self, core, parser_class=TestCaseParser):
+        self.core = core
+        self.parser_class = parser_class
+        self.languages = None
+        self._blocks = {}
+        self.total_blocks = 0
+        self.reparsed_blocks = 0
+
+    @staticmethod
+    def _iter_lines(chunks):
+        partial = ''
+        for chunk in chunks:
+            lines = (partial + chunk).split('\n')
+            partial = lines.pop()
+            yield from lines
+        yield partial
+
+    def parse(self, chunks):
+        """Casos do texto, reaproveitando os blocos inalterados desde a última chamada"""
+        lines = self._iter_lines(chunks)
+        head = list(itertools.islice(lines, TestCaseParser.DETECT_LINES))
+        languages = self.core.languages or detect_gherkin_languages(head, self.core.gherkin_keywords)
+        if languages != self.languages:
+            # Outro conjunto de palavras-chave: nenhum bloco anterior vale
+            self.languages = languages
+            self._blocks = {}
+        self.core.detected_languages = languages
+        
+        parser = self.core.new_parser(self.parser_class, languages)
+        parser._fallback = None
+        blocks = {}
+        test_cases = []
+        self.total_blocks = self.reparsed_blocks = 0
+        
+        def run(block):
+            state = parser.snapshot()
+            key = hashlib.blake2b(repr(state).encode('utf-8', 'surrogatepass'), digest_size=20)
+            key.update('\n'.join(block).encode('utf-8', 'surrogatepass'))
+            key = key.digest()
+            result = self._blocks.get(key)
+            if result is None:
+                self.reparsed_blocks += 1
+                result = (parser._feed_lines(block), parser.snapshot())
+            else:
+                parser.restore(result[1])
+            blocks[key] = result
+            test_cases.extend(result[0])
+            self.total_blocks += 1
+        
+        block = []
+        for line in itertools.chain(head, lines):
+            if block and parser.is_block_boundary(line):
+                run(block)
+                block = []
+            block.append(line)
+        if block:
+            run(block)
+        
+        test_cases.extend(parser.close(allow_fallback=False))
+        self._blocks = blocks
+        return test_cases
+
+
+class HtmlTextExtractor(HTMLParser):
+    """Converte HTML em linhas de texto de forma incremental.
+
+    Cada bloco (parágrafo, título, item de lista...) vira uma linha; linhas de
+    tabela seguem a mesma regra do Word (``table_row_lines``) e uma linha em
+    branco fecha cada tabela.
+    """
+
+    BLOCK_TAGS = {'p', 'div', 'br', 'li', 'ul', 'ol', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'section',
+                  'article', 'header', 'footer', 'pre', 'blockquote', 'dt', 'dd', 'hr', 'title', 'body'}
+    SKIP_TAGS = {'script', 'style'}
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.lines = []
+        self._text = []
+        self._row = None
+        self._cell = None
+        self._skip = 0
+
+    def pop_lines(self):
+        """Retorna e descarta as linhas já concluídas"""
+        lines, self.lines = self.lines, []
+        return lines
+
+    def _flush(self):
+        text = ' '.join(''.join(self._text).split())
+        self._text = []
+        if text:
+            self.lines.append(text)
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self.SKIP_TAGS:
+            self._skip += 1
+        elif tag in ('td', 'th'):
+            self._cell = []
+        elif tag == 'tr':
+            self._flush()
+            self._row = []
+        elif tag == 'table' or tag in self.BLOCK_TAGS:
+            if self._cell is None:
+                self._flush()
+
+    def handle_endtag(self, tag):
+        if tag in self.SKIP_TAGS:
+            self._skip = max(0, self._skip - 1)
+        elif tag in ('td', 'th'):
+            if self._cell is not None and self._row is not None:
+                self._row.append(' '.join(''.join(self._cell).split()))
+            self._cell = None
+        elif tag == 'tr':
+            if self._row is not None:
+                self.lines.extend(table_row_lines(self._row))
+            self._row = None
+        elif tag == 'table':
+            self._flush()
+            self.lines.append('')
+        elif tag in self.BLOCK_TAGS and self._cell is None:
+            self._flush()
+
+    def handle_data(self, data):
+        if self._skip:
+            return
+        if self._cell is not None:
+            self._cell.append(data)
+        else:
+            self._text.append(data)
+
+    def close(self):
+        super().close()
+        self._flush()
+
+
+class ParsedCaseCache:
+    """Cache em disco dos casos extraídos, endereçado pelo hash do conteúdo do arquivo.
+
+    Cada entrada é um JSON compactado (gzip) com os casos em linhas na ordem de
+    ``CASE_FIELDS``; um esquema do cenário é gravado sem expandir, como
+    ``{"esquema": linha, "exemplos": [[cabeçalho, linhas], ...]}``. A chave combina o hash do arquivo, ``PARSER_VERSION`` e as
+    opções de extração. O tamanho total é limitado a ``max_bytes``, removendo as
+    entradas usadas há mais tempo (LRU pela data de modificação).
+
+    O índice ``index.json`` guarda, por arquivo de origem, ``[tamanho, mtime,
+    hash, chaves]``. Ele fica em memória e só é gravado junto com uma entrada;
+    arquivos cujas chaves saíram todas do cache são removidos dele no ``evict``.
+    """
+
+    INDEX_FILE = "index.json"
+    HASH_BLOCK = 1024 * 1024
+
+    def __init__(self, directory, max_bytes, enabled=True):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self._index = None
+        # Alterações ainda não gravadas: arquivo -> entrada (None = removida)
+        self._index_changes = {}
+        self._lock = threading.Lock()
+
+    def key_for(self, file_path, options=""):
+        """Chave da entrada: hash do conteúdo + versão do parser + opções"""
+        path = Path(file_path)
+        with self._lock:
+            entry_key, entry = self._index_entry(path)
+            key = self.key_for_digest(entry[2], options)
+            if key not in entry[3]:
+                entry[3].append(key)
+                self._index_changes[entry_key] = entry
+        return key
+
+    @staticmethod
+    def key_for_digest(digest, options=""):
+        """Chave de uma entrada cujo conteúdo já tem hash (ex.: uma página de PDF)"""
+        return hashlib.blake2b(f"{digest}|{PARSER_VERSION}|{options}".encode('utf-8'), digest_size=20).hexdigest()
+
+    def _index_entry(self, path):
+        # O índice por (tamanho, mtime) evita recalcular o hash de arquivos inalterados
+        stat = path.stat()
+        if self._index is None:
+            self._index = self._load_index()
+        entry_key = str(path.resolve())
+        entry = self._index.get(entry_key)
+        if entry and entry[0] == stat.st_size and entry[1] == stat.st_mtime_ns:
+            if len(entry) < 4:
+                entry.append([])
+            return entry_key, entry
+
+        hasher = hashlib.blake2b(digest_size=32)
+        with open(path, 'rb') as file:
+            for block in iter(lambda: file.read(self.HASH_BLOCK), b''):
+                hasher.update(block)
+
+        entry = self._index[entry_key] = [stat.st_size, stat.st_mtime_ns, hasher.hexdigest(), []]
+        self._index_changes[entry_key] = entry
+        return entry_key, entry
+
+    def _save_index(self):
+        """Grava as alterações do índice sobre a versão em disco (outros processos também a alteram)"""
+        with self._lock:
+            if not self._index_changes:
+                return
+            index = self._load_index()
+            for entry_key, entry in self._index_changes.items():
+                if entry is None:
+                    index.pop(entry_key, None)
+                else:
+                    index[entry_key] = entry
+            self._write_atomic(self.directory / self.INDEX_FILE,
+                               json.dumps(index, ensure_ascii=False).encode('utf-8'))
+            self._index = index
+            self._index_changes = {}
+
+    def _prune_index(self, live_keys):
+        """Esquece os arquivos sem nenhuma entrada restante no cache"""
+        with self._lock:
+            if self._index is None:
+                self._index = self._load_index()
+            for entry_key, entry in list(self._index.items()):
+                keys = entry[3] if len(entry) > 3 else []
+                if not any(key in live_keys for key in keys):
+                    del self._index[entry_key]
+                    self._index_changes[entry_key] = None
+
+    def _load_index(self):
+        try:
+            with open(self.directory / self.INDEX_FILE, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _entry_path(self, key):
+        return self.directory / f"{key}.json.gz"
+
+    def get(self, key):
+        """Retorna a lista de casos da entrada, ou None se não existir"""
+        path = self._entry_path(key)
+        try:
+            with gzip.open(path, 'rt', encoding='utf-8') as f:
+                payload = json.load(f)
+            # Marca a entrada como usada recentemente
+            os.utime(path)
+        except (OSError, ValueError):
+            return None
+        if payload.get('fields') != list(CASE_FIELDS):
+            return None
+        return TestCaseStore(self._load_entry(row) for row in payload['cases'])
+
+    @staticmethod
+    def _load_entry(row):
+        if isinstance(row, dict):
+            return ScenarioOutline(TestCase(*row['esquema']),
+                                   [(tuple(header), [tuple(values) for values in rows])
+                                    for header, rows in row['exemplos']])
+        return TestCase(*row)
+
+    @staticmethod
+    def _dump_entry(case):
+        if isinstance(case, ScenarioOutline):
+            return {'esquema': case.template.values(),
+                    'exemplos': [[list(header), [list(values) for values in rows]] for header, rows in case.examples]}
+        return [case.get(field, '') for field in CASE_FIELDS]
+
+    def put(self, key, cases, evict=True):
+        """Grava os casos (esquemas do cenário sem expandir) e aplica o limite de tamanho do cache.
+
+        Com ``evict=False`` o limite fica para um ``evict`` posterior (várias entradas de um mesmo documento).
+        """
+        entries = cases.entries() if isinstance(cases, TestCaseStore) else cases
+        payload = {'fields': list(CASE_FIELDS),
+                   'cases': [self._dump_entry(case) for case in entries]}
+        data = gzip.compress(json.dumps(payload, ensure_ascii=False, separators=(',', ':')).encode('utf-8'))
+        try:
+            self._write_atomic(self._entry_path(key), data)
+            if evict:
+                self.evict()
+            self._save_index()
+        except OSError as e:
+            print(f"Erro ao gravar cache de casos: {e}")
+
+    def _write_atomic(self, path, data):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        # Nome temporário único: threads e processos podem gravar a mesma entrada
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix=f"{path.name}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def evict(self):
+        """Remove as entradas menos usadas até caber em ``max_bytes``"""
+        entries = []
+        for path in self.directory.glob("*.json.gz"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        live_keys = {path.name[:-len(".json.gz")] for _, _, path in entries}
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                path.unlink()
+                total -= size
+                live_keys.discard(path.name[:-len(".json.gz")])
+            except OSError:
+                pass
+        self._prune_index(live_keys)
+
+    def clear(self):
+        """Apaga todas as entradas do cache"""
+        for path in self.directory.glob("*.json.gz"):
+            try:
+                path.unlink()
+            except OSError:
+                pass
+        self._prune_index(set())
+        try:
+            self._save_index()
+        except OSError:
+            pass
+
+
+class UnsupportedFormatError(ValueError):
+    """Formato de arquivo sem extrator disponível"""
+
+
+# Tamanho da amostra lida do início do arquivo para detectar formato e codificação
+SNIFF_SIZE = 8192
+OLE_SIGNATURE = b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1'
+
+
+def read_file_head(file_path, size=SNIFF_SIZE):
+    """Lê os primeiros bytes do arquivo"""
+    with open(file_path, 'rb') as file:
+        return file.read(size)
+
+
+def detect_text_encoding(sample):
+    """Detecta a codificação de um texto a partir de uma amostra (BOM, UTF-8 ou Latin-1)"""
+    if sample.startswith(b'\xef\xbb\xbf'):
+        return 'utf-8-sig'
+    if sample.startswith((b'\xff\xfe', b'\xfe\xff')):
+        return 'utf-16'
+    try:
+        sample.decode('utf-8')
+    except UnicodeDecodeError as e:
+        # Um caractere multibyte cortado no fim da amostra não invalida o UTF-8
+        if not (e.reason == 'unexpected end of data' and e.start >= len(sample) - 3):
+            return 'latin-1'
+    return 'utf-8'
+
+
+def is_text(sample):
+    """Amostra parece texto (sem bytes nulos, exceto em UTF-16 com BOM)"""
+    return sample.startswith((b'\xff\xfe', b'\xfe\xff')) or b'\x00' not in sample
+
+
+def sample_text(sample):
+    """Decodifica a amostra para inspeção do conteúdo (sem BOM nem espaços iniciais)"""
+    return sample.decode(detect_text_encoding(sample), errors='replace').lstrip('\ufeff \t\r\n')
+
+
+def sniff_json(sample, file_path):
+    return is_text(sample) and sample_text(sample)[:1] in ('{', '[')
+
+
+def sniff_html(sample, file_path):
+    head = sample_text(sample)[:1024].lower()
+    return head.startswith('<') and ('<!doctype html' in head or '<html' in head)
+
+
+def sniff_xml(sample, file_path):
+    return is_text(sample) and sample_text(sample)[:1] == '<' and not sniff_html(sample, file_path)
+
+
+def sniff_feature(sample, file_path):
+    if not is_text(sample):
+        return False
+    matcher = keyword_matcher(tuple(GHERKIN_KEYWORDS))
+    for line in sample_text(sample).split('\n'):
+        line = line.strip().lower()
+        if line and not line.startswith(('#', '@')):
+            header = matcher.feature_header(line)
+            return bool(header) and matcher.header_sections[header.group(1)] == 'feature'
+    return False
+
+
+def sniff_text(sample, file_path):
+    return is_text(sample)
+
+
+def sniff_csv(sample, file_path):
+    """Extensão .csv, ou texto delimitado cuja primeira linha é um cabeçalho de tabela de testes reconhecido"""
+    if not is_text(sample):
+        return False
+    if Path(file_path).suffix.lower() == '.csv':
+        return True
+    lines = sample_text(sample).splitlines()
+    if len(sample) >= SNIFF_SIZE:
+        # A última linha da amostra pode estar cortada
+        lines = lines[:-1]
+    if not lines:
+        return False
+    try:
+        dialect = csv.Sniffer().sniff('\n'.join(lines), delimiters=',;\t|')
+    except csv.Error:
+        return False
+    header = next(csv.reader(lines[:1], dialect), [])
+    return len(header) > 1 and bool(map_table_headers(header))
+
+
+def sniff_docx(sample, file_path):
+    try:
+        with zipfile.ZipFile(file_path) as archive:
+            return 'word/document.xml' in archive.namelist()
+    except (OSError, zipfile.BadZipFile):
+        return False
+
+
+class ExtractorSpec:
+    """Descrição de um extrator registrado.
+
+    ``signatures`` são prefixos binários (magic bytes) que identificam o formato
+    independentemente da extensão; ``sniff`` confirma o conteúdo. ``cost`` é a
+    classe de custo (0 = leitura nativa e direta ... 3 = monta um modelo de
+    objetos completo): entre extratores capazes, vence o mais barato.
+    ``streaming`` indica leitura incremental e ``text_source`` o método que gera
+    o texto do documento em blocos, quando o formato é textual, analisado por
+    ``parser_class``.
+    """
+
+    def __init__(self, name, method, description, extensions=(), signatures=(), sniff=None,
+                 streaming=False, cost=1, requires=(), text_source=None, parser_class=TestCaseParser):
+        self.name = name
+        self.method = method
+        self.description = description
+        self.extensions = extensions
+        self.signatures = signatures
+        self.sniff = sniff
+        self.streaming = streaming
+        self.cost = cost
+        self.requires = requires
+        self.text_source = text_source
+        self.parser_class = parser_class
+
+    def available(self):
+        """Alguma das bibliotecas alternativas em ``requires`` está instalada"""
+        return not self.requires or any(library_available(name) for name in self.requires)
+
+    def matches(self, sample, file_path):
+        if self.signatures and not sample.startswith(self.signatures):
+            return False
+        return self.sniff is None or self.sniff(sample, file_path)
+
+
+EXTRACTORS = []
+
+
+def register_extractor(spec):
+    """Registra um extrator (a ordem de registro desempata extratores de mesmo custo)"""
+    EXTRACTORS.append(spec)
+    return spec
+
+
+register_extractor(ExtractorSpec('pdf', 'extract_from_pdf', "PDF Files", ('.pdf',), (b'%PDF-',),
+                                 streaming=True, cost=2, requires=('PyPDF2', 'pypdf'),
+                                 text_source='iter_pdf_pages'))
+register_extractor(ExtractorSpec('docx', 'extract_from_docx', "Word Documents", ('.docx',), (b'PK\x03\x04',),
+                                 sniff_docx, streaming=True, cost=1, text_source='iter_docx_text'))
+register_extractor(ExtractorSpec('feature', 'extract_from_feature', "Gherkin Features", ('.feature',),
+                                 sniff=sniff_feature, streaming=True, cost=0, text_source='iter_text_file',
+                                 parser_class=FeatureFileParser))
+register_extractor(ExtractorSpec('json', 'extract_from_json', "JSON Files", ('.json',),
+                                 sniff=sniff_json, streaming=True, cost=1))
+register_extractor(ExtractorSpec('xml', 'extract_from_xml', "XML Files", ('.xml',),
+                                 sniff=sniff_xml, streaming=True, cost=1))
+register_extractor(ExtractorSpec('html', 'extract_from_html', "HTML Files", ('.html', '.htm'),
+                                 sniff=sniff_html, streaming=True, cost=1, text_source='iter_html_text'))
+register_extractor(ExtractorSpec('csv', 'extract_from_csv', "CSV Files", ('.csv',),
+                                 sniff=sniff_csv, streaming=True, cost=1))
+# Texto genérico: aceita qualquer conteúdo textual, com heurísticas e fallback
+register_extractor(ExtractorSpec('text', 'extract_from_txt', "Text Files", ('.txt', '.md', '.markdown', '.text', '.log'),
+                                 sniff=sniff_text, cost=2, text_source='iter_text_file'))
+
+
+def supported_extensions():
+    """Extensões declaradas pelos extratores registrados"""
+    return tuple(dict.fromkeys(ext for spec in EXTRACTORS for ext in spec.extensions))
+
+
+def select_extractor(file_path):
+    """Escolhe o extrator mais barato capaz de ler o arquivo, detectando o formato pelo conteúdo.
+
+    1. Assinaturas binárias (PDF, zip do Word) decidem, seja qual for a extensão.
+    2. Em arquivos de texto, a extensão escolhe, se o conteúdo for compatível.
+    3. Extensão desconhecida ou enganosa: detecção só pelo conteúdo.
+    """
+    sample = read_file_head(file_path)
+    extension = Path(file_path).suffix.lower()
+    available = [spec for spec in EXTRACTORS if spec.available()]
+    
+    candidates = [spec for spec in available if spec.signatures and spec.matches(sample, file_path)]
+    if not candidates:
+        if sample.startswith(OLE_SIGNATURE):
+            raise UnsupportedFormatError("Formato .doc (Word 97-2003) não suportado: salve o documento como .docx")
+        if not is_text(sample):
+            raise UnsupportedFormatError("Formato de arquivo não suportado")
+        text_specs = [spec for spec in available if not spec.signatures]
+        candidates = [spec for spec in text_specs
+                      if extension in spec.extensions and spec.matches(sample, file_path)]
+        if not candidates:
+            candidates = [spec for spec in text_specs if spec.sniff and spec.matches(sample, file_path)]
+    
+    if not candidates:
+        raise UnsupportedFormatError("Formato de arquivo não suportado")
+    return min(candidates, key=lambda spec: spec.cost)
+
+
+class QualityMetrics:
+    """Métricas de qualidade de um conjunto de casos, calculadas em uma única passada colunar.
+
+    ``from_cases`` lê os casos por coluna (``TestCaseStore.columns``), mede cada
+    coluna uma vez em arrays numpy e agrega tudo de forma vetorizada; o relatório
+    e as recomendações leem este objeto em vez de percorrer os casos de novo.
+
+    Guarda só contadores (preenchidos, somas de tamanhos, acertos Gherkin, casos
+    curtos), de onde saem completude, preenchimento e médias. Registrado como
+    ouvinte de um ``TestCaseStore`` (``update``), acompanha inclusões e edições
+    em O(1) por caso; só os percentis pedem uma nova passada completa.
+    """
+
+    # Percentis da distribuição de tamanhos (caracteres) de cada campo
+    PERCENTILES = (0.5, 0.9, 0.99)
+
+    def __init__(self, matcher):
+        self.matcher = matcher
+        self.reset()
+
+    def reset(self):
+        self.total_cases = 0
+        self.complete_cases = 0
+        self.short_cases = 0
+        self.gherkin_cases = 0
+        # Por campo: casos preenchidos e, entre os valores não vazios, quantidade e soma dos tamanhos
+        self.filled_counts = dict.fromkeys(CASE_FIELDS, 0)
+        self.present_counts = dict.fromkeys(CASE_FIELDS, 0)
+        self.length_sums = dict.fromkeys(CASE_FIELDS, 0)
+        self.length_percentiles = {field: dict.fromkeys(self.PERCENTILES, 0) for field in CASE_FIELDS}
+        # Grupos de índices de casos quase duplicados (só na passada completa com ``duplicates``)
+        self.duplicate_clusters = []
+
+    @property
+    def empty_fields(self):
+        return self.total_cases * len(CASE_FIELDS) - sum(self.filled_counts.values())
+
+    @property
+    def completeness(self):
+        """% de campos preenchidos"""
+        total_fields = self.total_cases * len(CASE_FIELDS)
+        return (1 - self.empty_fields / total_fields) * 100 if total_fields else 0.0
+
+    @property
+    def fill_rates(self):
+        """% de casos com cada campo preenchido"""
+        total = self.total_cases
+        return {field: count / total * 100 if total else 0.0 for field, count in self.filled_counts.items()}
+
+    @property
+    def avg_lengths(self):
+        """Tamanho médio de cada campo (só valores não vazios)"""
+        return {field: self.length_sums[field] / count if count else 0
+                for field, count in self.present_counts.items()}
+
+    @property
+    def gherkin_rate(self):
+        """% de casos com palavras-chave Gherkin em Dado/Quando/Então"""
+        return self.gherkin_cases / self.total_cases * 100 if self.total_cases else 0.0
+
+    @property
+    def redundant_cases(self):
+        """Casos que sobram ao manter um por grupo de quase duplicados"""
+        return sum(len(group) - 1 for group in self.duplicate_clusters)
+
+    def update(self, old, new):
+        """Ouvinte do ``TestCaseStore``: troca a contribuição dos valores ``old`` pelos de ``new``.
+
+        ``old`` é None numa inclusão e ``new`` numa remoção; ambos None limpam tudo.
+        """
+        if old is None and new is None:
+            self.reset()
+            return
+        if old is not None:
+            self._count(old, -1)
+        if new is not None:
+            self._count(new, 1)
+
+    def _count(self, values, sign):
+        filled = 0
+        # Valores como texto (casos de JSON podem trazer listas ou números), usados também na busca Gherkin
+        texts = {}
+        for field, value in zip(CASE_FIELDS, values):
+            texts[field] = value = '' if value is None else str(value)
+            if value:
+                self.present_counts[field] += sign
+                self.length_sums[field] += sign * len(value)
+            if value.strip():
+                self.filled_counts[field] += sign
+                filled += 1
+        self.total_cases += sign
+        if filled == len(CASE_FIELDS):
+            self.complete_cases += sign
+        if len(texts['teste']) < 10:
+            self.short_cases += sign
+        if any(self.matcher.contains(texts[field]) for field in ('dado', 'quando', 'entao')):
+            self.gherkin_cases += sign
+
+    @classmethod
+    def from_cases(cls, cases, matcher, duplicates=False, progress=None):
+        """Passada completa; ``progress`` (tarefa em segundo plano) é consultado entre as etapas"""
+        metrics = cls(matcher)
+        store = cases if isinstance(cases, TestCaseStore) else TestCaseStore(cases)
+        metrics.total_cases = total = len(store)
+        if not total:
+            return metrics
+        
+        pd = load_library('pandas')
+        np = load_library('numpy')
+        frame = pd.DataFrame(dict(zip(CASE_FIELDS, store.columns())))
+        
+        # Sem pyarrow, os métodos ``.str`` do pandas andam elemento a elemento em Python;
+        # ``map`` com funções nativas direto para arrays numpy é bem mais rápido
+        def measure(values, function=None):
+            source = map(function, values) if function else values
+            return np.fromiter(map(len, source), dtype=np.int64, count=total)
+        
+        columns = {}
+        filled = np.zeros(total, dtype=np.int64)
+        for field in CASE_FIELDS:
+            if progress is not None:
+                progress.advance()
+            column = frame[field]
+            if column.hasnans:
+                column = column.fillna('')
+            if pd.api.types.infer_dtype(column, skipna=False) != 'string':
+                column = column.astype(str)
+            columns[field] = values = column.to_numpy()
+            
+            lengths = measure(values)
+            field_filled = measure(values, str.strip) > 0
+            filled += field_filled
+            metrics.filled_counts[field] = int(field_filled.sum())
+            present = lengths[lengths > 0]
+            metrics.present_counts[field] = len(present)
+            metrics.length_sums[field] = int(present.sum())
+            if len(present):
+                metrics.length_percentiles[field] = dict(zip(
+                    cls.PERCENTILES, np.percentile(present, [q * 100 for q in cls.PERCENTILES]).tolist()))
+            if field == 'teste':
+                metrics.short_cases = int((lengths < 10).sum())
+        
+        metrics.complete_cases = int((filled == len(CASE_FIELDS)).sum())
+        
+        # Dado, depois Quando e Então só nos casos ainda sem palavra-chave
+        search = matcher.step_pattern.search
+        pending = np.arange(total)
+        for field in ('dado', 'quando', 'entao'):
+            if progress is not None:
+                progress.advance()
+            values = columns[field][pending]
+            hits = np.fromiter(map(bool, map(search, map(str.lower, values))),
+                               dtype=bool, count=len(values))
+            pending = pending[~hits]
+        metrics.gherkin_cases = total - len(pending)
+        
+        if duplicates:
+            metrics.duplicate_clusters = NearDuplicateIndex.from_cases(store, progress=progress).clusters()
+        return metrics
+
+
+class NearDuplicateIndex:
+    """Grupos de casos quase duplicados por MinHash e LSH, sem comparar todos os pares.
+
+    O texto de Cenário + Dado + Quando + Então vira um conjunto de trigramas de
+    palavras, resumido em ``NUM_HASHES`` mínimos de funções de hash (MinHash): a
+    fração de posições iguais entre duas assinaturas estima a similaridade de
+    Jaccard. As assinaturas são cortadas em ``BANDS`` faixas e só os casos que
+    coincidem em alguma faixa inteira (mesmo balde) são comparados, em tempo
+    praticamente linear no número de casos.
+    """
+
+    NUM_HASHES = 64
+    BANDS = 16
+    SHINGLE_SIZE = 3
+    # Similaridade estimada mínima para dois casos ficarem no mesmo grupo
+    THRESHOLD = 0.8
+    _PRIME = (1 << 31) - 1
+    # Trigramas processados por vez no cálculo das assinaturas (limita a memória)
+    _CHUNK = 1 << 16
+    _WORD_RE = re.compile(r'\w+')
+    _SEPARATOR = (0,) * (SHINGLE_SIZE - 1)
+    _SHINGLE_BASE = 1000003
+
+    # Casos lidos entre duas consultas ao cancelamento da tarefa em segundo plano
+    _PROGRESS_STEP = 4096
+
+    def __init__(self, texts, threshold=None, progress=None):
+        self.threshold = self.THRESHOLD if threshold is None else threshold
+        self.progress = progress
+        np = load_library('numpy')
+        
+        # Hash de cada palavra (com dois zeros separando os casos); os trigramas são combinados no numpy.
+        # Casos sem nenhuma palavra não entram nos grupos
+        word_hashes = []
+        counts = []
+        self.indexes = []
+        for index, text in enumerate(texts):
+            if progress is not None and not index % self._PROGRESS_STEP:
+                progress.advance()
+            words = self._WORD_RE.findall(text.lower())
+            if words:
+                self.indexes.append(index)
+                counts.append(len(words))
+                word_hashes.extend(map(zlib.crc32, map(str.encode, words)))
+                word_hashes.extend(self._SEPARATOR)
+        self.indexes = np.array(self.indexes, dtype=np.int64)
+        self.signatures = self._signatures(np, np.array(word_hashes, dtype=np.uint64),
+                                           np.array(counts, dtype=np.int64))
+        self._clusters = None
+
+    @classmethod
+    def from_cases(cls, cases, threshold=None, progress=None):
+        store = cases if isinstance(cases, TestCaseStore) else TestCaseStore(cases)
+        columns = dict(zip(CASE_FIELDS, store.columns()))
+        steps = [columns[field] for field in ('teste', 'dado', 'quando', 'entao')]
+        texts = (' '.join(str(value) for value in values if value) for values in zip(*steps))
+        return cls(texts, threshold, progress)
+
+    def _checkpoint(self):
+        if self.progress is not None:
+            self.progress.advance()
+
+    def _shingle_hashes(self, np, word_hashes, counts):
+        """Hash de cada trigrama de palavras (casos com menos palavras formam um trigrama só)"""
+        if len(word_hashes) < self.SHINGLE_SIZE:
+            # Nenhum caso com palavras (ou nenhum caso): sem trigramas
+            return np.empty(0, dtype=np.uint64), np.zeros(1, dtype=np.int64)
+        word_hashes %= self._PRIME
+        hashes = np.zeros(len(word_hashes) - self.SHINGLE_SIZE + 1, dtype=np.uint64)
+        for offset in range(self.SHINGLE_SIZE):
+            hashes *= self._SHINGLE_BASE
+            hashes += word_hashes[offset:len(hashes) + offset]
+            hashes %= self._PRIME
+        
+        # Trigramas válidos: os que começam nas primeiras max(1, n - 2) palavras de cada caso
+        shingle_counts = np.maximum(counts - self.SHINGLE_SIZE + 1, 1)
+        word_starts = np.concatenate(([0], np.cumsum(counts + len(self._SEPARATOR))[:-1]))
+        shingle_starts = np.concatenate(([0], np.cumsum(shingle_counts)))
+        positions = np.arange(shingle_starts[-1]) - np.repeat(shingle_starts[:-1] - word_starts, shingle_counts)
+        return hashes[positions], shingle_starts
+
+    def _signatures(self, np, word_hashes, counts):
+        """Assinaturas MinHash (uma linha por caso), com hashes universais (a*x + b) mod p"""
+        random = np.random.default_rng(20240601)
+        a = random.integers(1, self._PRIME, self.NUM_HASHES, dtype=np.uint64)
+        b = random.integers(0, self._PRIME, self.NUM_HASHES, dtype=np.uint64)
+        hashes, starts = self._shingle_hashes(np, word_hashes, counts)
+        signatures = np.empty((len(counts), self.NUM_HASHES), dtype=np.uint64)
+        
+        first = 0
+        while first < len(counts):
+            self._checkpoint()
+            # Casos inteiros por bloco: até _CHUNK trigramas (ou um caso maior que isso)
+            last = max(first + 1, int(np.searchsorted(starts, starts[first] + self._CHUNK, side='right')) - 1)
+            # Uma linha por função de hash: o mínimo por caso percorre memória contígua
+            block = a[:, None] * hashes[None, starts[first]:starts[last]]
+            block += b[:, None]
+            block %= self._PRIME
+            signatures[first:last] = np.minimum.reduceat(block, starts[first:last] - starts[first], axis=1).T
+            first = last
+        return signatures
+
+    def _candidate_pairs(self, np):
+        """Pares (líder do balde, caso) que coincidem numa faixa inteira da assinatura"""
+        rows = self.NUM_HASHES // self.BANDS
+        positions = np.arange(len(self.signatures))
+        pairs = []
+        for band in range(self.BANDS):
+            self._checkpoint()
+            keys = np.ascontiguousarray(self.signatures[:, band * rows:(band + 1) * rows])
+            keys = keys.view(np.dtype((np.void, keys.dtype.itemsize * rows))).ravel()
+            _, first, inverse = np.unique(keys, return_index=True, return_inverse=True)
+            leaders = first[inverse.ravel()]
+            followers = leaders != positions
+            pairs.append(leaders[followers] * len(positions) + positions[followers])
+        if not pairs:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+        codes = np.unique(np.concatenate(pairs))
+        return codes // len(positions), codes % len(positions)
+
+    def clusters(self):
+        """Grupos (índices dos casos, do maior grupo para o menor) com similaridade >= ``threshold``"""
+        if self._clusters is not None:
+            return self._clusters
+        np = load_library('numpy')
+        leaders, followers = self._candidate_pairs(np)
+        
+        similar = np.empty(len(leaders), dtype=bool)
+        for start in range(0, len(leaders), self._CHUNK):
+            self._checkpoint()
+            stop = start + self._CHUNK
+            agreement = (self.signatures[leaders[start:stop]] == self.signatures[followers[start:stop]]).mean(axis=1)
+            similar[start:stop] = agreement >= self.threshold
+        
+        parent = list(range(len(self.signatures)))
+        
+        def find(node):
+            while parent[node] != node:
+                parent[node] = parent[parent[node]]
+                node = parent[node]
+            return node
+        
+        for leader, follower in zip(leaders[similar].tolist(), followers[similar].tolist()):
+            root_leader, root_follower = find(leader), find(follower)
+            if root_leader != root_follower:
+                parent[max(root_leader, root_follower)] = min(root_leader, root_follower)
+        
+        groups = {}
+        for position, index in enumerate(self.indexes.tolist()):
+            groups.setdefault(find(position), []).append(index)
+        self._clusters = sorted((group for group in groups.values() if len(group) > 1),
+                                key=lambda group: (-len(group), group[0]))
+        return self._clusters
+
+    def redundant_indexes(self):
+        """Índices que sobram ao manter só o primeiro caso de cada grupo"""
+        return {index for group in self.clusters() for index in group[1:]}
+
+
+def _search_fold_table():
+    """Tabela de ``str.translate`` que tira os acentos das letras latinas (á -> a, ç -> c)"""
+    table = {}
+    for code in range(0xC0, 0x250):
+        base = unicodedata.normalize('NFKD', chr(code))[0]
+        if base != chr(code):
+            table[code] = base
+    return table
+
+
+_SEARCH_FOLD = _search_fold_table()
+_SEARCH_TERM_RE = re.compile(r'\w+')
+
+
+def normalize_search_term(word):
+    """Forma indexada de uma palavra: minúscula e sem acento"""
+    return word.lower().translate(_SEARCH_FOLD)
+
+
+def search_terms(text):
+    """Termos de busca de um texto"""
+    return list(map(normalize_search_term, _SEARCH_TERM_RE.findall(text)))
+
+
+def _search_field_scopes():
+    """Nome usado antes de ":" na consulta -> posição do campo em ``CASE_FIELDS``.
+
+    Vale o nome do campo ou um cabeçalho reconhecido de uma palavra só (cenario, given...).
+    """
+    scopes = {}
+    for position, field in enumerate(CASE_FIELDS):
+        for terms in map(search_terms, (field,) + TABLE_HEADER_ALIASES[field]):
+            if len(terms) == 1:
+                scopes.setdefault(terms[0], position)
+    return scopes
+
+
+_SEARCH_FIELD_SCOPES = _search_field_scopes()
+
+
+class CaseSearchIndex:
+    """Índice invertido dos casos de um ``TestCaseStore`` para a busca da pré-visualização.
+
+    Para cada campo guarda, por termo, os índices dos casos que o contêm (arrays
+    numpy ordenados) e o vocabulário ordenado, usado nas buscas por prefixo.
+    Uma consulta combina termos com E: ``login`` (em qualquer campo), ``log*``
+    (prefixo) e ``dado:usuário`` (só no campo; vale também o nome de uma coluna
+    reconhecida, como ``cenario:``), sem diferenciar maiúsculas nem acentos.
+    Edições atualizam só os termos do valor alterado (``update``).
+
+    A montagem é colunar: os valores distintos de cada campo são unidos num
+    texto só, quebrado em palavras de uma vez, e as palavras viram códigos
+    (``pandas.factorize``); a normalização e a ordenação ficam no numpy.
+    """
+
+    # Palavras e o separador entre os valores unidos
+    _TOKEN_RE = re.compile(r'\w+|\x00')
+
+    def __init__(self, store, progress=None):
+        np = load_library('numpy')
+        pd = load_library('pandas')
+        self.store = store
+        # Lida antes das colunas: uma edição durante a montagem deixa o índice desatualizado
+        self.version = store.version
+        self.size = len(store)
+        self.postings = []
+        self.vocabulary = []
+        for values in store.columns():
+            postings = self._field_postings(np, pd, values)
+            self.postings.append(postings)
+            self.vocabulary.append(sorted(postings))
+            if progress is not None:
+                progress.advance()
+
+    def _field_postings(self, np, pd, values):
+        """Termo -> índices ordenados dos casos que o contêm, para os valores de um campo"""
+        if not values:
+            return {}
+        # Cada valor distinto é quebrado em palavras uma vez só (o requisito se repete em toda a história).
+        # Agrupados num dict: o pandas compara strings só até o primeiro "\x00".
+        # Como texto: casos de JSON podem trazer listas e objetos (não hasheáveis) e números
+        codes_by_value = {}
+        value_codes = np.array([codes_by_value.setdefault(
+                                    value if value.__class__ is str else self.text(value), len(codes_by_value))
+                                for value in values], dtype=np.int64)
+        distinct = list(codes_by_value)
+        text = '\x00'.join(distinct)
+        if text.count('\x00') != len(distinct) - 1:
+            text = '\x00'.join(value.replace('\x00', ' ') for value in distinct)
+        
+        # Palavras -> códigos; as formas normalizadas ("Então", "entao") passam a ter o mesmo código
+        word_codes, words = pd.factorize(np.array(self._TOKEN_RE.findall(text), dtype=object))
+        term_codes, terms = pd.factorize(np.array([normalize_search_term(word) for word in words], dtype=object))
+        codes = term_codes[word_codes].astype(np.int64)
+        # A lista, não o array: o numpy ignora os "\x00" no fim das strings ao comparar.
+        # As palavras nunca contêm "\x00", então o pandas as agrupa corretamente
+        terms = terms.tolist()
+        separators = codes == (terms.index('\x00') if '\x00' in terms else -1)
+        owners = np.cumsum(separators)[~separators]
+        codes = codes[~separators]
+        if not len(codes):
+            return {}
+        
+        # Pares (termo, valor distinto) sem repetição, expandidos para os casos que têm cada valor
+        pairs = np.sort(codes * len(distinct) + owners)
+        pairs = pairs[np.r_[True, pairs[1:] != pairs[:-1]]]
+        pair_terms, pair_values = pairs // len(distinct), pairs % len(distinct)
+        order = np.argsort(value_codes, kind='stable')
+        counts = np.bincount(value_codes, minlength=len(distinct))
+        starts = np.cumsum(counts) - counts
+        lengths = counts[pair_values]
+        ends = np.cumsum(lengths)
+        offsets = np.repeat(starts[pair_values] - (ends - lengths), lengths) + np.arange(ends[-1])
+        keys = np.sort(np.repeat(pair_terms, lengths) * len(values) + order[offsets])
+        
+        key_terms = keys // len(values)
+        bounds = np.flatnonzero(np.diff(key_terms)) + 1
+        names = [terms[code] for code in key_terms[np.r_[0, bounds]].tolist()]
+        return dict(zip(names, np.split((keys % len(values)).astype(np.int32), bounds)))
+
+    @staticmethod
+    def text(value):
+        """Valor de campo como texto indexável (None vira vazio)"""
+        return '' if value is None else str(value)
+
+    @classmethod
+    def terms(cls, value):
+        """Termos de um valor de campo"""
+        return set(search_terms(cls.text(value)))
+
+    def stale(self, store):
+        """Se o índice não corresponde mais a ``store`` (outro store ou casos incluídos ou editados)"""
+        return store is not self.store or store.version != self.version
+
+    def parse_query(self, query):
+        """(campos, termo, prefixo) de cada termo da consulta"""
+        all_fields = tuple(range(len(CASE_FIELDS)))
+        parsed = []
+        for part in query.split():
+            fields = all_fields
+            scope, colon, rest = part.partition(':')
+            if colon:
+                position = _SEARCH_FIELD_SCOPES.get(normalize_search_term(scope))
+                if position is not None:
+                    fields, part = (position,), rest
+            prefix = part.endswith('*')
+            terms = search_terms(part)
+            for number, term in enumerate(terms, 1):
+                parsed.append((fields, term, prefix and number == len(terms)))
+        return parsed
+
+    def search(self, query):
+        """Índices (array ordenado) dos casos com todos os termos de ``query``; None se ela não tem termos"""
+        np = load_library('numpy')
+        found = None
+        for fields, term, prefix in self.parse_query(query):
+            matches = self._match(np, fields, term, prefix)
+            if found is None:
+                found = matches
+            else:
+                found &= matches
+            if not found.any():
+                break
+        return None if found is None else np.flatnonzero(found)
+
+    def _match(self, np, fields, term, prefix):
+        """Máscara dos casos em que o termo (ou uma palavra com o prefixo) aparece nos campos"""
+        arrays = []
+        for position in fields:
+            postings = self.postings[position]
+            if prefix:
+                vocabulary = self.vocabulary[position]
+                start = bisect.bisect_left(vocabulary, term)
+                stop = bisect.bisect_left(vocabulary, term + '\U0010ffff', start)
+                arrays.extend(postings[word] for word in vocabulary[start:stop])
+            elif term in postings:
+                arrays.append(postings[term])
+        mask = np.zeros(self.size, dtype=bool)
+        if arrays:
+            mask[np.concatenate(arrays)] = True
+        return mask
+
+    def update(self, index, field, old, new):
+        """Atualiza o índice depois que o campo ``field`` do caso ``index`` passou de ``old`` para ``new``.
+
+        Chamada logo após o ``set_value`` da edição, com o índice ainda atualizado antes dela.
+        """
+        np = load_library('numpy')
+        position = CASE_FIELDS.index(field)
+        postings = self.postings[position]
+        vocabulary = self.vocabulary[position]
+        old_terms, new_terms = self.terms(old), self.terms(new)
+        for term in old_terms - new_terms:
+            indexes = postings.get(term)
+            if indexes is None:
+                continue
+            at = np.searchsorted(indexes, index)
+            if at < len(indexes) and indexes[at] == index:
+                indexes = np.delete(indexes, at)
+            if len(indexes):
+                postings[term] = indexes
+            else:
+                del postings[term]
+                del vocabulary[bisect.bisect_left(vocabulary, term)]
+        for term in new_terms - old_terms:
+            indexes = postings.get(term)
+            if indexes is None:
+                postings[term] = np.array([index], dtype=np.int32)
+                bisect.insort(vocabulary, term)
+                continue
+            at = np.searchsorted(indexes, index)
+            if at == len(indexes) or indexes[at] != index:
+                postings[term] = np.insert(indexes, at, index)
+        self.version = self.store.version
+
+
+class TemplateProjection:
+    """Template compilado: o campo do caso exibido em cada coluna, resolvido uma única vez.
+
+    Cada coluna mostra o primeiro campo mapeado para ela (ou fica vazia);
+    ``field_columns`` é o caminho inverso, usado nas edições. Pré-visualização,
+    edição e exportação leem daqui em vez de varrer ``mappings`` a cada célula.
+    """
+
+    __slots__ = ('columns', 'fields', 'field_columns')
+
+    def __init__(self, template):
+        self.columns = tuple(template["columns"])
+        fields = []
+        for col in self.columns:
+            mapped = [key for key, mapped_col in template["mappings"].items()
+                      if mapped_col == col and key in _CASE_FIELD_SET]
+            fields.append(mapped[0] if mapped else None)
+        self.fields = tuple(fields)
+        self.field_columns = {field: index for index, field in enumerate(self.fields) if field}
+
+    def row(self, case):
+        """Valores do caso na ordem das colunas do template"""
+        if isinstance(case, TestCase):
+            return [getattr(case, field) if field else "" for field in self.fields]
+        return [case.get(field, "") if field else "" for field in self.fields]
+
+    def rows(self, cases):
+        row = self.row
+        for case in cases:
+            yield row(case)
+
+    def field_of(self, column_index):
+        """Campo editado pela coluna de índice ``column_index`` (None se ela não tiver campo)"""
+        return self.fields[column_index]
+
+
+# Formatos de exportação: extensão -> método gravador do ConversionCore, descrição e biblioteca exigida
+EXPORT_FORMATS = {
+    '.xlsx': {'writer': 'write_excel', 'label': "Excel", 'library': 'openpyxl'},
+    '.csv': {'writer': 'write_csv', 'label': "CSV", 'library': None},
+    '.jsonl': {'writer': 'write_jsonl', 'label': "JSON Lines", 'library': None},
+    '.parquet': {'writer': 'write_parquet', 'label': "Parquet", 'library': 'pyarrow'},
+}
+
+
+def available_export_formats():
+    """Extensões de exportação cujas bibliotecas estão instaladas"""
+    return [extension for extension, spec in EXPORT_FORMATS.items()
+            if spec['library'] is None or library_available(spec['library'])]
+
+
+class IncrementalExtraction:
+    """Acompanha um arquivo e o reextrai quando ele muda, reaproveitando o que não mudou.
+
+    Formatos textuais (``text_source``) passam pelo ``BlockReparser``; nos PDFs
+    o texto de páginas inalteradas também é reaproveitado. Os demais formatos
+    (e PDFs com a etapa de tabelas) são reextraídos por inteiro. Em todos os
+    casos, edições manuais de casos cujo conteúdo extraído não mudou são
+    mantidas (``TestCaseStore.carry_edits``).
+    """
+
+    def __init__(self, core, file_path, signature=None):
+        self.core = core
+        self.file_path = file_path
+        # Tamanho e data do arquivo na última extração; ``signature`` aproveita uma
+        # extração já feita (a primeira verificação só reextrai se o arquivo mudou depois dela)
+        self._signature = signature
+        self._reparser = None
+        self._page_texts = {}
+        # (blocos reanalisados, total de blocos) da última extração incremental
+        self.block_stats = None
+
+    @staticmethod
+    def file_signature(file_path):
+        stat = os.stat(file_path)
+        return stat.st_size, stat.st_mtime_ns
+
+    def _stat(self):
+        return self.file_signature(self.file_path)
+
+    def changed(self):
+        """O arquivo mudou desde a última extração"""
+        try:
+            return self._stat() != self._signature
+        except OSError:
+            return False
+
+    def extract(self, previous=None):
+        """Extrai os casos em um novo ``TestCaseStore``, com as edições de ``previous``"""
+        signature = self._stat()
+        spec = select_extractor(self.file_path)
+        test_cases = None
+        self.block_stats = None
+        if spec.text_source and not (spec.name == 'pdf' and self.core.tables_available()):
+            if self._reparser is None or self._reparser.parser_class is not spec.parser_class:
+                self._reparser = BlockReparser(self.core, spec.parser_class)
+            if spec.text_source == 'iter_pdf_pages':
+                chunks = self.core.iter_pdf_pages(self.file_path, page_texts=self._page_texts)
+            else:
+                chunks = getattr(self.core, spec.text_source)(self.file_path)
+            test_cases = self._reparser.parse(chunks)
+            self.block_stats = (self._reparser.reparsed_blocks, self._reparser.total_blocks)
+        if not test_cases:
+            # Sem texto incremental ou sem casos estruturados (fallback): extração completa
+            self.block_stats = None
+            test_cases = getattr(self.core, spec.method)(self.file_path)
+        
+        store = TestCaseStore(test_cases)
+        if previous is not None:
+            store.carry_edits(previous)
+        self._signature = signature
+        return store
+
+
+class TaskCancelled(Exception):
+    """Tarefa em segundo plano cancelada pelo usuário"""
+
+
+class TaskProgress:
+    """Progresso e cancelamento de uma tarefa em segundo plano, compartilhados entre threads.
+
+    A thread de trabalho chama ``advance`` (que levanta ``TaskCancelled`` depois
+    de ``cancel``); a interface só lê os contadores quando consulta a tarefa.
+    """
+
+    def __init__(self, total=None):
+        self.pages = 0
+        self.cases = 0
+        # Casos esperados, quando conhecidos (exportação): permite barra de progresso determinada
+        self.total = total
+        self.started = time.perf_counter()
+        self._cancelled = threading.Event()
+
+    def advance(self, pages=0, cases=0):
+        self.pages += pages
+        self.cases += cases
+        if self._cancelled.is_set():
+            raise TaskCancelled()
+
+    def track(self, items, unit='cases'):
+        """Repassa ``items`` contando cada um como página ou caso"""
+        for item in items:
+            if unit == 'pages':
+                self.advance(pages=1)
+            else:
+                self.advance(cases=1)
+            yield item
+
+    def cancel(self):
+        self._cancelled.set()
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    def rates(self):
+        """(páginas/s, casos/s) desde o início"""
+        elapsed = max(time.perf_counter() - self.started, 1e-6)
+        return self.pages / elapsed, self.cases / elapsed
+
+
+class BackgroundTask:
+    """Executa ``work(progress)`` numa thread e devolve o resultado por uma fila.
+
+    A interface consulta ``poll`` periodicamente (``root.after``); a thread de
+    trabalho nunca toca no Tk.
+    """
+
+    def __init__(self, work, total=None):
+        self.progress = TaskProgress(total)
+        self.results = queue.Queue()
+        self._thread = threading.Thread(target=self._run, args=(work,), daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def _run(self, work):
+        try:
+            result = work(self.progress)
+        except TaskCancelled:
+            self.results.put(('cancelado', None))
+        except Exception as e:
+            self.results.put(('erro', e))
+        else:
+            self.results.put(('ok', result))
+
+    def poll(self):
+        """(situação, resultado) quando a tarefa terminou, ou None se ainda está rodando"""
+        try:
+            return self.results.get_nowait()
+        except queue.Empty:
+            return None
+
+    def cancel(self):
+        self.progress.cancel()
+
+
+class ConversionCore:
+    """Núcleo de conversão sem interface gráfica: extração, parsing e exportação.
+
+    Usado pela janela Tk (``DocumentToExcelConverter``) e pelo modo em lote da
+    linha de comando, que roda sem display.
+    """
+    # Novo caminho para o arquivo de templates
+    TEMPLATE_FILE = Path("templates.json")
+    # Processos usados na extração de texto de PDF (1 = extração serial)
+    PDF_WORKERS = 1
+    # Máximo de páginas por tarefa enviada ao pool de processos
+    PDF_CHUNK_PAGES = 16
+    # Cache em disco dos casos extraídos
+    CACHE_DIR = Path(os.environ.get('LOCALAPPDATA') or Path.home() / ".cache") / "conversor_documentos"
+    CACHE_MAX_BYTES = 256 * 1024 * 1024
+    CACHE_ENABLED = True
+    # Extração de tabelas de PDF com tabula (quando instalado)
+    EXTRACT_PDF_TABLES = True
+    TABLE_WORKERS = 2
+    # Palavras-chave Gherkin extras/personalizadas por idioma
+    KEYWORDS_FILE = Path("gherkin_keywords.json")
+    # Idiomas do parser (None = detecção automática pelas primeiras linhas)
+    GHERKIN_LANGUAGES = None
+    # Planilha exportada: cor do cabeçalho, linhas usadas para estimar a largura das colunas e largura máxima
+    EXCEL_HEADER_COLOR = "4472C4"
+    EXCEL_WIDTH_SAMPLE_ROWS = 200
+    EXCEL_MAX_COLUMN_WIDTH = 60
+    # Linhas por lote na gravação de Parquet
+    PARQUET_BATCH_ROWS = 65536
+
+    def __init__(self, pdf_workers=None, use_cache=None, extract_tables=None, languages=None):
+        self.templates = self.load_templates()
+        self.gherkin_keywords = self.load_gherkin_keywords()
+        self.languages = self.GHERKIN_LANGUAGES if languages is None else tuple(languages)
+        self.current_template = "padrao_gherkin"
+        self.pdf_workers = self.PDF_WORKERS if pdf_workers is None else pdf_workers
+        self.cache = ParsedCaseCache(self.CACHE_DIR, self.CACHE_MAX_BYTES,
+                                     self.CACHE_ENABLED if use_cache is None else use_cache)
+        self.extract_tables = self.EXTRACT_PDF_TABLES if extract_tables is None else extract_tables
+        # Templates compilados (TemplateProjection), descartados quando os templates mudam
+        self._projections = {}
+        # TaskProgress da tarefa em segundo plano em andamento (None fora delas)
+        self.progress = None
+        # Idiomas escolhidos pelo parser na última extração (detecção automática)
+        self.detected_languages = None
+        # Problemas não fatais da última extração (ex.: tabelas de PDF ilegíveis)
+        self.extraction_warnings = []
+
+    def template_projection(self, template_key=None):
+        """Projeção compilada do template (o atual, se não informado)"""
+        template_key = template_key or self.current_template
+        projection = self._projections.get(template_key)
+        if projection is None:
+            projection = self._projections[template_key] = TemplateProjection(self.templates[template_key])
+        return projection
+
+    def invalidate_templates(self):
+        """Descarta as projeções compiladas (chamar sempre que ``self.templates`` mudar)"""
+        self._projections.clear()
+
+    def load_templates(self):
+        """Carrega templates do arquivo JSON, ou retorna o padrão se o arquivo não existir."""
+        # 1. Templates padrão (fallback)
+        default_templates = {
+            "padrao_gherkin": {
+                "name": "Padrão Gherkin",
+                "columns": ['Historia/Requisito', 'Cenário', 'Dado', 'Quando', 'Então'],
+                "mappings": {
+                    'historia_requisito': 'Historia/Requisito',
+                    'teste': 'Cenário', 
+                    'dado': 'Dado',
+                    'quando': 'Quando',
+                    'entao': 'Então'
+                }
+            },
+            "teste_detalhado": {
+                "name": "Teste Detalhado",
+                "columns": ['ID', 'Requisito', 'Cenário', 'Pré-condições', 'Passos', 'Resultado Esperado', 'Prioridade'],
+                "mappings": {
+                    'historia_requisito': 'Requisito',
+                    'teste': 'Cenário',
+                    'dado': 'Pré-condições',
+                    'quando': 'Passos',
+                    'entao': 'Resultado Esperado'
+                }
+            },
+            "simple": {
+                "name": "Simples",
+                "columns": ['Requisito', 'Descrição Teste', 'Entrada', 'Saída Esperada'],
+                "mappings": {
+                    'historia_requisito': 'Requisito',
+                    'teste': 'Descrição Teste',
+                    'dado': 'Entrada',
+                    'entao': 'Saída Esperada'
+                }
+            }
+        }
+        
+        # 2. Tenta carregar do arquivo templates.json
+        if self.TEMPLATE_FILE.exists():
+            try:
+                with open(self.TEMPLATE_FILE, 'r', encoding='utf-8') as f:
+                    saved_templates = json.load(f)
+                
+                # Mescla templates padrão com salvos (os salvos têm prioridade)
+                default_templates.update(saved_templates)
+                return default_templates
+            except Exception as e:
+                print(f"Erro ao carregar templates do arquivo JSON: {e}")
+        
+        return default_templates
+
+    def load_gherkin_keywords(self):
+        """Carrega as palavras-chave por idioma, mesclando gherkin_keywords.json com as padrão.
+
+        O arquivo segue o formato de ``GHERKIN_KEYWORDS``: um idioma novo é
+        acrescentado e, em um idioma existente, cada seção informada substitui a
+        padrão (ex.: ``{"it": {"given": ["dato"], ...}, "pt": {"test": [...]}}``).
+        """
+        keywords = {language: {section: list(words) for section, words in sections.items()}
+                    for language, sections in GHERKIN_KEYWORDS.items()}
+        
+        if self.KEYWORDS_FILE.exists():
+            try:
+                with open(self.KEYWORDS_FILE, 'r', encoding='utf-8') as f:
+                    saved_keywords = json.load(f)
+                
+                for language, sections in saved_keywords.items():
+                    keywords.setdefault(language.lower(), {}).update(
+                        (section, [word.strip().lower() for word in words]) for section, words in sections.items())
+            except Exception as e:
+                print(f"Erro ao carregar palavras-chave do arquivo JSON: {e}")
+        
+        return keywords
+
+    def new_parser(self, parser_class=None, languages=None):
+        """Cria um parser com os idiomas (ou detecção automática) e palavras-chave configurados"""
+        return (parser_class or TestCaseParser)(languages or self.languages, self.gherkin_keywords)
+
+    def quality_metrics(self, cases, duplicates=False):
+        """Métricas de qualidade dos casos (``QualityMetrics``), com os grupos de quase duplicados se pedido"""
+        return QualityMetrics.from_cases(cases, self.keyword_matcher(), duplicates, self.progress)
+
+    def collapse_duplicates(self, cases):
+        """Casos sem os quase duplicados: fica só o primeiro de cada grupo"""
+        store = cases if isinstance(cases, TestCaseStore) else TestCaseStore(cases)
+        redundant = NearDuplicateIndex.from_cases(store, progress=self.progress).redundant_indexes()
+        if not redundant:
+            return store
+        return TestCaseStore(case for index, case in enumerate(store) if index not in redundant)
+
+    def keyword_matcher(self):
+        """Matcher dos idiomas configurados ou, na detecção automática, dos detectados na última extração"""
+        languages = self.languages or self.detected_languages or DEFAULT_GHERKIN_LANGUAGES
+        return keyword_matcher(languages, self.gherkin_keywords)
+
+    def extract_content(self, file_path):
+        """Extrai os casos em um ``TestCaseStore``, reaproveitando o cache se o arquivo não mudou.
+
+        Erros são propagados ao chamador.
+        """
+        # Casos do cache não passam pelo parser: ficam os idiomas padrão
+        self.detected_languages = None
+        self.extraction_warnings = []
+        if not self.cache.enabled:
+            return TestCaseStore(self.extract_uncached(file_path))
+
+        try:
+            cache_key = self.cache.key_for(file_path, self.cache_options())
+        except OSError:
+            return TestCaseStore(self.extract_uncached(file_path))
+
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        test_cases = TestCaseStore(self.extract_uncached(file_path))
+        # Com avisos o resultado é parcial: a próxima extração tenta de novo
+        if not self.extraction_warnings:
+            self.cache.put(cache_key, test_cases)
+        return test_cases
+
+    def cache_options(self):
+        """Opções de extração que alteram o resultado e, portanto, a chave do cache"""
+        # Os cabeçalhos aceitos valem para CSV e tabelas de PDF
+        options = [self.table_header_options()]
+        if self.tables_available():
+            options.append("tabelas")
+        options.append("idiomas=" + (",".join(self.languages) if self.languages else "auto"))
+        if self.gherkin_keywords != GHERKIN_KEYWORDS:
+            keywords = json.dumps(self.gherkin_keywords, sort_keys=True, ensure_ascii=False)
+            options.append("palavras=" + hashlib.blake2b(keywords.encode('utf-8'), digest_size=8).hexdigest())
+        return "|".join(options)
+
+    def tables_available(self):
+        """Indica se a etapa de tabelas de PDF está ativa e o tabula está instalado"""
+        return self.extract_tables and library_available('tabula')
+
+    def extract_uncached(self, file_path):
+        """Extrai conteúdo com o extrator escolhido pelo registro (conteúdo + extensão)"""
+        spec = select_extractor(file_path)
+        return getattr(self, spec.method)(file_path)
+    
+    def extract_from_pdf(self, file_path, workers=None):
+        """Extrai texto de PDF página a página, sem montar o texto completo em memória"""
+        pages = self.iter_pdf_pages(file_path, workers)
+        if self.progress is not None:
+            pages = self.progress.track(pages, 'pages')
+        if self.tables_available():
+            return list(self.iter_pdf_cases_with_tables(file_path, pages))
+        return list(self.parse_test_case_stream(pages))
+
+    def iter_pdf_cases_with_tables(self, file_path, pages):
+        """Combina o texto das páginas com tabelas de casos de teste extraídas pelo tabula.
+
+        Páginas que parecem conter tabelas são enviadas ao tabula em threads
+        enquanto o texto das demais continua sendo extraído. Os resultados são
+        consumidos na ordem das páginas: os casos de uma página-tabela entram no
+        ponto em que ela aparece; se o tabula não achar tabela de testes, o texto
+        da página segue para o parser normalmente.
+        """
+        parser = self.new_parser()
+        pending = deque()
+        found_table_cases = False
+        # Hash do conteúdo de cada página (chave do cache por página), calculado na primeira página-tabela
+        page_digests = None
+        
+        def drain(wait):
+            nonlocal found_table_cases
+            while pending and (wait or pending[0][1] is None or pending[0][1].done()):
+                page_number, future, text = pending.popleft()
+                table_cases = None
+                if future is not None:
+                    try:
+                        table_cases = future.result()
+                    except Exception as e:
+                        # Falha do tabula: a página segue como texto
+                        self.extraction_warnings.append(f"Erro ao extrair tabelas da página {page_number}: {e}")
+                if table_cases:
+                    found_table_cases = True
+                    # O caso em aberto no texto vem antes dos casos da tabela
+                    yield from parser.flush()
+                    yield from table_cases
+                else:
+                    yield from parser.feed(text)
+        
+        with ThreadPoolExecutor(max_workers=self.TABLE_WORKERS) as executor:
+            for page_number, text in enumerate(pages, start=1):
+                future = None
+                if looks_like_table_page(text):
+                    if page_digests is None:
+                        page_digests = self.pdf_page_digests(file_path) if self.cache.enabled else []
+                    digest = page_digests[page_number - 1] if page_number <= len(page_digests) else None
+                    future = executor.submit(self.extract_page_tables, file_path, page_number, digest)
+                pending.append((page_number, future, text))
+                yield from drain(wait=False)
+            yield from drain(wait=True)
+        
+        if page_digests:
+            # Limite de tamanho aplicado uma vez por documento, não a cada página gravada
+            self.cache.evict()
+        yield from parser.close(allow_fallback=not found_table_cases)
+        self.detected_languages = parser.languages
+
+    def pdf_page_digests(self, file_path):
+        """Hash do conteúdo de cada página do PDF (vazio se o arquivo não puder ser lido)"""
+        try:
+            PyPDF2 = load_library('PyPDF2', 'pypdf')
+            with open(file_path, 'rb') as file:
+                return [pdf_page_digest(page).hex() for page in PyPDF2.PdfReader(file).pages]
+        except Exception:
+            return []
+
+    def extract_page_tables(self, file_path, page_number, digest=None):
+        """Casos de teste das tabelas de uma página.
+
+        Com ``digest`` (hash do conteúdo da página, ver ``pdf_page_digests``) o
+        resultado fica no cache por página: editar outra página do PDF não o
+        invalida. Erros do tabula são propagados ao chamador.
+        """
+        cache_key = None
+        if self.cache.enabled and digest:
+            cache_key = self.cache.key_for_digest(digest, f"tabela|{self.table_header_options()}")
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return list(cached)
+        
+        read_pdf = load_library('tabula').read_pdf
+        tables = read_pdf(file_path, pages=page_number, multiple_tables=True, silent=True)
+        
+        test_cases = []
+        for table in tables:
+            test_cases.extend(self.table_to_test_cases(table))
+        if cache_key:
+            self.cache.put(cache_key, test_cases, evict=False)
+        return test_cases
+
+    def table_header_options(self):
+        """Resumo dos cabeçalhos aceitos nas tabelas (parte das chaves do cache)"""
+        aliases = json.dumps(self.template_header_aliases(), sort_keys=True, ensure_ascii=False)
+        return "cabecalhos=" + hashlib.blake2b(aliases.encode('utf-8'), digest_size=8).hexdigest()
+
+    def template_header_aliases(self):
+        """Nomes de coluna de todos os templates, aceitos como cabeçalhos de tabela"""
+        template_aliases = {}
+        for template in self.templates.values():
+            for field, column in template["mappings"].items():
+                template_aliases.setdefault(column, field)
+        return template_aliases
+
+    def table_to_test_cases(self, table):
+        """Converte um DataFrame de tabela em casos, mapeando cabeçalhos para campos"""
+        template_aliases = self.template_header_aliases()
+        rows = table.fillna('').astype(str).values.tolist()
+        mapping = map_table_headers(list(table.columns), template_aliases)
+        if not mapping and rows:
+            # Cabeçalho não detectado pelo tabula: tenta a primeira linha
+            mapping = map_table_headers(rows[0], template_aliases)
+            rows = rows[1:]
+        if not mapping:
+            return []
+        return list(rows_to_test_cases(rows, mapping))
+
+    def iter_pdf_pages(self, file_path, workers=None, page_texts=None):
+        """Gera o texto de cada página do PDF, uma por vez e na ordem do documento.
+
+        Com mais de um processo, as páginas são divididas em blocos extraídos em
+        paralelo e remontados na ordem original antes de chegar ao parser.
+        ``page_texts`` ({hash do conteúdo da página: texto}) reaproveita o texto
+        de páginas inalteradas entre extrações do mesmo arquivo (extração serial);
+        ao fim da leitura ficam nele só as páginas atuais.
+        """
+        PyPDF2 = load_library('PyPDF2', 'pypdf')
+        workers = self.pdf_workers if workers is None else workers
+        if page_texts is not None:
+            seen = set()
+            with open(file_path, 'rb') as file:
+                for page in PyPDF2.PdfReader(file).pages:
+                    key = pdf_page_digest(page)
+                    seen.add(key)
+                    if key not in page_texts:
+                        page_texts[key] = (page.extract_text() or "") + "\n"
+                    yield page_texts[key]
+            for key in page_texts.keys() - seen:
+                del page_texts[key]
+            return
+        if workers > 1:
+            with open(file_path, 'rb') as file:
+                page_count = len(PyPDF2.PdfReader(file).pages)
+            if page_count > 1:
+                yield from self.iter_pdf_pages_parallel(file_path, page_count, workers)
+                return
 
-# Bibliotecas de terceiros que precisam ser instaladas
-try:
-    import PyPDF2
-except ImportError:
-    try:
-        import pypdf as PyPDF2
-    except ImportError:
-        # Erro genérico para informar que a biblioteca é necessária
-        pass
+        with open(file_path, 'rb') as file:
+            pdf_reader = PyPDF2.PdfReader(file)
+            for page in pdf_reader.pages:
+                yield (page.extract_text() or "") + "\n"
+
+    def iter_pdf_pages_parallel(self, file_path, page_count, workers):
+        """Extrai as páginas em um pool de processos, preservando a ordem das páginas"""
+        workers = min(workers, page_count)
+        chunk_size = max(1, min(self.PDF_CHUNK_PAGES, math.ceil(page_count / workers)))
+        starts = range(0, page_count, chunk_size)
+        stops = [min(start + chunk_size, page_count) for start in starts]
+        
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(extract_pdf_page_range, file_path, start, stop)
+                       for start, stop in zip(starts, stops)]
+            try:
+                # Blocos consumidos na ordem de submissão, não na de conclusão
+                for future in futures:
+                    yield from future.result()
+            finally:
+                # Interrompido (ex.: tarefa cancelada): descarta os blocos ainda não iniciados
+                for future in futures:
+                    future.cancel()
     
-try:
-    import docx
-except ImportError:
-    # Erro genérico para informar que a biblioteca é necessária
-    pass
+    def extract_from_txt(self, file_path):
+        """Extrai texto de TXT, linha a linha"""
+        return list(self.parse_test_case_stream(self.iter_text_file(file_path)))
     
-try:
-    from openpyxl import Workbook
-    from openpyxl.styles import Font, PatternFill, Alignment
-except ImportError:
-    # Erro genérico para informar que a biblioteca é necessária
-    pass
+    def extract_from_docx(self, file_path):
+        """Extrai texto de Word (parágrafos e tabelas, na ordem do documento) direto do zip"""
+        return list(self.parse_test_case_stream(self.iter_docx_text(file_path)))
 
-# Adicionando a biblioteca tabula-py
-try:
-    from tabula import read_pdf
-except ImportError:
-    pass 
+    def iter_docx_text(self, file_path):
+        """Gera as linhas de um .docx lendo word/document.xml direto do zip, com iterparse.
 
-class DocumentToExcelConverter:
-    # Novo caminho para o arquivo de templates
-    TEMPLATE_FILE = Path("templates.json")
+        Não monta o modelo de objetos do python-docx: cada parágrafo é emitido ao
+        ser fechado e depois descartado. Tabelas entram na ordem do documento,
+        uma linha de tabela por vez: com duas células preenchidas viram
+        ``"célula1: célula2"`` (ex.: ``Dado: usuário logado``); nos demais casos
+        cada célula vira uma linha. Uma linha em branco fecha cada tabela.
+        """
+        paragraph_tag = WORD_NS + 'p'
+        text_tag = WORD_NS + 't'
+        tab_tag = WORD_NS + 'tab'
+        break_tags = (WORD_NS + 'br', WORD_NS + 'cr')
+        body_tag = WORD_NS + 'body'
+        table_tag = WORD_NS + 'tbl'
+        row_tag = WORD_NS + 'tr'
+        cell_tag = WORD_NS + 'tc'
+        
+        body = None
+        paragraph_depth = 0
+        rows = []       # linhas de tabela abertas (tabelas aninhadas empilham)
+        cells = []      # células abertas; cada uma acumula as linhas de texto
+        progress = self.progress
+        
+        with zipfile.ZipFile(file_path) as archive, archive.open('word/document.xml') as xml_file:
+            for event, element in ET.iterparse(xml_file, events=('start', 'end')):
+                tag = element.tag
+                if event == 'start':
+                    if tag == paragraph_tag:
+                        paragraph_depth += 1
+                    elif tag == cell_tag:
+                        cells.append([])
+                    elif tag == row_tag:
+                        rows.append([])
+                    elif tag == body_tag:
+                        body = element
+                    continue
+                
+                if tag == paragraph_tag:
+                    paragraph_depth -= 1
+                    if paragraph_depth:
+                        # Parágrafo de caixa de texto: já entra no texto do parágrafo externo
+                        continue
+                    parts = []
+                    for node in element.iter():
+                        if node.tag == text_tag:
+                            parts.append(node.text or '')
+                        elif node.tag == tab_tag:
+                            parts.append('\t')
+                        elif node.tag in break_tags:
+                            parts.append('\n')
+                    lines = [''.join(parts)]
+                elif tag == cell_tag:
+                    cell_lines = cells.pop()
+                    rows[-1].append('\n'.join(cell_lines).strip())
+                    element.clear()
+                    continue
+                elif tag == row_tag:
+                    # Uma tabela só é emitida ao fechar: o cancelamento é atendido a cada linha dela
+                    if progress is not None:
+                        progress.advance()
+                    lines = table_row_lines(rows.pop())
+                elif tag == table_tag:
+                    lines = [] if cells else ['']
+                else:
+                    continue
+                
+                element.clear()
+                if cells:
+                    cells[-1].extend(lines)
+                else:
+                    for line in lines:
+                        yield line + "\n"
+                    if body is not None:
+                        del body[:]
+    
+    def iter_text_file(self, file_path):
+        """Gera as linhas de um arquivo de texto mapeado em memória.
+
+        A codificação é detectada uma única vez, em uma amostra do início, e
+        cada linha é decodificada ao ser lida do mapeamento: o arquivo não é
+        copiado inteiro para a memória nem lido duas vezes. Uma linha que não
+        seja UTF-8 válido (arquivos com codificação misturada) é lida como
+        Latin-1. UTF-16 não pode ser separado em linhas pelos bytes e é lido
+        pelo decodificador de texto padrão.
+        """
+        sample = read_file_head(file_path)
+        encoding = detect_text_encoding(sample)
+        if encoding == 'utf-16':
+            with open(file_path, 'r', encoding=encoding, errors='replace') as file:
+                yield from file
+            return
+        if not sample:
+            # Arquivo vazio não pode ser mapeado
+            return
+        
+        with open(file_path, 'rb') as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            if encoding == 'utf-8-sig':
+                mapped.seek(3)
+                encoding = 'utf-8'
+            for raw_line in iter(mapped.readline, b''):
+                try:
+                    line = raw_line.decode(encoding)
+                except UnicodeDecodeError:
+                    line = raw_line.decode('latin-1')
+                if '\r' in line:
+                    # Mesmas quebras de linha universais da leitura em modo texto
+                    yield from line.replace('\r\n', '\n').replace('\r', '\n').splitlines(keepends=True)
+                else:
+                    yield line
+
+    def extract_from_feature(self, file_path):
+        """Extrai casos de um arquivo .feature com o parser Gherkin nativo"""
+        return list(self.parse_test_case_stream(self.iter_text_file(file_path),
+                                               self.new_parser(FeatureFileParser)))
+
+    def iter_html_text(self, file_path):
+        """Gera as linhas de texto de um HTML, lido em blocos"""
+        extractor = HtmlTextExtractor()
+        encoding = detect_text_encoding(read_file_head(file_path))
+        with open(file_path, 'r', encoding=encoding, errors='replace') as file:
+            for chunk in iter(lambda: file.read(64 * 1024), ''):
+                extractor.feed(chunk)
+                for line in extractor.pop_lines():
+                    yield line + "\n"
+        extractor.close()
+        for line in extractor.pop_lines():
+            yield line + "\n"
+
+    def extract_from_html(self, file_path):
+        """Extrai casos de HTML (blocos de texto e linhas de tabela, na ordem do documento)"""
+        return list(self.parse_test_case_stream(self.iter_html_text(file_path)))
+
+    def extract_from_csv(self, file_path):
+        """Extrai casos de CSV: colunas mapeadas pelo cabeçalho ou, sem cabeçalho reconhecido, como texto"""
+        encoding = detect_text_encoding(read_file_head(file_path))
+        with open(file_path, 'r', encoding=encoding, errors='replace', newline='') as file:
+            sample = file.read(SNIFF_SIZE)
+            file.seek(0)
+            try:
+                dialect = csv.Sniffer().sniff(sample, delimiters=',;\t|')
+            except csv.Error:
+                dialect = csv.excel
+            reader = csv.reader(file, dialect)
+            header = next(reader, None)
+            if header is None:
+                return []
+            
+            mapping = map_table_headers(header, self.template_header_aliases())
+            if mapping:
+                return list(self.track_cases(rows_to_test_cases(reader, mapping)))
+            
+            lines = (' '.join(cell.strip() for cell in row if cell.strip()) + "\n"
+                     for row in itertools.chain([header], reader))
+            return list(self.parse_test_case_stream(lines))
+
+    def extract_from_json(self, file_path):
+        """Extrai dados de JSON de forma incremental (memória limitada ao maior caso)"""
+        with open(file_path, 'r', encoding='utf-8') as file:
+            stream = JsonCaseStream(file, self)
+            test_cases = list(self.track_cases(stream.iter_test_cases()))
+        return test_cases if test_cases else self.create_fallback_cases(stream.fallback_text())
+    
+    def extract_from_xml(self, file_path):
+        """Extrai dados de XML em uma única passada, sem carregar a árvore inteira"""
+        return list(self.track_cases(self.iter_xml_test_cases(file_path)))
+
+    def iter_xml_test_cases(self, file_path):
+        """Gera casos de teste conforme os elementos de teste do XML são fechados.
+
+        Procura ``testcase``, ``test`` e ``scenario`` na mesma passada do iterparse
+        (os casos saem na ordem do documento). Elementos processados são
+        esvaziados para manter a memória estável. Se nenhum elemento de teste
+        existir, usa o mesmo fallback de ``extract_from_xml_element``: um caso por
+        elemento, em pré-ordem.
+        """
+        test_tags = set(XML_TEST_TAGS)
+        matcher = self.keyword_matcher()
+        stack = []          # (elemento, posição em pré-ordem) dos elementos abertos
+        fallback_cases = []
+        matched = False
+        progress = self.progress
+        
+        for event, element in ET.iterparse(file_path, events=('start', 'end')):
+            if event == 'start':
+                stack.append((element, len(fallback_cases)))
+                if not matched:
+                    fallback_cases.append(None)
+                continue
+            if progress is not None:
+                progress.advance()
+            
+            element, position = stack.pop()
+            # A raiz não conta como elemento de teste (equivale a findall('.//tag'))
+            if stack and element.tag in test_tags:
+                if not matched:
+                    matched = True
+                    fallback_cases = []
+                test_case = self.create_test_case_from_xml(element, matcher)
+                if test_case:
+                    yield test_case
+            elif not matched:
+                fallback_cases[position] = self.create_test_case_from_xml(element, matcher)
+            
+            # Os filhos só eram necessários para montar o caso deste elemento;
+            # o pai (se for elemento de teste) ainda precisa do texto dele
+            del element[:]
+            if matched and stack and stack[-1][0].tag not in test_tags:
+                del stack[-1][0][:]
+        
+        if not matched:
+            yield from (test_case for test_case in fallback_cases if test_case)
+    
+    def parse_json_test_cases(self, data):
+        """Analisa casos de teste de JSON"""
+        test_cases = []
+        
+        if isinstance(data, list):
+            for item in data:
+                test_cases.extend(self.extract_from_json_object(item))
+        elif isinstance(data, dict):
+            test_cases.extend(self.extract_from_json_object(data))
+            
+        return test_cases if test_cases else self.create_fallback_cases(str(data))
+    
+    def extract_from_json_object(self, obj, path=""):
+        """Extrai casos de teste de objeto JSON"""
+        return list(self.iter_json_object_cases(obj))
+
+    def iter_json_object_cases(self, obj):
+        """Gera os casos de teste de um objeto JSON já decodificado"""
+        if isinstance(obj, dict):
+            # Verificar se é um caso de teste estruturado
+            if any(key.lower() in JSON_TEST_KEYS for key in obj.keys()):
+                test_case = self.create_test_case_from_json(obj)
+                if test_case:
+                    yield test_case
+            else:
+                for value in obj.values():
+                    yield from self.iter_json_object_cases(value)
+                    
+        elif isinstance(obj, list):
+            for item in obj:
+                yield from self.iter_json_object_cases(item)
+    
+    def create_test_case_from_json(self, obj):
+        """Cria caso de teste a partir de objeto JSON"""
+        test_case = {
+            'historia_requisito': obj.get('requirement', obj.get('story', obj.get('feature', ''))),
+            'teste': obj.get('test', obj.get('testcase', obj.get('scenario', obj.get('description', '')))),
+            'dado': obj.get('given', obj.get('precondition', obj.get('context', ''))),
+            'quando': obj.get('when', obj.get('action', obj.get('steps', ''))),
+            'entao': obj.get('then', obj.get('expected', obj.get('result', '')))
+        }
+        
+        # Se pelo menos um campo tem conteúdo, retorna o caso
+        if any(test_case.values()):
+            return test_case
+        return None
+    
+    def parse_xml_test_cases(self, root):
+        """Analisa casos de teste de XML"""
+        test_cases = []
+        
+        # Procurar por elementos comuns de teste
+        test_elements = root.findall('.//testcase') + root.findall('.//test') + root.findall('.//scenario')
+        matcher = self.keyword_matcher()
+        
+        if test_elements:
+            for element in test_elements:
+                test_case = self.create_test_case_from_xml(element, matcher)
+                if test_case:
+                    test_cases.append(test_case)
+        else:
+            # Tentar extrair de qualquer estrutura XML
+            test_cases.extend(self.extract_from_xml_element(root, matcher))
+            
+        return test_cases if test_cases else self.create_fallback_cases(ET.tostring(root, encoding='unicode'))
+    
+    def extract_from_xml_element(self, element, matcher=None):
+        """Extrai casos de teste de elemento XML"""
+        matcher = matcher or self.keyword_matcher()
+        test_cases = []
+        
+        # Verificar se este elemento parece ser um caso de teste
+        test_case = self.create_test_case_from_xml(element, matcher)
+        if test_case:
+            test_cases.append(test_case)
+            
+        # Recursivamente processar filhos
+        for child in element:
+            test_cases.extend(self.extract_from_xml_element(child, matcher))
+            
+        return test_cases
+    
+    def create_test_case_from_xml(self, element, matcher=None):
+        """Cria caso de teste a partir de elemento XML.
+
+        ``matcher`` vem de quem percorre o documento, resolvido uma vez por extração.
+        """
+        test_case = {
+            'historia_requisito': element.get('requirement', element.get('story', '')),
+            'teste': element.get('name', element.get('title', element.tag)),
+            'dado': '',
+            'quando': '',
+            'entao': ''
+        }
+        
+        # Extrair texto do elemento e filhos
+        text_content = element.text.strip() if element.text else ''
+        for child in element:
+            if child.text:
+                text_content += f" {child.text}"
+                
+        if text_content:
+            # Tentar parsear como Gherkin
+            matcher = matcher or self.keyword_matcher()
+            lines = text_content.split('.')
+            for line in lines:
+                line = line.strip().lower()
+                field = matcher.step_field(line)
+                if field:
+                    test_case[field] = line
+                    
+        return test_case if any(test_case.values()) else None
+
+    def parse_test_cases(self, content):
+        """Analisa casos de teste de texto, incluindo separação de Gherkin multi-linha."""
+        return list(self.parse_test_case_stream([content]))
+
+    def parse_test_case_stream(self, chunks, parser=None):
+        """Analisa casos de teste a partir de blocos de texto (ex.: páginas), um por vez."""
+        parser = parser or self.new_parser()
+        progress = self.progress
+        if progress is None:
+            for chunk in chunks:
+                yield from parser.feed(chunk)
+        else:
+            # Em segundo plano: conta os casos e atende ao cancelamento a cada bloco
+            for chunk in chunks:
+                cases = parser.feed(chunk)
+                progress.advance(cases=len(cases))
+                yield from cases
+        yield from parser.close()
+        self.detected_languages = parser.languages
+
+    def track_cases(self, cases):
+        """Em segundo plano, conta os casos gerados e atende ao cancelamento a cada um"""
+        return cases if self.progress is None else self.progress.track(cases)
+
+    def clean_gherkin_keyword(self, text):
+        """Remove palavras-chave Gherkin e limpa espaços."""
+        return self.keyword_matcher().clean(text)
+
+    def extract_after_colon(self, text):
+        """Extrai texto após dois pontos, se existir"""
+        return extract_after_colon(text)
+    
+    def create_fallback_cases(self, content):
+        """Cria casos de teste fallback"""
+        return create_fallback_cases(content)
+    
+    def resolve_template(self, name):
+        """Retorna a chave do template a partir da chave ou do nome de exibição"""
+        if name in self.templates:
+            return name
+        for key, template in self.templates.items():
+            if template["name"] == name:
+                return key
+        raise KeyError(f"Template não encontrado: {name}")
+
+    def write_excel(self, cases, filename, template_key=None):
+        """Grava os casos em uma planilha Excel usando as colunas do template.
+
+        Usa o modo somente escrita do openpyxl: cada linha vai do store direto
+        para o arquivo, sem listas de dicionários nem DataFrame intermediários,
+        com memória constante mesmo para milhões de casos.
+        """
+        projection = self.template_projection(template_key)
+        columns = projection.columns
+        rows = projection.rows(cases)
+        
+        openpyxl = load_library('openpyxl')
+        styles = load_library('openpyxl.styles')
+        utils = load_library('openpyxl.utils')
+        workbook = openpyxl.Workbook(write_only=True)
+        sheet = workbook.create_sheet()
+        
+        # Larguras estimadas pelas primeiras linhas: no modo somente escrita elas vêm antes dos dados
+        sample = list(itertools.islice(rows, self.EXCEL_WIDTH_SAMPLE_ROWS))
+        for index, col in enumerate(columns):
+            width = max([len(str(col))] + [len(str(row[index])) for row in sample])
+            sheet.column_dimensions[utils.get_column_letter(index + 1)].width = min(width + 2, self.EXCEL_MAX_COLUMN_WIDTH)
+        sheet.freeze_panes = 'A2'
+        
+        font = styles.Font(bold=True, color="FFFFFF")
+        fill = styles.PatternFill("solid", fgColor=self.EXCEL_HEADER_COLOR)
+        alignment = styles.Alignment(horizontal="center", vertical="center", wrap_text=True)
+        header = []
+        for col in columns:
+            cell = openpyxl.cell.WriteOnlyCell(sheet, value=col)
+            cell.font = font
+            cell.fill = fill
+            cell.alignment = alignment
+            header.append(cell)
+        sheet.append(header)
+        
+        # Casos de JSON podem trazer listas e objetos: viram texto, como na exportação via DataFrame
+        for row in itertools.chain(sample, rows):
+            sheet.append([str(value) if isinstance(value, (list, dict)) else value for value in row])
+        workbook.save(filename)
+
+    def write_csv(self, cases, filename, template_key=None):
+        """Grava os casos em CSV (UTF-8 com BOM, para o Excel reconhecer os acentos), linha a linha"""
+        projection = self.template_projection(template_key)
+        with open(filename, 'w', encoding='utf-8-sig', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(projection.columns)
+            writer.writerows(projection.rows(cases))
+
+    def write_jsonl(self, cases, filename, template_key=None):
+        """Grava os casos em JSON Lines: um objeto {coluna: valor} por linha"""
+        projection = self.template_projection(template_key)
+        columns = projection.columns
+        with open(filename, 'w', encoding='utf-8') as f:
+            for row in projection.rows(cases):
+                f.write(json.dumps(dict(zip(columns, row)), ensure_ascii=False))
+                f.write("\n")
+
+    def write_parquet(self, cases, filename, template_key=None):
+        """Grava os casos em Parquet (requer pyarrow), em lotes de ``PARQUET_BATCH_ROWS`` linhas"""
+        pa = load_library('pyarrow')
+        parquet = load_library('pyarrow.parquet')
+        projection = self.template_projection(template_key)
+        schema = pa.schema([(col, pa.string()) for col in projection.columns])
+        rows = projection.rows(cases)
+        with parquet.ParquetWriter(filename, schema) as writer:
+            while True:
+                batch = list(itertools.islice(rows, self.PARQUET_BATCH_ROWS))
+                if not batch:
+                    break
+                columns = [pa.array([None if value is None else str(value) for value in column], type=pa.string())
+                           for column in zip(*batch)]
+                writer.write_table(pa.Table.from_arrays(columns, schema=schema))
+
+    def export_cases(self, cases, filename, template_key=None):
+        """Grava os casos no formato indicado pela extensão de ``filename`` (.xlsx, .csv, .jsonl, .parquet)"""
+        extension = Path(filename).suffix.lower()
+        if extension not in EXPORT_FORMATS:
+            raise UnsupportedFormatError(f"Formato de exportação não suportado: {extension or filename}")
+        getattr(self, EXPORT_FORMATS[extension]['writer'])(cases, filename, template_key)
+
+
+class VirtualTreeview:
+    """Treeview virtualizado: só as linhas visíveis existem como itens do Tk.
+
+    Mantém um conjunto fixo de itens (as linhas que cabem na janela, mais uma de
+    margem) e, ao rolar, apenas troca os valores deles, lidos da fonte de dados
+    (``row_count()`` e ``row_values(posição)``). A barra de rolagem vertical é
+    controlada aqui, proporcional ao total de linhas, e roda do mouse e teclas
+    de navegação são tratadas sem que o Treeview role por conta própria.
+    """
+
+    # Linhas extras além das visíveis (a última costuma aparecer cortada)
+    ROW_BUFFER = 1
+    # Linhas por passo da roda do mouse
+    WHEEL_ROWS = 3
+    DEFAULT_ROW_HEIGHT = 20
+
+    def __init__(self, parent, columns, row_count, row_values, height=15):
+        self.row_count = row_count
+        self.row_values = row_values
+        self.first = 0
+        self.visible_rows = height
+        # Posição (na fonte) da linha selecionada, mantida ao rolar
+        self.selected = None
+        self.items = []
+        # Quantos itens do início do conjunto estão exibidos (os demais ficam desanexados)
+        self._shown = 0
+        
+        self.tree = ttk.Treeview(parent, columns=columns, show='headings', height=height, selectmode='browse')
+        self.v_scrollbar = ttk.Scrollbar(parent, orient=tk.VERTICAL, command=self.on_scrollbar)
+        self.h_scrollbar = ttk.Scrollbar(parent, orient=tk.HORIZONTAL, command=self.tree.xview)
+        self.tree.configure(xscrollcommand=self.h_scrollbar.set)
+        self.set_columns(columns)
+        self._resize_pool(height + self.ROW_BUFFER)
+        
+        self.tree.bind('<Configure>', self.on_configure)
+        self.tree.bind('<<TreeviewSelect>>', self.on_select)
+        self.tree.bind('<MouseWheel>', self.on_mousewheel)
+        self.tree.bind('<Button-4>', lambda event: self.scroll_by(-self.WHEEL_ROWS))
+        self.tree.bind('<Button-5>', lambda event: self.scroll_by(self.WHEEL_ROWS))
+        for key, step in (('<Up>', -1), ('<Down>', 1)):
+            self.tree.bind(key, lambda event, step=step: self.move_selection(step))
+        for key, pages in (('<Prior>', -1), ('<Next>', 1)):
+            self.tree.bind(key, lambda event, pages=pages: self.move_selection(pages * self.visible_rows))
+        self.tree.bind('<Home>', lambda event: self.move_selection(-self.row_count()))
+        self.tree.bind('<End>', lambda event: self.move_selection(self.row_count()))
+
+    def grid(self, row=0, column=0):
+        self.tree.grid(row=row, column=column, sticky=(tk.W, tk.E, tk.N, tk.S))
+        self.v_scrollbar.grid(row=row, column=column + 1, sticky=(tk.N, tk.S))
+        self.h_scrollbar.grid(row=row + 1, column=column, sticky=(tk.W, tk.E))
+
+    def set_columns(self, columns, width=150):
+        """Troca as colunas no próprio widget (os itens são reaproveitados; chamar ``refresh`` depois)"""
+        self.tree.configure(columns=columns, displaycolumns='#all')
+        for col in columns:
+            self.tree.heading(col, text=col)
+            self.tree.column(col, width=width)
+        self.tree.xview_moveto(0)
+
+    def _resize_pool(self, size):
+        while len(self.items) < size:
+            item = self.tree.insert('', tk.END, values=())
+            self.tree.detach(item)
+            self.items.append(item)
+        while len(self.items) > size:
+            self.tree.delete(self.items.pop())
+        self._shown = min(self._shown, size)
+
+    def _row_height(self):
+        """(altura da linha, topo da primeira linha, se foi medida) no item exibido, ou estimada"""
+        if self._shown:
+            bbox = self.tree.bbox(self.items[0])
+            if bbox:
+                return bbox[3], bbox[1], True
+        try:
+            height = int(ttk.Style().lookup('Treeview', 'rowheight') or self.DEFAULT_ROW_HEIGHT)
+        except (tk.TclError, ValueError):
+            height = self.DEFAULT_ROW_HEIGHT
+        return height, height, False
+
+    def on_configure(self, event=None):
+        row_height, top, measured = self._row_height()
+        visible = max(1, (self.tree.winfo_height() - top) // max(1, row_height))
+        if visible != self.visible_rows:
+            self.visible_rows = visible
+            self._resize_pool(visible + self.ROW_BUFFER)
+            self.refresh()
+        if event is not None and not measured and self._shown:
+            # Altura estimada: mede de novo (uma vez) depois que as linhas forem desenhadas
+            self.tree.after_idle(self.on_configure)
+
+    def index_of(self, item):
+        """Posição na fonte da linha exibida pelo item (None se ele não estiver exibido)"""
+        if item not in self.items:
+            return None
+        offset = self.items.index(item)
+        return self.first + offset if offset < self._shown else None
+
+    def refresh(self):
+        """Relê da fonte as linhas da janela visível (depois de alterar os dados)"""
+        count = self.row_count()
+        self.first = max(0, min(self.first, count - self.visible_rows))
+        shown = max(0, min(len(self.items), count - self.first))
+        for offset in range(shown):
+            self.tree.item(self.items[offset], values=self.row_values(self.first + offset))
+        for offset in range(self._shown, shown):
+            self.tree.move(self.items[offset], '', offset)
+        if shown < self._shown:
+            self.tree.detach(*self.items[shown:self._shown])
+        self._shown = shown
+        
+        # A seleção acompanha a linha, não o item
+        if self.selected is not None and self.first <= self.selected < self.first + shown:
+            item = self.items[self.selected - self.first]
+            if self.tree.selection() != (item,):
+                self.tree.selection_set(item)
+        elif self.tree.selection():
+            self.tree.selection_remove(self.tree.selection())
+        
+        if count:
+            self.v_scrollbar.set(self.first / count, min(1.0, (self.first + self.visible_rows) / count))
+        else:
+            self.v_scrollbar.set(0.0, 1.0)
+
+    def reset(self):
+        """Volta ao início e descarta a seleção (novos dados)"""
+        self.first = 0
+        self.selected = None
+        self.refresh()
+
+    def scroll_to(self, first):
+        # Fecha editores abertos sobre as células (o FocusOut deles os destrói)
+        self.tree.focus_set()
+        self.first = first
+        self.refresh()
+
+    def scroll_by(self, rows):
+        self.scroll_to(self.first + rows)
+        return "break"
+
+    def see(self, position):
+        """Rola o mínimo necessário para a linha ``position`` ficar visível"""
+        if position < self.first:
+            self.scroll_to(position)
+        elif position >= self.first + self.visible_rows:
+            self.scroll_to(position - self.visible_rows + 1)
+        else:
+            self.refresh()
+
+    def on_scrollbar(self, action, amount, unit=None):
+        count = self.row_count()
+        if action == 'moveto':
+            self.scroll_to(int(float(amount) * count))
+        elif action == 'scroll':
+            step = self.visible_rows if unit == 'pages' else 1
+            self.scroll_by(int(amount) * step)
+
+    def on_mousewheel(self, event):
+        # Windows: múltiplos de 120 por passo; macOS: valores pequenos
+        notches = event.delta // 120 if abs(event.delta) >= 120 else (1 if event.delta > 0 else -1)
+        return self.scroll_by(-notches * self.WHEEL_ROWS)
+
+    def on_select(self, event=None):
+        selection = self.tree.selection()
+        if selection:
+            position = self.index_of(selection[0])
+            if position is not None:
+                self.selected = position
+
+    def move_selection(self, rows):
+        count = self.row_count()
+        if not count:
+            return "break"
+        current = self.first if self.selected is None else self.selected
+        self.selected = max(0, min(count - 1, current + rows))
+        self.see(self.selected)
+        return "break"
+
+
+class DocumentToExcelConverter(ConversionCore):
+    # Intervalo de verificação de alterações no documento observado
+    WATCH_INTERVAL_MS = 1000
+    # Intervalo de consulta da tarefa em segundo plano (resultado e progresso)
+    TASK_POLL_MS = 100
+    # Grupos de quase duplicados listados no relatório de qualidade
+    DUPLICATE_GROUPS_SHOWN = 10
+    SEARCH_HINT = "Ex.: login   log*   dado:usuário"
     
     def __init__(self, root):
+        super().__init__()
         self.root = root
         self.root.title("🧪 Assistente QA - Conversor de Documentos para Casos de Teste")
         self.root.geometry("1200x800")
@@ -51,10 +3637,23 @@ class DocumentToExcelConverter:
         self.center_window()
         
         self.current_file = None
-        self.extracted_data = []
-        self.preview_data = []
-        self.templates = self.load_templates()
-        self.current_template = "padrao_gherkin"
+        # Pré-visualização e extração compartilham o mesmo TestCaseStore
+        self.extracted_data = TestCaseStore()
+        self.preview_data = TestCaseStore()
+        # Métricas do preview_data mantidas a cada edição (ouvinte do store)
+        self.live_metrics = None
+        self._tracked_store = None
+        # Modo "Observar alterações": reextração incremental do arquivo atual
+        self.watcher = None
+        self._watch_job = None
+        # Tamanho e data do arquivo atual quando ele foi extraído
+        self.extracted_signature = None
+        # Extração, análise ou exportação rodando em segundo plano (uma por vez)
+        self.task = None
+        # Busca: índice invertido do preview_data (montado na primeira consulta) e
+        # índices dos casos exibidos quando há filtro (None: todos)
+        self.search_index = None
+        self.preview_filter = None
         
         self.setup_ui()
         
@@ -67,61 +3666,10 @@ class DocumentToExcelConverter:
         y = (self.root.winfo_screenheight() // 2) - (height // 2)
         self.root.geometry('{}x{}+{}+{}'.format(width, height, x, y))
         
-    def load_templates(self):
-        """Carrega templates do arquivo JSON, ou retorna o padrão se o arquivo não existir."""
-        # 1. Templates padrão (fallback)
-        default_templates = {
-            "padrao_gherkin": {
-                "name": "Padrão Gherkin",
-                "columns": ['Historia/Requisito', 'Cenário', 'Dado', 'Quando', 'Então'],
-                "mappings": {
-                    'historia_requisito': 'Historia/Requisito',
-                    'teste': 'Cenário', 
-                    'dado': 'Dado',
-                    'quando': 'Quando',
-                    'entao': 'Então'
-                }
-            },
-            "teste_detalhado": {
-                "name": "Teste Detalhado",
-                "columns": ['ID', 'Requisito', 'Cenário', 'Pré-condições', 'Passos', 'Resultado Esperado', 'Prioridade'],
-                "mappings": {
-                    'historia_requisito': 'Requisito',
-                    'teste': 'Cenário',
-                    'dado': 'Pré-condições',
-                    'quando': 'Passos',
-                    'entao': 'Resultado Esperado'
-                }
-            },
-            "simple": {
-                "name": "Simples",
-                "columns": ['Requisito', 'Descrição Teste', 'Entrada', 'Saída Esperada'],
-                "mappings": {
-                    'historia_requisito': 'Requisito',
-                    'teste': 'Descrição Teste',
-                    'dado': 'Entrada',
-                    'entao': 'Saída Esperada'
-                }
-            }
-        }
-        
-        # 2. Tenta carregar do arquivo templates.json
-        if self.TEMPLATE_FILE.exists():
-            try:
-                with open(self.TEMPLATE_FILE, 'r', encoding='utf-8') as f:
-                    saved_templates = json.load(f)
-                
-                # Mescla templates padrão com salvos (os salvos têm prioridade)
-                default_templates.update(saved_templates)
-                return default_templates
-            except Exception as e:
-                print(f"Erro ao carregar templates do arquivo JSON: {e}")
-        
-        return default_templates
-
     def save_templates(self):
         """Salva os templates personalizados em arquivo JSON."""
         default_keys = ['padrao_gherkin', 'teste_detalhado', 'simple']
+        self.invalidate_templates()
         
         # Filtra apenas templates personalizados (não os padrões)
         custom_templates = {key: template for key, template in self.templates.items() if key not in default_keys}
@@ -191,8 +3739,39 @@ class DocumentToExcelConverter:
         self.file_entry = ttk.Entry(file_frame, textvariable=self.file_path_var, state='readonly')
         self.file_entry.grid(row=0, column=1, sticky=(tk.W, tk.E), padx=(0, 10))
         
-        ttk.Button(file_frame, text="📎 Anexar Documento", 
-                  command=self.attach_document).grid(row=0, column=2)
+        ttk.Button(file_frame, text="📎 Anexar Documento", 
+                  command=self.attach_document).grid(row=0, column=2)
+        
+        self.watch_status_var = tk.StringVar()
+        ttk.Label(file_frame, textvariable=self.watch_status_var,
+                  foreground='#7f8c8d').grid(row=1, column=1, sticky=tk.W)
+        
+        # Cache de casos extraídos
+        self.use_cache_var = tk.BooleanVar(value=self.cache.enabled)
+        ttk.Checkbutton(config_frame, text="Usar cache", variable=self.use_cache_var,
+                        command=self.on_cache_toggle).grid(row=0, column=4, sticky=tk.W, padx=(10, 0))
+        
+        # Reanálise automática quando o documento é salvo
+        self.watch_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(config_frame, text="Observar alterações", variable=self.watch_var,
+                        command=self.on_watch_toggle).grid(row=0, column=5, sticky=tk.W, padx=(10, 0))
+        
+        # Exportar só o primeiro caso de cada grupo de quase duplicados
+        self.collapse_duplicates_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(config_frame, text="Agrupar duplicados",
+                        variable=self.collapse_duplicates_var).grid(row=0, column=6, sticky=tk.W, padx=(10, 0))
+        
+        # Exportar só os casos do filtro de busca da pré-visualização
+        self.export_filtered_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(config_frame, text="Exportar só filtrados",
+                        variable=self.export_filtered_var).grid(row=0, column=7, sticky=tk.W, padx=(10, 0))
+        
+        # Processos para extração de PDF
+        ttk.Label(config_frame, text="Processos (PDF):").grid(row=0, column=2, sticky=tk.W, padx=(0, 10))
+        self.pdf_workers_var = tk.IntVar(value=self.pdf_workers)
+        ttk.Spinbox(config_frame, from_=1, to=os.cpu_count() or 1, width=5,
+                    textvariable=self.pdf_workers_var,
+                    command=self.on_pdf_workers_change).grid(row=0, column=3, sticky=tk.W)
         
         # Botões de ação
         button_frame = ttk.Frame(self.main_frame)
@@ -202,57 +3781,59 @@ class DocumentToExcelConverter:
                   command=self.convert_document).grid(row=0, column=0, padx=5)
         ttk.Button(button_frame, text="👁️ Pré-visualizar", 
                   command=self.preview_conversion).grid(row=0, column=1, padx=5)
-        ttk.Button(button_frame, text="💾 Exportar Excel", 
+        ttk.Button(button_frame, text="💾 Exportar", 
                   command=self.export_to_excel).grid(row=0, column=2, padx=5)
         ttk.Button(button_frame, text="📊 Analisar Qualidade", 
                   command=self.analyze_quality).grid(row=0, column=3, padx=5)
         ttk.Button(button_frame, text="🗑️ Limpar Tudo", 
                   command=self.clear_all).grid(row=0, column=4, padx=5)
         
+        # Progresso das tarefas em segundo plano
+        progress_frame = ttk.Frame(button_frame)
+        progress_frame.grid(row=1, column=0, columnspan=5, sticky=(tk.W, tk.E), pady=(10, 0))
+        progress_frame.columnconfigure(1, weight=1)
+        self.progress_bar = ttk.Progressbar(progress_frame, length=250, mode='indeterminate')
+        self.progress_bar.grid(row=0, column=0, padx=(0, 10))
+        self.progress_var = tk.StringVar()
+        ttk.Label(progress_frame, textvariable=self.progress_var).grid(row=0, column=1, sticky=tk.W)
+        self.cancel_button = ttk.Button(progress_frame, text="✖ Cancelar", command=self.cancel_task,
+                                        state='disabled')
+        self.cancel_button.grid(row=0, column=2, padx=(10, 0))
+        
         # Frame de pré-visualização
-        preview_frame = ttk.LabelFrame(self.main_frame, text="👁️ PRÉ-VISUALIZAÇÃO", padding="10")
-        preview_frame.grid(row=3, column=0, columnspan=3, sticky=(tk.W, tk.E, tk.N, tk.S), pady=(10, 0))
-        preview_frame.columnconfigure(0, weight=1)
-        preview_frame.rowconfigure(0, weight=1)
+        self.preview_frame = ttk.LabelFrame(self.main_frame, text="👁️ PRÉ-VISUALIZAÇÃO", padding="10")
+        self.preview_frame.grid(row=3, column=0, columnspan=3, sticky=(tk.W, tk.E, tk.N, tk.S), pady=(10, 0))
+        self.preview_frame.columnconfigure(0, weight=1)
+        self.preview_frame.rowconfigure(1, weight=1)
+        
+        # Busca nos casos
+        search_frame = ttk.Frame(self.preview_frame)
+        search_frame.grid(row=0, column=0, columnspan=2, sticky=(tk.W, tk.E), pady=(0, 5))
+        search_frame.columnconfigure(1, weight=1)
+        ttk.Label(search_frame, text="🔎 Buscar:").grid(row=0, column=0, sticky=tk.W, padx=(0, 10))
+        self.search_var = tk.StringVar()
+        search_entry = ttk.Entry(search_frame, textvariable=self.search_var)
+        search_entry.grid(row=0, column=1, sticky=(tk.W, tk.E), padx=(0, 10))
+        search_entry.bind('<Return>', self.apply_search)
+        ttk.Button(search_frame, text="Filtrar", command=self.apply_search).grid(row=0, column=2, padx=5)
+        ttk.Button(search_frame, text="Limpar", command=self.clear_search).grid(row=0, column=3, padx=5)
+        self.search_status_var = tk.StringVar(value=self.SEARCH_HINT)
+        ttk.Label(search_frame, textvariable=self.search_status_var,
+                  foreground='#7f8c8d').grid(row=0, column=4, sticky=tk.W, padx=(10, 0))
         
         # Treeview
-        self.setup_preview_tree(preview_frame)
+        self.setup_preview_tree(self.preview_frame)
         
     def setup_preview_tree(self, parent_frame):
-        """Configura a treeview de pré-visualização, destruindo a existente se necessário."""
-        current_template = self.templates[self.current_template]
-        columns = current_template["columns"]
-    
-        # 1. Destruir treeview e scrollbars existentes
-        for widget in parent_frame.winfo_children():
-            if isinstance(widget, ttk.Treeview):
-                widget.destroy()
-            elif isinstance(widget, ttk.Scrollbar):
-                widget.destroy()
-    
-        # 2. Criar o novo Treeview
-        self.preview_tree = ttk.Treeview(parent_frame, columns=columns, show='headings', height=15)
-        
-        # 3. Configurar Barras de Rolagem
-        v_scrollbar = ttk.Scrollbar(parent_frame, orient=tk.VERTICAL, command=self.preview_tree.yview)
-        h_scrollbar = ttk.Scrollbar(parent_frame, orient=tk.HORIZONTAL, command=self.preview_tree.xview)
-        self.preview_tree.configure(yscrollcommand=v_scrollbar.set, xscrollcommand=h_scrollbar.set)
-
-        # 4. Configurar Cabeçalhos e Colunas
-        for col in columns:
-            self.preview_tree.heading(col, text=col)
-            self.preview_tree.column(col, width=150)
-        
-        self.preview_tree.bind('<Double-1>', self.on_double_click)
+        """Cria a treeview de pré-visualização (uma única vez; a troca de template só reconfigura as colunas)."""
+        columns = self.template_projection().columns
 
-        # 5. Posicionar o Treeview e as Barras
-        self.preview_tree.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
-        v_scrollbar.grid(row=0, column=1, sticky=(tk.N, tk.S))
-        h_scrollbar.grid(row=1, column=0, sticky=(tk.W, tk.E))
-    
-        # 6. Recarregar dados se existirem
-        if hasattr(self, 'preview_data') and self.preview_data:
-            self.update_preview_tree()
+        # Treeview virtualizado: só as linhas visíveis viram itens, lidas do preview_data
+        self.preview_grid = VirtualTreeview(parent_frame, columns, self.preview_row_count, self.preview_row,
+                                            height=15)
+        self.preview_tree = self.preview_grid.tree
+        self.preview_tree.bind('<Double-1>', self.on_double_click)
+        self.preview_grid.grid(row=1, column=0)
         
     def setup_template_tab(self):
         """Configura a aba de templates"""
@@ -302,6 +3883,9 @@ class DocumentToExcelConverter:
         metrics_frame = ttk.LabelFrame(self.quality_frame, text="📈 MÉTRICAS DE QUALIDADE", padding="10")
         metrics_frame.pack(fill='x', pady=(0, 10))
         
+        self.live_score_var = tk.StringVar(value="🎯 Score atual: -")
+        ttk.Label(metrics_frame, textvariable=self.live_score_var).pack(anchor=tk.W, pady=(0, 5))
+        
         self.metrics_text = scrolledtext.ScrolledText(metrics_frame, height=8, wrap=tk.WORD)
         self.metrics_text.pack(fill='both', expand=True)
         
@@ -312,23 +3896,108 @@ class DocumentToExcelConverter:
         self.recommendations_text = scrolledtext.ScrolledText(recommendations_frame, height=10, wrap=tk.WORD)
         self.recommendations_text.pack(fill='both', expand=True)
         
-    def on_template_change(self, event=None):
-        """Atualiza o template atual e recria o Treeview."""
-        self.current_template = self.template_var.get()
-        self.update_template_display()
+    def on_pdf_workers_change(self):
+        """Atualiza o número de processos usados na extração de PDF"""
+        try:
+            self.pdf_workers = max(1, int(self.pdf_workers_var.get()))
+        except (tk.TclError, ValueError):
+            self.pdf_workers_var.set(self.pdf_workers)
 
-        # Encontra o frame pai de pré-visualização
-        preview_frame = None
-        for widget in self.main_frame.winfo_children():
-            if isinstance(widget, ttk.LabelFrame) and "PRÉ-VISUALIZAÇÃO" in widget.cget('text'):
-                preview_frame = widget
-                break
+    def on_cache_toggle(self):
+        """Liga/desliga o uso do cache de casos extraídos"""
+        self.cache.enabled = self.use_cache_var.get()
+
+    def on_watch_toggle(self):
+        """Liga/desliga a observação do documento atual"""
+        if self.watch_var.get() and self.current_file:
+            self.start_watching()
+        else:
+            self.stop_watching()
+
+    def start_watching(self):
+        """Passa a observar o arquivo atual, reanalisando só os blocos alterados a cada gravação.
+
+        Parte dos casos já extraídos: só reextrai quando o arquivo mudar depois da extração.
+        """
+        self.stop_watching()
+        self.watcher = IncrementalExtraction(self, self.current_file, self.extracted_signature)
+        self.watch_status_var.set(f"👀 Observando {os.path.basename(self.current_file)}")
+        self._watch_job = self.root.after(self.WATCH_INTERVAL_MS, self._poll_document)
+
+    def stop_watching(self):
+        if self._watch_job is not None:
+            self.root.after_cancel(self._watch_job)
+            self._watch_job = None
+        self.watcher = None
+        self.watch_status_var.set("")
+
+    def _poll_document(self):
+        self._watch_job = None
+        if self.watcher is None:
+            return
+        # Durante uma tarefa em segundo plano o core está ocupado: verifica na próxima rodada
+        if self.task is None and self.watcher.changed():
+            self.refresh_document()
+        self._watch_job = self.root.after(self.WATCH_INTERVAL_MS, self._poll_document)
+
+    def refresh_document(self):
+        """Reextrai em segundo plano o documento observado, mantendo as edições dos casos inalterados.
+
+        ``previous`` continua editável durante a tarefa: as edições são levadas
+        para os novos casos só no fim, na thread da interface.
+        """
+        watcher = self.watcher
+        previous = self.extracted_data
+        
+        def work(progress):
+            store = watcher.extract()
+            return store, self.quality_metrics(store)
         
-        if preview_frame:
-            # Recria o Treeview com as novas colunas
-            self.setup_preview_tree(preview_frame)
+        self.run_in_background("👀 Reanalisando", work,
+                               lambda result: self.on_document_refreshed(watcher, previous, *result),
+                               on_failure=lambda status, error: self.on_refresh_failed(watcher, status, error))
+    
+    def on_refresh_failed(self, watcher, status, error):
+        if watcher is not self.watcher:
+            return
+        if status == 'cancelado':
+            # Sem isso a próxima verificação reanalisaria de novo o arquivo ainda alterado
+            self.watch_var.set(False)
+            self.stop_watching()
         else:
-            messagebox.showerror("Erro", "Não foi possível encontrar o frame de pré-visualização.")
+            # Arquivo sendo gravado ou inválido no momento: tenta de novo na próxima verificação
+            self.watch_status_var.set(f"⚠️ Falha ao reanalisar: {error}")
+    
+    def on_document_refreshed(self, watcher, previous, store, metrics):
+        if watcher is not self.watcher:
+            # Observação encerrada (ou trocada) durante a reanálise: resultado descartado
+            return
+        previewing = self.preview_data is previous and len(previous) > 0
+        self.extracted_data = store
+        if previewing:
+            self.preview_data = store
+            # Registrado antes de levar as edições: as métricas ao vivo as acompanham
+            self.track_quality(store, metrics=metrics)
+        store.carry_edits(previous)
+        if previewing:
+            self.reapply_search()
+            self.update_preview_tree()
+        
+        blocks = watcher.block_stats
+        detail = f"{blocks[0]} de {blocks[1]} blocos reanalisados" if blocks else "documento reextraído"
+        self.watch_status_var.set(f"👀 Atualizado às {datetime.now().strftime('%H:%M:%S')}: "
+                                  f"{len(store)} casos, {detail}")
+
+    def on_template_change(self, event=None):
+        """Atualiza o template atual e troca as colunas do Treeview existente.
+
+        Só as linhas visíveis são reprojetadas (projeção do template em cache),
+        então a troca não depende do número de casos.
+        """
+        self.current_template = self.template_var.get()
+        self.update_template_display()
+        self.preview_grid.set_columns(self.template_projection().columns)
+        self.preview_grid.refresh()
         
     def update_template_display(self):
         """Atualiza a exibição do template"""
@@ -413,327 +4082,149 @@ class DocumentToExcelConverter:
         
     def attach_document(self):
         """Anexa um documento para conversão"""
-        file_types = [
-            ("Todos os Formatos Suportados", "*.pdf *.txt *.docx *.doc *.json *.xml"),
-            ("PDF Files", "*.pdf"),
-            ("Text Files", "*.txt"),
-            ("Word Documents", "*.docx *.doc"),
-            ("JSON Files", "*.json"),
-            ("XML Files", "*.xml"),
-            ("All files", "*.*")
-        ]
+        file_types = [("Todos os Formatos Suportados", " ".join(f"*{ext}" for ext in supported_extensions()))]
+        for spec in EXTRACTORS:
+            patterns = " ".join(f"*{ext}" for ext in spec.extensions)
+            if (spec.description, patterns) not in file_types:
+                file_types.append((spec.description, patterns))
+        file_types.append(("All files", "*.*"))
         
         filename = filedialog.askopenfilename(filetypes=file_types)
         if filename:
-            self.current_file = filename
-            self.file_path_var.set(filename)
-            self.extracted_data = self.extract_content(filename)
-            
-    def extract_content(self, file_path):
-        """Extrai conteúdo baseado no tipo de arquivo"""
-        file_extension = Path(file_path).suffix.lower()
-        
-        try:
-            if file_extension == '.pdf':
-                return self.extract_from_pdf(file_path)
-            elif file_extension == '.txt':
-                return self.extract_from_txt(file_path)
-            elif file_extension in ['.docx', '.doc']:
-                return self.extract_from_word(file_path)
-            elif file_extension == '.json':
-                return self.extract_from_json(file_path)
-            elif file_extension == '.xml':
-                return self.extract_from_xml(file_path)
-            else:
-                messagebox.showerror("Erro", "Formato de arquivo não suportado")
-                return []
-        except Exception as e:
-            messagebox.showerror("Erro", f"Erro ao extrair conteúdo: {str(e)}")
-            return []
-    
-    def extract_from_pdf(self, file_path):
-        """Extrai texto de PDF"""
-        content = ""
-        with open(file_path, 'rb') as file:
-            pdf_reader = PyPDF2.PdfReader(file)
-            for page in pdf_reader.pages:
-                content += page.extract_text() + "\n"
-        return self.parse_test_cases(content)
-    
-    def extract_from_txt(self, file_path):
-        """Extrai texto de TXT"""
-        try:
-            with open(file_path, 'r', encoding='utf-8') as file:
-                content = file.read()
-        except UnicodeDecodeError:
-            with open(file_path, 'r', encoding='latin-1') as file:
-                content = file.read()
-        return self.parse_test_cases(content)
-    
-    def extract_from_word(self, file_path):
-        """Extrai texto de Word"""
-        doc = docx.Document(file_path)
-        content = ""
-        for paragraph in doc.paragraphs:
-            content += paragraph.text + "\n"
-        return self.parse_test_cases(content)
-    
-    def extract_from_json(self, file_path):
-        """Extrai dados de JSON"""
-        with open(file_path, 'r', encoding='utf-8') as file:
-            data = json.load(file)
-        return self.parse_json_test_cases(data)
-    
-    def extract_from_xml(self, file_path):
-        """Extrai dados de XML"""
-        tree = ET.parse(file_path)
-        root = tree.getroot()
-        return self.parse_xml_test_cases(root)
-    
-    def parse_json_test_cases(self, data):
-        """Analisa casos de teste de JSON"""
-        test_cases = []
-        
-        if isinstance(data, list):
-            for item in data:
-                test_cases.extend(self.extract_from_json_object(item))
-        elif isinstance(data, dict):
-            test_cases.extend(self.extract_from_json_object(data))
-            
-        return test_cases if test_cases else self.create_fallback_cases(str(data))
+            self.run_in_background("📄 Extraindo", lambda progress: self.extract_in_background(filename),
+                                   lambda result: self.on_extracted(filename, *result),
+                                   error_message="Erro ao extrair conteúdo")
     
-    def extract_from_json_object(self, obj, path=""):
-        """Extrai casos de teste de objeto JSON"""
-        test_cases = []
-        
-        if isinstance(obj, dict):
-            # Verificar se é um caso de teste estruturado
-            if any(key.lower() in ['test', 'testcase', 'scenario', 'cenario'] for key in obj.keys()):
-                test_case = self.create_test_case_from_json(obj)
-                if test_case:
-                    test_cases.append(test_case)
-            else:
-                for key, value in obj.items():
-                    test_cases.extend(self.extract_from_json_object(value, f"{path}.{key}" if path else key))
-                    
-        elif isinstance(obj, list):
-            for i, item in enumerate(obj):
-                test_cases.extend(self.extract_from_json_object(item, f"{path}[{i}]"))
-                
-        return test_cases
+    def extract_in_background(self, file_path):
+        """Extração e métricas iniciais, executadas na thread de trabalho (sem tocar no Tk)"""
+        # Lida antes da extração: uma gravação durante ela é percebida pelo modo observar
+        signature = IncrementalExtraction.file_signature(file_path)
+        store = self.extract_content(file_path)
+        return store, self.quality_metrics(store), signature
     
-    def create_test_case_from_json(self, obj):
-        """Cria caso de teste a partir de objeto JSON"""
-        test_case = {
-            'historia_requisito': obj.get('requirement', obj.get('story', obj.get('feature', ''))),
-            'teste': obj.get('test', obj.get('testcase', obj.get('scenario', obj.get('description', '')))),
-            'dado': obj.get('given', obj.get('precondition', obj.get('context', ''))),
-            'quando': obj.get('when', obj.get('action', obj.get('steps', ''))),
-            'entao': obj.get('then', obj.get('expected', obj.get('result', '')))
-        }
-        
-        # Se pelo menos um campo tem conteúdo, retorna o caso
-        if any(test_case.values()):
-            return test_case
-        return None
+    def on_extracted(self, file_path, store, metrics, signature):
+        self.current_file = file_path
+        self.file_path_var.set(file_path)
+        self.extracted_data = store
+        self.extracted_signature = signature
+        self.track_quality(store, metrics=metrics)
+        if self.extraction_warnings:
+            messagebox.showwarning("Aviso", "\n".join(self.extraction_warnings))
+        if self.watch_var.get():
+            self.start_watching()
     
-    def parse_xml_test_cases(self, root):
-        """Analisa casos de teste de XML"""
-        test_cases = []
+    def run_in_background(self, title, work, on_success, total=None, error_message="Erro", on_failure=None):
+        """Executa ``work(progress)`` numa thread e chama ``on_success(resultado)`` no loop do Tk.
+
+        ``on_failure(situação, erro)``, se informado, substitui a mensagem de erro e
+        também é chamado no cancelamento.
+        """
+        if self.task is not None:
+            messagebox.showwarning("Aviso", "Aguarde a tarefa em andamento ou cancele-a.")
+            return
         
-        # Procurar por elementos comuns de teste
-        test_elements = root.findall('.//testcase') + root.findall('.//test') + root.findall('.//scenario')
+        def run(progress):
+            self.progress = progress
+            try:
+                return work(progress)
+            finally:
+                self.progress = None
         
-        if test_elements:
-            for element in test_elements:
-                test_case = self.create_test_case_from_xml(element)
-                if test_case:
-                    test_cases.append(test_case)
+        self.task = BackgroundTask(run, total).start()
+        if total:
+            self.progress_bar.configure(mode='determinate', maximum=total, value=0)
         else:
-            # Tentar extrair de qualquer estrutura XML
-            test_cases.extend(self.extract_from_xml_element(root))
-            
-        return test_cases if test_cases else self.create_fallback_cases(ET.tostring(root, encoding='unicode'))
+            self.progress_bar.configure(mode='indeterminate')
+            self.progress_bar.start(10)
+        self.cancel_button.configure(state='normal')
+        self.progress_var.set(f"{title}...")
+        self.root.after(self.TASK_POLL_MS, self._poll_task, title, on_success, error_message, on_failure)
     
-    def extract_from_xml_element(self, element):
-        """Extrai casos de teste de elemento XML"""
-        test_cases = []
+    def _poll_task(self, title, on_success, error_message, on_failure=None):
+        task = self.task
+        if task is None:
+            return
+        outcome = task.poll()
+        if outcome is None:
+            self.show_task_progress(title, task.progress)
+            self.root.after(self.TASK_POLL_MS, self._poll_task, title, on_success, error_message, on_failure)
+            return
         
-        # Verificar se este elemento parece ser um caso de teste
-        test_case = self.create_test_case_from_xml(element)
-        if test_case:
-            test_cases.append(test_case)
-            
-        # Recursivamente processar filhos
-        for child in element:
-            test_cases.extend(self.extract_from_xml_element(child))
-            
-        return test_cases
+        self.task = None
+        self.progress_bar.stop()
+        self.progress_bar.configure(mode='determinate', value=0)
+        self.cancel_button.configure(state='disabled')
+        elapsed = time.perf_counter() - task.progress.started
+        status, result = outcome
+        if task.progress.cancelled:
+            # Terminou antes de perceber o cancelamento: o resultado é descartado
+            status = 'cancelado'
+        if status == 'ok':
+            self.progress_var.set(f"{title}: concluído em {elapsed:.1f}s")
+            on_success(result)
+        elif status == 'cancelado':
+            self.progress_var.set(f"{title}: cancelado")
+            if on_failure is not None:
+                on_failure(status, result)
+        else:
+            self.progress_var.set(f"{title}: falhou")
+            if on_failure is not None:
+                on_failure(status, result)
+            elif isinstance(result, UnsupportedFormatError):
+                messagebox.showerror("Erro", "Formato de arquivo não suportado")
+            else:
+                messagebox.showerror("Erro", f"{error_message}: {str(result)}")
     
-    def create_test_case_from_xml(self, element):
-        """Cria caso de teste a partir de elemento XML"""
-        test_case = {
-            'historia_requisito': element.get('requirement', element.get('story', '')),
-            'teste': element.get('name', element.get('title', element.tag)),
-            'dado': '',
-            'quando': '',
-            'entao': ''
-        }
-        
-        # Extrair texto do elemento e filhos
-        text_content = element.text.strip() if element.text else ''
-        for child in element:
-            if child.text:
-                text_content += f" {child.text}"
-                
-        if text_content:
-            # Tentar parsear como Gherkin
-            lines = text_content.split('.')
-            for line in lines:
-                line = line.strip().lower()
-                if line.startswith('dado'):
-                    test_case['dado'] = line
-                elif line.startswith('quando'):
-                    test_case['quando'] = line
-                elif line.startswith('então') or line.startswith('entao'):
-                    test_case['entao'] = line
-                    
-        return test_case if any(test_case.values()) else None
-
-    # CORREÇÃO INTEGRADA DA FUNÇÃO DE PARSING (VERSÃO FINAL)
-    def parse_test_cases(self, content):
-        """Analisa casos de teste de texto, incluindo separação de Gherkin multi-linha."""
-        test_cases = []
-        lines = content.split('\n')
-        
-        current_case = {
-            'historia_requisito': '',
-            'teste': '',
-            'dado': '',
-            'quando': '',
-            'entao': ''
-        }
-        current_gherkin_field = None 
-        case_separators = ['historia', 'requisito', 'user story', 'cenário', 'scenario', 'teste', 'feature']
-
-        for line in lines:
-            line = line.strip()
-            
-            if not line:
-                current_gherkin_field = None
-                continue
-                
-            lower_line = line.lower()
-            
-            # DETECÇÃO DE REQUISITO/FEATURE
-            is_req_or_feature = any(kw in lower_line for kw in ['historia', 'requisito', 'feature'])
-            is_scenario = any(kw in lower_line for kw in ['cenário', 'scenario', 'teste'])
-
-            if is_req_or_feature and not is_scenario:
-                if any(current_case.values()):
-                    for key in current_case: current_case[key] = current_case[key].strip()
-                    test_cases.append(current_case.copy())
-                current_case = {key: '' for key in current_case}
-                current_case['historia_requisito'] = self.extract_after_colon(line)
-                current_gherkin_field = None
-                continue
-                    
-            # DETECÇÃO DE CENÁRIO/TESTE
-            elif is_scenario:
-                if current_case['teste'] and any(current_case.values()):
-                    for key in current_case: current_case[key] = current_case[key].strip()
-                    test_cases.append(current_case.copy())
-                    current_case = {
-                        'historia_requisito': current_case['historia_requisito'],
-                        'teste': '', 'dado': '', 'quando': '', 'entao': ''
-                    }
-                    
-                current_case['teste'] = self.extract_after_colon(line)
-                current_gherkin_field = None
-                continue
-                
-            # DETECÇÃO E MUDANÇA DE ESTADO GHERKIN
-            elif lower_line.startswith('dado') or lower_line.startswith('given'):
-                current_gherkin_field = 'dado'
-                current_case['dado'] += self.clean_gherkin_keyword(line) + " "
-                continue
-                    
-            elif lower_line.startswith('quando') or lower_line.startswith('when'):
-                current_gherkin_field = 'quando'
-                current_case['quando'] += self.clean_gherkin_keyword(line) + " "
-                continue
-                    
-            elif lower_line.startswith('então') or lower_line.startswith('entao') or lower_line.startswith('then'):
-                current_gherkin_field = 'entao'
-                current_case['entao'] += self.clean_gherkin_keyword(line) + " "
-                continue
-            
-            # CONTINUAÇÃO DE TEXTO
-            elif current_gherkin_field:
-                current_case[current_gherkin_field] += line + " "
-                
-        # Adiciona o último caso
-        if any(current_case.values()):
-            for key in current_case:
-                current_case[key] = current_case[key].strip()
-            test_cases.append(current_case)
-            
-        return test_cases if test_cases else self.create_fallback_cases(content)
-
-    # CORREÇÃO INTEGRADA DA FUNÇÃO DE LIMPEZA
-    def clean_gherkin_keyword(self, text):
-        """Remove palavras-chave Gherkin e limpa espaços."""
-        keywords = ['dado que', 'dado', 'given', 'quando', 'when', 'então', 'entao', 'then', 'e', 'and']
-        
-        lower_text = text.lower()
-        
-        for keyword in keywords:
-            if lower_text.startswith(keyword):
-                # Tenta remover a palavra-chave seguida por qualquer separador comum (espaço, vírgula, dois pontos)
-                pattern = rf"^{re.escape(keyword)}[\s:,]*"
-                match = re.match(pattern, text, re.IGNORECASE)
-                
-                if match:
-                    # Retorna o texto após a correspondência
-                    return text[match.end():].strip()
-                
-        # Fallback
-        return text.strip()
-
-    def extract_after_colon(self, text):
-        """Extrai texto após dois pontos, se existir"""
-        if ':' in text:
-            return text.split(':', 1)[1].strip()
-        return text.strip()
+    def show_task_progress(self, title, progress):
+        if progress.cancelled:
+            return
+        if not progress.pages and not progress.cases:
+            self.progress_var.set(f"{title}... {time.perf_counter() - progress.started:.0f}s")
+            return
+        pages_per_second, cases_per_second = progress.rates()
+        parts = []
+        if progress.pages:
+            parts.append(f"{progress.pages} páginas ({pages_per_second:.1f}/s)")
+        parts.append(f"{progress.cases} casos ({cases_per_second:.0f}/s)")
+        if progress.total:
+            self.progress_bar.configure(maximum=progress.total, value=min(progress.cases, progress.total))
+        self.progress_var.set(f"{title}: " + ", ".join(parts))
     
-    def create_fallback_cases(self, content):
-        """Cria casos de teste fallback"""
-        test_cases = []
-        paragraphs = [p for p in content.split('\n\n') if p.strip() and len(p.strip()) > 20]
-        
-        for i, para in enumerate(paragraphs[:10]):
-            test_cases.append({
-                'historia_requisito': f"Requisito {i+1}",
-                'teste': f"Cenário {i+1}: {para[:80]}..." if len(para) > 80 else para,
-                'dado': "Contexto a ser definido",
-                'quando': "Ação a ser especificada",
-                'entao': "Resultado esperado a ser determinado"
-            })
+    def cancel_task(self):
+        """Pede à tarefa em andamento que pare no próximo ponto de verificação"""
+        if self.task is not None:
+            self.task.cancel()
+            self.progress_var.set("⏳ Cancelando...")
             
-        return test_cases
-    
     def analyze_quality(self):
         """Analisa a qualidade dos casos de teste"""
         if not self.preview_data:
             messagebox.showwarning("Aviso", "Nenhum dado para analisar. Gere uma pré-visualização primeiro.")
             return
             
-        metrics = self.calculate_metrics()
+        store = self.preview_data
+        # A análise lê uma cópia: a grade continua editável enquanto ela roda
+        snapshot = store.snapshot()
+        self.run_in_background("📊 Analisando qualidade",
+                               lambda progress: self.quality_metrics(snapshot, duplicates=True),
+                               lambda metrics: self.show_quality(store, metrics, snapshot.version),
+                               error_message="Erro ao analisar qualidade")
+        
+    def show_quality(self, store, metrics, version=None):
+        """Exibe o relatório e as recomendações das métricas calculadas em segundo plano.
+
+        ``version`` é a do store analisado: se ele foi editado (ou trocado) depois,
+        o relatório vale para o momento da análise e as métricas ao vivo, mantidas
+        pelas edições, continuam as atuais.
+        """
+        if store is self.preview_data and (version is None or store.version == version):
+            self.track_quality(store, metrics=metrics)
+        report = self.calculate_metrics(metrics)
         recommendations = self.generate_recommendations(metrics)
         
         # Atualizar aba de qualidade
         self.metrics_text.delete(1.0, tk.END)
-        self.metrics_text.insert(1.0, metrics)
+        self.metrics_text.insert(1.0, report)
         
         self.recommendations_text.delete(1.0, tk.END)
         self.recommendations_text.insert(1.0, recommendations)
@@ -741,60 +4232,79 @@ class DocumentToExcelConverter:
         # Mudar para aba de qualidade
         self.notebook.select(2)
         
-    def calculate_metrics(self):
-        """Calcula métricas de qualidade"""
-        total_cases = len(self.preview_data)
-        
-        # Análise de completude
-        complete_cases = 0
-        empty_fields = 0
-        total_fields = total_cases * 5  # 5 campos por caso
-        
-        for case in self.preview_data:
-            filled_fields = sum(1 for field in case.values() if field and field.strip())
-            if filled_fields == 5:
-                complete_cases += 1
-            empty_fields += (5 - filled_fields)
-        
-        completeness = ((total_fields - empty_fields) / total_fields * 100) if total_fields > 0 else 0
-        
-        # Análise de conteúdo
-        avg_lengths = {}
-        for field in ['historia_requisito', 'teste', 'dado', 'quando', 'entao']:
-            lengths = [len(str(case[field])) for case in self.preview_data if case[field]]
-            avg_lengths[field] = sum(lengths) / len(lengths) if lengths else 0
-        
-        # Padrões Gherkin
-        gherkin_patterns = 0
-        for case in self.preview_data:
-            if (self.contains_gherkin_keywords(case['dado']) or 
-                self.contains_gherkin_keywords(case['quando']) or 
-                self.contains_gherkin_keywords(case['entao'])):
-                gherkin_patterns += 1
+    def track_quality(self, store, duplicates=False, metrics=None):
+        """Passa a manter as métricas de ``store`` a cada edição (score sempre atual).
+
+        ``metrics`` reaproveita métricas já calculadas (em segundo plano) para o mesmo store.
+        """
+        if self._tracked_store is not None:
+            self._tracked_store.remove_listener(self.on_cases_changed)
+        self.live_metrics = metrics if metrics is not None else self.quality_metrics(store, duplicates)
+        self._tracked_store = store
+        store.add_listener(self.on_cases_changed)
+        self.update_live_score()
+        return self.live_metrics
+    
+    def on_cases_changed(self, old, new):
+        self.live_metrics.update(old, new)
+        self.update_live_score()
+    
+    def update_live_score(self):
+        metrics = self.live_metrics
+        if metrics is None or not metrics.total_cases:
+            self.live_score_var.set("🎯 Score atual: -")
+            return
+        score = self.calculate_quality_score(metrics.completeness, metrics.avg_lengths,
+                                             metrics.gherkin_cases, metrics.total_cases)
+        self.live_score_var.set(f"🎯 Score atual: {score:.1f}/100 ({metrics.total_cases} casos, "
+                                f"completude {metrics.completeness:.1f}%)")
+    
+    def calculate_metrics(self, metrics=None):
+        """Monta o relatório de qualidade a partir das métricas (calculadas se não informadas)"""
+        if metrics is None:
+            metrics = self.quality_metrics(self.preview_data)
+        total_cases = metrics.total_cases
         
         metrics_text = f"📊 RELATÓRIO DE QUALIDADE - {datetime.now().strftime('%d/%m/%Y %H:%M')}\n\n"
         metrics_text += f"📈 ESTATÍSTICAS GERAIS:\n"
         metrics_text += f"   • Total de Casos de Teste: {total_cases}\n"
-        metrics_text += f"   • Casos Completos: {complete_cases} ({complete_cases/total_cases*100:.1f}%)\n"
-        metrics_text += f"   • Completude Geral: {completeness:.1f}%\n"
-        metrics_text += f"   • Campos Vazios: {empty_fields}\n\n"
+        metrics_text += f"   • Casos Completos: {metrics.complete_cases} ({metrics.complete_cases/total_cases*100:.1f}%)\n"
+        metrics_text += f"   • Completude Geral: {metrics.completeness:.1f}%\n"
+        metrics_text += f"   • Campos Vazios: {metrics.empty_fields}\n\n"
         
         metrics_text += f"📝 ANÁLISE DE CONTEÚDO:\n"
-        for field, avg_len in avg_lengths.items():
+        for field, avg_len in metrics.avg_lengths.items():
             metrics_text += f"   • {field}: {avg_len:.1f} chars/caso\n"
-        metrics_text += f"   • Padrões Gherkin Identificados: {gherkin_patterns} casos\n\n"
+        metrics_text += f"   • Padrões Gherkin Identificados: {metrics.gherkin_cases} casos ({metrics.gherkin_rate:.1f}%)\n\n"
+        
+        metrics_text += f"📏 PREENCHIMENTO E TAMANHOS (mediana / p90 / p99):\n"
+        for field in CASE_FIELDS:
+            p50, p90, p99 = (metrics.length_percentiles[field][q] for q in QualityMetrics.PERCENTILES)
+            metrics_text += (f"   • {field}: {metrics.fill_rates[field]:.1f}% preenchido, "
+                             f"{p50:.0f} / {p90:.0f} / {p99:.0f} chars\n")
+        metrics_text += "\n"
         
-        metrics_text += f"🎯 SCORE DE QUALIDADE: {self.calculate_quality_score(completeness, avg_lengths, gherkin_patterns, total_cases)}/100"
+        if metrics.duplicate_clusters:
+            metrics_text += f"🔁 CASOS QUASE DUPLICADOS:\n"
+            metrics_text += (f"   • {len(metrics.duplicate_clusters)} grupos, "
+                             f"{metrics.redundant_cases} casos excedentes\n")
+            for group in metrics.duplicate_clusters[:self.DUPLICATE_GROUPS_SHOWN]:
+                lines = ', '.join(str(index + 1) for index in group[:10]) + (', ...' if len(group) > 10 else '')
+                title = str(self.preview_data[group[0]]['teste'])[:60]
+                metrics_text += f"   • Linhas {lines}: {title}\n"
+            if len(metrics.duplicate_clusters) > self.DUPLICATE_GROUPS_SHOWN:
+                metrics_text += f"   • ... mais {len(metrics.duplicate_clusters) - self.DUPLICATE_GROUPS_SHOWN} grupos\n"
+            metrics_text += "\n"
+        
+        score = self.calculate_quality_score(metrics.completeness, metrics.avg_lengths,
+                                             metrics.gherkin_cases, total_cases)
+        metrics_text += f"🎯 SCORE DE QUALIDADE: {score}/100"
         
         return metrics_text
     
     def contains_gherkin_keywords(self, text):
         """Verifica se contém palavras-chave Gherkin"""
-        if not text:
-            return False
-        keywords = ['dado', 'given', 'quando', 'when', 'então', 'entao', 'then', 'and', 'e']
-        text_lower = text.lower()
-        return any(keyword in text_lower for keyword in keywords)
+        return self.keyword_matcher().contains(text)
     
     def calculate_quality_score(self, completeness, avg_lengths, gherkin_patterns, total_cases):
         """Calcula score de qualidade"""
@@ -817,11 +4327,11 @@ class DocumentToExcelConverter:
         return min(score, 100)
     
     def generate_recommendations(self, metrics):
-        """Gera recomendações de melhoria"""
+        """Gera recomendações de melhoria a partir das métricas (``QualityMetrics``)"""
         recommendations = "💡 RECOMENDAÇÕES PARA MELHORIA:\n\n"
         
-        total_cases = len(self.preview_data)
-        empty_count = sum(1 for case in self.preview_data for field in case.values() if not field or not field.strip())
+        total_cases = metrics.total_cases
+        empty_count = metrics.empty_fields
         
         if empty_count > total_cases * 0.3:  # Mais de 30% vazios
             recommendations += "🔴 PRIORIDADE ALTA:\n"
@@ -829,21 +4339,21 @@ class DocumentToExcelConverter:
             recommendations += "   • Revise a extração automática do documento fonte\n\n"
         
         # Verificar casos muito curtos
-        short_cases = 0
-        for case in self.preview_data:
-            if len(str(case['teste'])) < 10:
-                short_cases += 1
+        short_cases = metrics.short_cases
                 
         if short_cases > total_cases * 0.2:  # Mais de 20% muito curtos
             recommendations += "🟡 PRIORIDADE MÉDIA:\n"
             recommendations += "   • Detalhe melhor os cenários de teste\n"
             recommendations += "   • Adicione mais contexto aos casos curtos\n\n"
         
+        # Verificar quase duplicados
+        if metrics.redundant_cases:
+            recommendations += "🔁 DUPLICADOS:\n"
+            recommendations += f"   • Revise os {metrics.redundant_cases} casos quase duplicados listados nas métricas\n"
+            recommendations += "   • Marque \"Agrupar duplicados\" para exportar um caso por grupo\n\n"
+        
         # Verificar padrões Gherkin
-        gherkin_cases = sum(1 for case in self.preview_data 
-                           if self.contains_gherkin_keywords(case['dado']) or 
-                           self.contains_gherkin_keywords(case['quando']) or 
-                           self.contains_gherkin_keywords(case['entao']))
+        gherkin_cases = metrics.gherkin_cases
         
         if gherkin_cases < total_cases * 0.5:  # Menos de 50% com Gherkin
             recommendations += "🔵 SUGESTÕES:\n"
@@ -864,32 +4374,87 @@ class DocumentToExcelConverter:
             messagebox.showwarning("Aviso", "Nenhum dado para pré-visualizar.")
             return
             
-        self.preview_data = self.extracted_data.copy()
-        self.update_preview_tree()
+        self.preview_data = self.extracted_data
+        if self._tracked_store is not self.preview_data:
+            self.track_quality(self.preview_data)
+        self.reapply_search()
+        self.preview_grid.reset()
     
     def update_preview_tree(self):
-        """Atualiza a treeview"""
-        for item in self.preview_tree.get_children():
-            self.preview_tree.delete(item)
-            
-        template = self.templates[self.current_template]
+        """Atualiza a treeview (só as linhas visíveis são relidas)"""
+        self.preview_grid.refresh()
+    
+    def preview_row_count(self):
+        if self.preview_filter is not None:
+            return len(self.preview_filter)
+        return len(self.preview_data)
+    
+    def case_index(self, position):
+        """Índice no preview_data do caso exibido na linha ``position`` (com ou sem filtro)"""
+        if self.preview_filter is not None:
+            return int(self.preview_filter[position])
+        return position
+    
+    def preview_row(self, position):
+        """Valores da linha ``position`` da pré-visualização nas colunas do template atual"""
+        return self.template_projection().row(self.preview_data[self.case_index(position)])
+    
+    def apply_search(self, event=None):
+        """Filtra a pré-visualização pela busca (o índice é montado em segundo plano na primeira vez)"""
+        query = self.search_var.get()
+        if not query.strip():
+            self.clear_search()
+            return
+        
+        store = self.preview_data
+        if self.search_index is None or self.search_index.stale(store):
+            self.search_index = None
+            self.run_in_background("🔎 Indexando casos", lambda progress: CaseSearchIndex(store, progress),
+                                   self.on_search_indexed, error_message="Erro ao indexar casos")
+            return
         
-        for case in self.preview_data:
-            values = []
-            for col in template["columns"]:
-                # Encontrar o campo correspondente
-                field_value = ""
-                for key, mapped_col in template["mappings"].items():
-                    if mapped_col == col and key in case:
-                        field_value = case[key]
-                        break
-                values.append(field_value)
-            self.preview_tree.insert('', tk.END, values=values)
+        started = time.perf_counter()
+        matches = self.search_index.search(query)
+        elapsed = (time.perf_counter() - started) * 1000
+        self.preview_filter = matches
+        if matches is None:
+            self.search_status_var.set(self.SEARCH_HINT)
+        else:
+            self.search_status_var.set(f"{len(matches)} de {len(store)} casos ({elapsed:.0f} ms)")
+        self.preview_grid.reset()
+    
+    def on_search_indexed(self, index):
+        self.search_index = index
+        # Os casos podem ter sido trocados durante a indexação: nesse caso a busca indexa de novo
+        self.apply_search()
+    
+    def clear_search(self):
+        """Remove o filtro de busca e volta a exibir todos os casos"""
+        self.search_var.set("")
+        self.search_status_var.set(self.SEARCH_HINT)
+        self.preview_filter = None
+        self.preview_grid.reset()
+    
+    def reapply_search(self):
+        """Refaz o filtro de busca depois que os casos da pré-visualização foram trocados"""
+        self.preview_filter = None
+        if self.search_var.get().strip():
+            self.apply_search()
+        else:
+            self.search_status_var.set(self.SEARCH_HINT)
     
     def on_double_click(self, event):
         """Edição em linha"""
-        item = self.preview_tree.selection()[0]
+        selection = self.preview_tree.selection()
         column = self.preview_tree.identify_column(event.x)
+        if not selection or not column:
+            return
+        item = selection[0]
+        # Fixado agora: ao rolar, o mesmo item passa a exibir outra linha
+        position = self.preview_grid.index_of(item)
+        if position is None:
+            return
+        item_index = self.case_index(position)
         column_index = int(column[1:]) - 1
         
         current_value = self.preview_tree.item(item, 'values')[column_index]
@@ -904,20 +4469,20 @@ class DocumentToExcelConverter:
         
         def save_edit(event=None):
             new_value = entry.get()
-            self.preview_tree.set(item, column=column_index, value=new_value)
             
             # Atualizar dados
-            item_index = self.preview_tree.index(item)
-            if 0 <= item_index < len(self.preview_data):
-                # Encontrar campo correspondente
-                template = self.templates[self.current_template]
-                col_name = template["columns"][column_index]
-                for key, mapped_col in template["mappings"].items():
-                    if mapped_col == col_name:
-                        self.preview_data[item_index][key] = new_value
-                        break
+            field = self.template_projection().field_of(column_index)
+            if item_index < len(self.preview_data) and field:
+                old_value = self.preview_data[item_index][field]
+                search_index = self.search_index
+                indexed = search_index is not None and not search_index.stale(self.preview_data)
+                self.preview_data.set_value(item_index, field, new_value)
+                # O caso continua no filtro atual; o índice passa a valer para as próximas buscas
+                if indexed:
+                    search_index.update(item_index, field, old_value, new_value)
                         
             entry.destroy()
+            self.preview_grid.refresh()
         
         entry.bind('<Return>', save_edit)
         entry.bind('<FocusOut>', lambda e: entry.destroy())
@@ -930,51 +4495,66 @@ class DocumentToExcelConverter:
         self.preview_conversion()
     
     def export_to_excel(self):
-        """Exporta para Excel"""
+        """Exporta os casos (Excel, CSV, JSON Lines ou Parquet, pela extensão escolhida)"""
         if not self.preview_data:
             messagebox.showwarning("Aviso", "Nenhum dado para exportar.")
             return
             
         filename = filedialog.asksaveasfilename(
             defaultextension=".xlsx",
-            filetypes=[("Excel files", "*.xlsx")],
+            filetypes=[(f"{EXPORT_FORMATS[extension]['label']} files", f"*{extension}")
+                       for extension in available_export_formats()],
             initialfile="casos_teste_exportados.xlsx"
         )
         
         if filename:
-            try:
-                template = self.templates[self.current_template]
-                
-                # Criar DataFrame
-                data_for_export = []
-                for case in self.preview_data:
-                    row = {}
-                    for col in template["columns"]:
-                        for key, mapped_col in template["mappings"].items():
-                            if mapped_col == col and key in case:
-                                row[col] = case[key]
-                                break
-                        if col not in row:
-                            row[col] = ""
-                    data_for_export.append(row)
-                
-                df = pd.DataFrame(data_for_export)
-                df.to_excel(filename, index=False)
-                
-                messagebox.showinfo("Sucesso", f"Excel exportado: {filename}")
-            except Exception as e:
-                messagebox.showerror("Erro", f"Erro ao exportar: {str(e)}")
+            cases = self.preview_data.snapshot()
+            template_key = self.current_template
+            collapse = self.collapse_duplicates_var.get()
+            selected = self.preview_filter if self.export_filtered_var.get() else None
+            self.run_in_background(
+                "💾 Exportando",
+                lambda progress: self.export_in_background(progress, cases, filename, template_key, collapse,
+                                                           selected),
+                lambda result: messagebox.showinfo("Sucesso", f"Arquivo exportado: {filename}"),
+                total=len(cases) if selected is None else len(selected), error_message="Erro ao exportar")
+    
+    def export_in_background(self, progress, cases, filename, template_key, collapse, selected=None):
+        """Exportação na thread de trabalho, num arquivo temporário que só substitui ``filename`` ao final.
+
+        Interrompida, apaga apenas o temporário: um arquivo já existente com o
+        mesmo nome fica intacto. ``selected`` restringe a exportação aos casos
+        desses índices (filtro da busca).
+        """
+        directory, name = os.path.split(os.path.abspath(filename))
+        # Mesma pasta (os.replace atômico) e mesma extensão (define o formato)
+        temp_path = os.path.join(directory, f".{name}.{uuid.uuid4().hex[:8]}{Path(name).suffix}")
+        try:
+            if selected is not None:
+                cases = [cases[index] for index in selected.tolist()]
+            if collapse:
+                cases = self.collapse_duplicates(cases)
+                progress.total = len(cases)
+            self.export_cases(progress.track(cases), temp_path, template_key)
+            os.replace(temp_path, filename)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
     
     def clear_all(self):
         """Limpa tudo"""
+        self.cancel_task()
+        self.stop_watching()
         self.current_file = None
         self.file_path_var.set("")
-        self.extracted_data = []
-        self.preview_data = []
+        self.extracted_data = TestCaseStore()
+        self.preview_data = TestCaseStore()
+        self.track_quality(self.preview_data)
+        self.search_index = None
         
-        # Limpar treeview
-        for item in self.preview_tree.get_children():
-            self.preview_tree.delete(item)
+        # Limpar busca e treeview
+        self.clear_search()
             
         # Limpar análises de qualidade
         self.metrics_text.delete(1.0, tk.END)
@@ -982,15 +4562,179 @@ class DocumentToExcelConverter:
         
         messagebox.showinfo("Limpeza", "Todos os dados foram limpos!")
 
+def convert_file(file_path, output_path, template_key, pdf_workers=1, use_cache=None, extract_tables=None,
+                 languages=None, collapse_duplicates=False):
+    """Converte um arquivo sem interface gráfica (executada nos processos do lote).
+
+    O formato de saída vem da extensão de ``output_path`` (ver ``EXPORT_FORMATS``).
+    """
+    started = time.perf_counter()
+    result = {'arquivo': str(file_path), 'saida': str(output_path), 'casos': 0, 'segundos': 0.0, 'erro': None,
+              'avisos': []}
+    try:
+        core = ConversionCore(pdf_workers=pdf_workers, use_cache=use_cache, extract_tables=extract_tables,
+                              languages=languages)
+        cases = core.extract_content(file_path)
+        result['avisos'] = core.extraction_warnings
+        if collapse_duplicates:
+            cases = core.collapse_duplicates(cases)
+        core.export_cases(cases, output_path, template_key)
+        result['casos'] = len(cases)
+    except Exception as e:
+        # Exceções sem mensagem (ex.: ValueError()) também contam como falha
+        result['erro'] = str(e) or type(e).__name__
+    result['segundos'] = round(time.perf_counter() - started, 3)
+    return result
+
+
+def collect_input_files(patterns):
+    """Expande padrões glob e diretórios em uma lista ordenada de arquivos"""
+    files = []
+    seen = set()
+    for pattern in patterns:
+        matches = glob.glob(pattern, recursive=True) or ([pattern] if Path(pattern).exists() else [])
+        for match in sorted(matches):
+            path = Path(match)
+            if path.is_dir():
+                # Em diretórios, só extensões conhecidas; arquivos indicados explicitamente são detectados pelo conteúdo
+                extensions = supported_extensions()
+                candidates = sorted(p for p in path.rglob('*') if p.is_file() and p.suffix.lower() in extensions)
+            else:
+                candidates = [path]
+            for candidate in candidates:
+                if not candidate.is_file():
+                    continue
+                key = candidate.resolve()
+                if key not in seen:
+                    seen.add(key)
+                    files.append(candidate)
+    return files
+
+
+def plan_outputs(files, output_dir, extension='.xlsx'):
+    """Define um arquivo de saída (``extension``) por entrada, sem colisões de nome"""
+    outputs = []
+    used = set()
+    for path in files:
+        name = path.stem
+        counter = 1
+        while name.lower() in used:
+            counter += 1
+            name = f"{path.stem}_{counter}"
+        used.add(name.lower())
+        outputs.append(Path(output_dir) / f"{name}{extension}")
+    return outputs
+
+
+def run_batch(patterns, template, output_dir, workers=None, summary_name="resumo_conversao.json",
+              use_cache=None, extract_tables=None, languages=None, collapse_duplicates=False,
+              output_format='xlsx'):
+    """Converte vários arquivos em paralelo e grava um resumo com tempos e contagem de casos"""
+    core = ConversionCore()
+    template_key = core.resolve_template(template)
+    files = collect_input_files(patterns)
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    outputs = plan_outputs(files, output_dir, f".{output_format}")
+    workers = max(1, min(workers or os.cpu_count() or 1, len(files) or 1))
+
+    started = time.perf_counter()
+    if workers == 1:
+        results = [convert_file(path, output, template_key, use_cache=use_cache, extract_tables=extract_tables,
+                                languages=languages, collapse_duplicates=collapse_duplicates)
+                   for path, output in zip(files, outputs)]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(convert_file, files, outputs, [template_key] * len(files),
+                                        [1] * len(files), [use_cache] * len(files),
+                                        [extract_tables] * len(files), [languages] * len(files),
+                                        [collapse_duplicates] * len(files)))
+
+    summary = {
+        'template': template_key,
+        'arquivos': len(results),
+        'falhas': sum(1 for r in results if r['erro'] is not None),
+        'casos': sum(r['casos'] for r in results),
+        'segundos': round(time.perf_counter() - started, 3),
+        'processos': workers,
+        'resultados': results,
+    }
+    with open(output_dir / summary_name, 'w', encoding='utf-8') as f:
+        json.dump(summary, f, indent=2, ensure_ascii=False)
+    return summary
+
+
+def build_arg_parser():
+    """Argumentos do modo em lote"""
+    parser = argparse.ArgumentParser(
+        description="Converte documentos em casos de teste (Excel) sem interface gráfica.")
+    parser.add_argument('entradas', nargs='+',
+                        help="Arquivos, diretórios ou padrões glob (ex.: 'specs/**/*.pdf')")
+    parser.add_argument('-t', '--template', default='padrao_gherkin',
+                        help="Chave ou nome do template (padrão: padrao_gherkin)")
+    parser.add_argument('-o', '--output-dir', default='saida',
+                        help="Diretório de saída das planilhas e do resumo")
+    parser.add_argument('-j', '--workers', type=int, default=None,
+                        help="Processos em paralelo (padrão: número de núcleos)")
+    parser.add_argument('--summary', default='resumo_conversao.json',
+                        help="Nome do arquivo de resumo gravado no diretório de saída")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="Ignora o cache de casos extraídos (sempre reprocessa os arquivos)")
+    parser.add_argument('--no-tables', action='store_true',
+                        help="Não usa o tabula para extrair tabelas de casos de teste em PDF")
+    parser.add_argument('--languages', type=lambda value: tuple(filter(None, value.lower().split(','))),
+                        default=None,
+                        help="Idiomas das palavras-chave Gherkin, ex.: pt,en,es (padrão: detecção automática)")
+    parser.add_argument('--collapse-duplicates', action='store_true',
+                        help="Exporta só o primeiro caso de cada grupo de casos quase duplicados")
+    parser.add_argument('-f', '--format', default='xlsx',
+                        choices=[extension[1:] for extension in EXPORT_FORMATS],
+                        help="Formato das saídas: xlsx, csv, jsonl ou parquet (requer pyarrow) (padrão: xlsx)")
+    return parser
+
+
+def main_cli(argv):
+    """Executa a conversão em lote e retorna o código de saída"""
+    args = build_arg_parser().parse_args(argv)
+    try:
+        summary = run_batch(args.entradas, args.template, args.output_dir, args.workers, args.summary,
+                            use_cache=False if args.no_cache else None,
+                            extract_tables=False if args.no_tables else None,
+                            languages=args.languages or None,
+                            collapse_duplicates=args.collapse_duplicates,
+                            output_format=args.format)
+    except KeyError as e:
+        print(f"Erro: {e.args[0]}", file=sys.stderr)
+        return 2
+
+    for result in summary['resultados']:
+        status = f"ERRO: {result['erro']}" if result['erro'] is not None else f"{result['casos']} casos"
+        print(f"{result['segundos']:8.2f}s  {result['arquivo']}  ->  {status}")
+        for warning in result['avisos']:
+            print(f"          aviso: {warning}", file=sys.stderr)
+    print(f"Total: {summary['arquivos']} arquivos, {summary['casos']} casos, "
+          f"{summary['falhas']} falhas em {summary['segundos']:.2f}s")
+    return 1 if summary['falhas'] or not summary['arquivos'] else 0
+
+
 def main():
     """Função principal para executar a aplicação"""
+    if len(sys.argv) > 1:
+        sys.exit(main_cli(sys.argv[1:]))
+    
     try:
+        startup = StartupTimer()
         root = tk.Tk()
+        startup.mark('tk_iniciado')
         app = DocumentToExcelConverter(root)
+        startup.mark('interface_montada')
+        startup.report_after_paint(root)
         root.mainloop()
     except Exception as e:
         print(f"Erro ao iniciar aplicação: {e}")
         messagebox.showerror("Erro", f"Falha ao iniciar aplicação: {e}")
 
 if __name__ == "__main__":
+    # Necessário para o pool de processos no executável gerado pelo PyInstaller
+    multiprocessing.freeze_support()
     main()
\ No newline at end of file
@@ -3,7 +3,8 @@ from PyInstaller.utils.hooks import collect_all
 
 datas = []
 binaries = []
-hiddenimports = []
+# Bibliotecas importadas sob demanda (importlib) não são vistas pela análise estática
+hiddenimports = ['pandas', 'openpyxl', 'PyPDF2', 'pypdf', 'tabula']
 tmp_ret = collect_all('tabula-py')
 datas += tmp_ret[0]; binaries += tmp_ret[1]; hiddenimports += tmp_ret[2]
 
@@ -0,0 +1,46 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+# O conversor é um módulo único em src/, sem pacote instalável
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+
+def build_pdf(pages):
+    """PDF mínimo com uma página por item de ``pages`` (linhas de texto em Helvetica, Latin-1)"""
+    objects = [b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    # Objetos numerados a partir de 1: fonte, (conteúdo, página) por página, árvore de páginas, catálogo
+    pages_id = 2 + 2 * len(pages)
+    kids = []
+    for text in pages:
+        lines = [line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)") for line in text.split("\n")]
+        stream = ("BT /F1 12 Tf 72 760 Td 14 TL\n" + "".join(f"({line}) Tj T*\n" for line in lines)
+                  + "ET").encode('latin-1')
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+        objects.append(b"<< /Type /Page /Parent %d 0 R /MediaBox [0 0 612 792] /Contents %d 0 R "
+                       b"/Resources << /Font << /F1 1 0 R >> >> >>" % (pages_id, len(objects)))
+        kids.append(b"%d 0 R" % len(objects))
+    objects.append(b"<< /Type /Pages /Kids [%s] /Count %d >>" % (b" ".join(kids), len(kids)))
+    objects.append(b"<< /Type /Catalog /Pages %d 0 R >>" % pages_id)
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, len(objects), xref)
+    return bytes(out)
+
+
+@pytest.fixture
+def make_pdf(tmp_path):
+    """Grava um PDF com as páginas de texto informadas e retorna o caminho"""
+    def make(pages, name="documento.pdf"):
+        path = tmp_path / name
+        path.write_bytes(build_pdf(pages))
+        return path
+    return make
@@ -0,0 +1,40 @@
+"""Conversão em lote (modo linha de comando)."""
+import json
+
+import pytest
+
+import conversor_documentos as conversor
+
+
+@pytest.fixture
+def inputs(tmp_path):
+    folder = tmp_path / "entrada"
+    folder.mkdir()
+    (folder / "login.txt").write_text("Cenário: Login\nDado usuário\nQuando entra\nEntão vê painel\n",
+                                      encoding='utf-8')
+    (folder / "busca.txt").write_text("Cenário: Busca\nDado termo\nQuando busca\nEntão vê resultados\n",
+                                      encoding='utf-8')
+    return folder
+
+
+def test_batch_converts_and_summarizes(inputs, tmp_path):
+    output = tmp_path / "saida"
+    code = conversor.main_cli([str(inputs), '-o', str(output), '-j', '1', '--no-cache', '-f', 'csv'])
+    assert code == 0
+    summary = json.loads((output / "resumo_conversao.json").read_text(encoding='utf-8'))
+    assert summary['arquivos'] == 2 and summary['casos'] == 2 and summary['falhas'] == 0
+    assert all(result['erro'] is None for result in summary['resultados'])
+    assert sorted(path.name for path in output.glob("*.csv")) == ["busca.csv", "login.csv"]
+
+
+def test_exception_without_message_counts_as_failure(inputs, tmp_path, monkeypatch):
+    def fail(self, cases, filename, template_key=None):
+        raise ValueError()
+
+    monkeypatch.setattr(conversor.ConversionCore, 'export_cases', fail)
+    output = tmp_path / "saida"
+    code = conversor.main_cli([str(inputs), '-o', str(output), '-j', '1', '--no-cache'])
+    assert code == 1
+    summary = json.loads((output / "resumo_conversao.json").read_text(encoding='utf-8'))
+    assert summary['falhas'] == 2
+    assert [result['erro'] for result in summary['resultados']] == ['ValueError', 'ValueError']
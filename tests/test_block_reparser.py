@@ -0,0 +1,79 @@
+"""BlockReparser contra uma análise completa do texto depois de cada edição."""
+import random
+
+import pytest
+
+import conversor_documentos as conversor
+
+
+LINES = ['Funcionalidade: Login', 'Requisito: R1', 'Feature: Busca', 'Cenário: A', 'Scenario: b <nome>',
+         'Esquema do Cenário: <nome> entra', 'Dado que o usuário <nome>', 'Given y', 'Quando clica', 'When z',
+         'Então vê', 'Then ok', 'E mais', 'And more', 'texto livre de continuação', '', '', 'Exemplos:',
+         'Examples:', '| nome | idade |', '| ana | 30 |', '| bruno | 41 |', 'Contexto:', 'Background:',
+         '# language: en', 'Cenário:']
+
+
+def normalized(cases):
+    result = []
+    for case in cases:
+        if isinstance(case, conversor.ScenarioOutline):
+            result.append((dict(case.template), case.examples))
+        else:
+            result.append(dict(case))
+    return result
+
+
+def full_parse(core, parser_class, text):
+    parser = core.new_parser(parser_class)
+    cases = parser.feed(text)
+    cases += parser.close(allow_fallback=False)
+    return normalized(cases)
+
+
+def edit(rng, lines):
+    position = rng.randint(0, len(lines))
+    action = rng.random()
+    if action < 0.4 or not lines:
+        lines[position:position] = [rng.choice(LINES) for _ in range(rng.randint(1, 3))]
+    elif action < 0.7:
+        del lines[min(position, len(lines) - 1)]
+    else:
+        lines[min(position, len(lines) - 1)] = rng.choice(LINES)
+
+
+def chunked(text, rng):
+    size = rng.choice([1, 13, 200, len(text) or 1])
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+@pytest.fixture
+def core():
+    return conversor.ConversionCore(use_cache=False)
+
+
+@pytest.mark.parametrize("parser_class", [conversor.TestCaseParser, conversor.FeatureFileParser])
+@pytest.mark.parametrize("seed", range(3))
+def test_edits_match_full_reparse(core, parser_class, seed):
+    rng = random.Random(seed)
+    reparser = conversor.BlockReparser(core, parser_class)
+    lines = [rng.choice(LINES) for _ in range(rng.randint(0, 80))]
+    for _ in range(60):
+        text = '\n'.join(lines) + rng.choice(['', '\n'])
+        assert normalized(reparser.parse(chunked(text, rng))) == full_parse(core, parser_class, text), text
+        edit(rng, lines)
+
+
+def test_single_edit_reparses_few_blocks(core):
+    lines = []
+    for i in range(100):
+        lines += [f"Cenário: caso {i}", f"Dado o passo {i}", "Quando executo", f"Então vejo {i}", ""]
+    reparser = conversor.BlockReparser(core)
+    reparser.parse(['\n'.join(lines)])
+    assert reparser.reparsed_blocks == reparser.total_blocks
+
+    lines[251] = "Dado o passo alterado"
+    text = '\n'.join(lines)
+    assert normalized(reparser.parse([text])) == full_parse(core, conversor.TestCaseParser, text)
+    # O bloco alterado e o seguinte, que recebe o estado do anterior
+    assert reparser.reparsed_blocks <= 2
+    assert reparser.total_blocks == 100
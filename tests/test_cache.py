@@ -0,0 +1,150 @@
+"""ParsedCaseCache: acertos, invalidação, remoção LRU e índice de hashes."""
+import json
+import os
+import threading
+
+import pytest
+
+import conversor_documentos as conversor
+
+
+GHERKIN = "Cenário: Login\nDado usuário\nQuando entra\nEntão vê painel\n"
+OUTLINE = ("Funcionalidade: Login\nEsquema do Cenário: <nome> entra\nDado <nome>\nExemplos:\n"
+           "| nome |\n| ana |\n| bruno |\n")
+
+
+@pytest.fixture
+def core(tmp_path, monkeypatch):
+    core = conversor.ConversionCore(use_cache=True)
+    core.cache = conversor.ParsedCaseCache(tmp_path / "cache", 10 ** 9)
+    calls = []
+    extract_uncached = core.extract_uncached
+    monkeypatch.setattr(core, 'extract_uncached', lambda path: calls.append(path) or extract_uncached(path))
+    core.uncached_calls = calls
+    return core
+
+
+def write(tmp_path, name, content):
+    path = tmp_path / name
+    path.write_text(content, encoding='utf-8')
+    return path
+
+
+def index_file(core):
+    return json.loads((core.cache.directory / conversor.ParsedCaseCache.INDEX_FILE).read_text(encoding='utf-8'))
+
+
+def test_unchanged_file_hits_cache(core, tmp_path):
+    path = write(tmp_path, "casos.txt", GHERKIN)
+    first = core.extract_content(path)
+    second = core.extract_content(path)
+    assert len(core.uncached_calls) == 1
+    assert [dict(case) for case in second] == [dict(case) for case in first]
+
+
+def test_scenario_outline_round_trip(core, tmp_path):
+    path = write(tmp_path, "login.feature", OUTLINE)
+    first = core.extract_content(path)
+    cached = core.extract_content(path)
+    assert len(core.uncached_calls) == 1
+    assert isinstance(next(cached.entries()), conversor.ScenarioOutline)
+    assert [case['teste'] for case in cached] == [case['teste'] for case in first] == ['ana entra', 'bruno entra']
+
+
+def test_content_change_invalidates(core, tmp_path):
+    path = write(tmp_path, "casos.txt", GHERKIN)
+    core.extract_content(path)
+    path.write_text(GHERKIN.replace("Login", "Logout"), encoding='utf-8')
+    assert core.extract_content(path)[0]['teste'] == "Logout"
+    assert len(core.uncached_calls) == 2
+
+
+def test_options_change_invalidates(core, tmp_path):
+    path = write(tmp_path, "casos.txt", GHERKIN)
+    core.extract_content(path)
+    core.languages = ('en',)
+    core.extract_content(path)
+    assert len(core.uncached_calls) == 2
+
+
+def test_template_headers_change_invalidates_csv(core, tmp_path, monkeypatch):
+    monkeypatch.setattr(conversor.ConversionCore, 'tables_available', lambda self: False)
+    path = write(tmp_path, "casos.csv", "Caso,Obs\nLogin,entra\n")
+    assert [case['teste'] for case in core.extract_content(path)] != ["Login"]
+
+    core.templates['novo'] = {"name": "Novo", "columns": ['Caso', 'Obs'],
+                              "mappings": {"teste": 'Caso', "quando": 'Obs'}}
+    core.invalidate_templates()
+    cases = core.extract_content(path)
+    assert len(core.uncached_calls) == 2
+    assert [(case['teste'], case['quando']) for case in cases] == [("Login", "entra")]
+
+
+def test_eviction_removes_least_recently_used(core, tmp_path):
+    paths = [write(tmp_path, f"casos{i}.txt", GHERKIN.replace("Login", f"Login {i}" * 50)) for i in range(4)]
+    core.extract_content(paths[0])
+    entry_size = max(path.stat().st_size for path in core.cache.directory.glob("*.json.gz"))
+    core.cache.max_bytes = entry_size * 2
+    for step, path in enumerate(paths[1:], start=1):
+        # Datas de uso distintas: a entrada mais antiga é a primeira a sair
+        for entry in core.cache.directory.glob("*.json.gz"):
+            os.utime(entry, (entry.stat().st_atime, entry.stat().st_mtime - 10))
+        core.extract_content(path)
+    assert len(list(core.cache.directory.glob("*.json.gz"))) == 2
+    # Arquivos sem entradas restantes saem do índice
+    assert sorted(os.path.basename(name) for name in index_file(core)) == ["casos2.txt", "casos3.txt"]
+
+    core.uncached_calls.clear()
+    core.extract_content(paths[3])
+    assert core.uncached_calls == []
+    core.extract_content(paths[0])
+    assert core.uncached_calls == [paths[0]]
+
+
+def test_index_avoids_rehashing_and_is_rebuilt(core, tmp_path, monkeypatch):
+    path = write(tmp_path, "casos.txt", GHERKIN)
+    core.extract_content(path)
+    assert str(path.resolve()) in index_file(core)
+
+    # Tamanho e data inalterados: o hash do índice é reaproveitado, sem reler o arquivo
+    cache = conversor.ParsedCaseCache(core.cache.directory, 10 ** 9)
+    monkeypatch.setattr(conversor.ParsedCaseCache, 'HASH_BLOCK', None)
+    key = cache.key_for(path, core.cache_options())
+    monkeypatch.undo()
+    assert cache.get(key) is not None
+
+    # Índice corrompido: recalcula o hash e o grava de novo na próxima entrada
+    (core.cache.directory / conversor.ParsedCaseCache.INDEX_FILE).write_text("{corrompido", encoding='utf-8')
+    cache = conversor.ParsedCaseCache(core.cache.directory, 10 ** 9)
+    assert cache.key_for(path, core.cache_options()) == key
+    cache.put(cache.key_for(path, "outra"), [conversor.TestCase("r", "t")])
+    assert str(path.resolve()) in index_file(core)
+
+
+def test_clear_empties_entries_and_index(core, tmp_path):
+    core.extract_content(write(tmp_path, "casos.txt", GHERKIN))
+    core.cache.clear()
+    assert list(core.cache.directory.glob("*.json.gz")) == []
+    assert index_file(core) == {}
+
+
+def test_concurrent_writes_leave_no_temporary_files(tmp_path):
+    cache = conversor.ParsedCaseCache(tmp_path / "cache", 10 ** 9)
+    cases = [conversor.TestCase(f"R{i}", "t", "d" * 200) for i in range(50)]
+    errors = []
+
+    def write_entry():
+        try:
+            for _ in range(20):
+                cache.put("mesma-chave", cases)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=write_entry) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    assert list(cache.directory.glob("*.tmp")) == []
+    assert len(cache.get("mesma-chave")) == 50
@@ -0,0 +1,105 @@
+"""Leitura direta de .docx (word/document.xml pelo zip): parágrafos e tabelas na ordem do documento."""
+import zipfile
+from xml.sax.saxutils import escape
+
+import pytest
+
+import conversor_documentos as conversor
+
+
+NAMESPACE = 'xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"'
+
+
+def paragraph(*runs):
+    """Parágrafo com um ``w:r`` por item; ``\\t`` e ``\\n`` viram ``w:tab`` e ``w:br``"""
+    xml = []
+    for run in runs:
+        parts = []
+        for index, line in enumerate(run.split('\n')):
+            if index:
+                parts.append('<w:br/>')
+            for position, piece in enumerate(line.split('\t')):
+                if position:
+                    parts.append('<w:tab/>')
+                if piece:
+                    parts.append(f'<w:t xml:space="preserve">{escape(piece)}</w:t>')
+        xml.append(f"<w:r>{''.join(parts)}</w:r>")
+    return f"<w:p><w:pPr/>{''.join(xml)}</w:p>"
+
+
+def table(*rows):
+    """Tabela com as linhas informadas; cada célula é um texto ou XML já montado (tabela aninhada)"""
+    def cell(content):
+        body = content if content.startswith('<') else ''.join(paragraph(line) for line in content.split('\n'))
+        return f"<w:tc><w:tcPr/>{body or paragraph('')}</w:tc>"
+    return "<w:tbl><w:tblPr/>" + "".join(
+        "<w:tr>" + "".join(cell(content) for content in row) + "</w:tr>" for row in rows) + "</w:tbl>"
+
+
+def write_docx(tmp_path, *blocks, name="documento.docx"):
+    path = tmp_path / name
+    document = f'<w:document {NAMESPACE}><w:body>{"".join(blocks)}<w:sectPr/></w:body></w:document>'
+    with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr('[Content_Types].xml', '<Types/>')
+        archive.writestr('word/document.xml', document)
+    return path
+
+
+@pytest.fixture
+def core():
+    return conversor.ConversionCore(use_cache=False)
+
+
+def test_paragraph_runs_tabs_and_breaks(core, tmp_path):
+    path = write_docx(tmp_path, paragraph("Cenário: ", "Login"), paragraph("Dado\tusuário\nQuando entra"),
+                      paragraph(""))
+    assert list(core.iter_docx_text(path)) == ["Cenário: Login\n", "Dado\tusuário\nQuando entra\n", "\n"]
+
+
+def test_tables_in_document_order(core, tmp_path):
+    path = write_docx(
+        tmp_path,
+        paragraph("Antes"),
+        table(["Dado", "usuário logado"], ["Quando", "", "clica"], ["a", "b", "c"], ["multi\nlinha"]),
+        paragraph("Depois"))
+    assert list(core.iter_docx_text(path)) == [
+        "Antes\n", "Dado: usuário logado\n", "Quando: clica\n", "a\n", "b\n", "c\n", "multi\nlinha\n", "\n",
+        "Depois\n"]
+
+
+def test_nested_table_stays_in_its_cell(core, tmp_path):
+    inner = table(["x", "y"])
+    path = write_docx(tmp_path, table(["Passos", paragraph("início") + inner + paragraph("fim")]))
+    assert list(core.iter_docx_text(path)) == ["Passos: início\nx: y\nfim\n", "\n"]
+
+
+def test_text_box_paragraph_joins_the_outer_one(core, tmp_path):
+    text_box = ('<w:p><w:r><w:t>Dado </w:t></w:r><w:r><w:pict><w:txbxContent><w:p><w:r><w:t>caixa</w:t>'
+                '</w:r></w:p></w:txbxContent></w:pict></w:r></w:p>')
+    path = write_docx(tmp_path, text_box)
+    assert list(core.iter_docx_text(path)) == ["Dado caixa\n"]
+
+
+def test_gherkin_in_tables_becomes_cases(core, tmp_path):
+    path = write_docx(
+        tmp_path,
+        paragraph("Cenário: Login válido"),
+        table(["Dado", "usuário cadastrado"], ["Quando", "informa a senha"], ["Então", "vê o painel"]),
+        paragraph("Cenário: Senha inválida"),
+        paragraph("Dado usuário cadastrado"), paragraph("Quando erra a senha"), paragraph("Então vê erro"))
+    cases = core.extract_from_docx(path)
+    expected = core.parse_test_cases("Cenário: Login válido\nDado: usuário cadastrado\nQuando: informa a senha\n"
+                                     "Então: vê o painel\n\nCenário: Senha inválida\nDado usuário cadastrado\n"
+                                     "Quando erra a senha\nEntão vê erro\n")
+    assert cases == expected
+    assert [case['teste'] for case in cases] == ["Login válido", "Senha inválida"]
+    assert cases[0]['entao']
+
+
+def test_large_document_streams(core, tmp_path):
+    blocks = [paragraph(f"Cenário: caso {i}") + table(["Dado", f"estado {i}"], ["Então", f"resultado {i}"])
+              for i in range(2000)]
+    path = write_docx(tmp_path, *blocks)
+    lines = core.iter_docx_text(path)
+    assert next(lines) == "Cenário: caso 0\n"
+    assert len(core.extract_from_docx(path)) == 2000
@@ -0,0 +1,165 @@
+"""Exportação dos casos: projeção do template, gravadores (.xlsx, .csv, .jsonl, .parquet) e troca atômica do arquivo."""
+import csv
+import json
+
+import pytest
+
+import conversor_documentos as conversor
+
+openpyxl = pytest.importorskip("openpyxl")
+
+
+# Valores crus do JSON: listas, objetos, números e booleanos nos campos
+JSON_CASES = [
+    {"scenario": "s1", "given": "usuário cadastrado", "when": "faz login", "then": "vê o painel"},
+    {"scenario": "s2", "steps": ["a", "b"]},
+    {"scenario": "s3", "given": {"perfil": "admin"}, "expected": 200, "requirement": True},
+]
+
+
+@pytest.fixture
+def core():
+    return conversor.ConversionCore(use_cache=False)
+
+
+@pytest.fixture
+def json_cases(core, tmp_path):
+    path = tmp_path / "casos.json"
+    path.write_text(json.dumps(JSON_CASES, ensure_ascii=False), encoding='utf-8')
+    return core.extract_content(path)
+
+
+def read_sheet(path):
+    sheet = openpyxl.load_workbook(path).active
+    return [[cell.value for cell in row] for row in sheet.iter_rows()]
+
+
+def test_excel_export_of_json_cases(core, json_cases, tmp_path):
+    output = tmp_path / "saida.xlsx"
+    core.export_cases(json_cases, output, 'padrao_gherkin')
+    rows = read_sheet(output)
+    assert rows[0] == ['Historia/Requisito', 'Cenário', 'Dado', 'Quando', 'Então']
+    assert rows[1] == [None, 's1', 'usuário cadastrado', 'faz login', 'vê o painel']
+    # Listas e objetos como texto (como o DataFrame.to_excel fazia), escalares como estão
+    assert rows[2] == [None, 's2', None, "['a', 'b']", None]
+    assert rows[3] == [True, 's3', "{'perfil': 'admin'}", None, 200]
+
+
+def test_excel_export_matches_projection(core, tmp_path):
+    cases = conversor.TestCaseStore(
+        [conversor.TestCase(f"R{i % 3}", f"Cenário {i}", "dado", "quando", "então") for i in range(500)])
+    output = tmp_path / "saida.xlsx"
+    core.export_cases(cases, output, 'simple')
+    projection = core.template_projection('simple')
+    expected = [list(projection.columns)] + [[value or None for value in row] for row in projection.rows(cases)]
+    assert read_sheet(output) == expected
+
+
+def reference_row(template, case):
+    """Cópia da busca original: para cada coluna, o primeiro campo mapeado presente no caso"""
+    values = []
+    for col in template["columns"]:
+        field_value = ""
+        for key, mapped_col in template["mappings"].items():
+            if mapped_col == col and key in case:
+                field_value = case[key]
+                break
+        values.append(field_value)
+    return values
+
+
+CASES = [conversor.TestCase(f"R{i % 3}", f"Cenário {i}", f"dado {i}", "quando", "então ção") for i in range(20)]
+
+
+def test_projection_matches_mapping_scan(core):
+    templates = dict(core.templates)
+    templates["irregular"] = {
+        "name": "Irregular",
+        "columns": ["Passos", "Vazia", "Caso", "Resultado"],
+        "mappings": {"dado": "Passos", "quando": "Passos", "teste": "Caso", "extra": "Vazia",
+                     "entao": "Resultado"},
+    }
+    for template in templates.values():
+        projection = conversor.TemplateProjection(template)
+        assert list(projection.rows(CASES)) == [reference_row(template, dict(case)) for case in CASES]
+        for index, field in enumerate(projection.fields):
+            if field:
+                assert projection.field_columns[field] == index
+                assert projection.field_of(index) == field
+
+
+def test_csv_export(core, json_cases, tmp_path):
+    output = tmp_path / "saida.csv"
+    core.export_cases(json_cases, output, 'padrao_gherkin')
+    with open(output, encoding='utf-8-sig', newline='') as f:
+        rows = list(csv.reader(f))
+    assert output.read_bytes().startswith(b'\xef\xbb\xbf')
+    projection = core.template_projection('padrao_gherkin')
+    assert rows[0] == list(projection.columns)
+    assert rows[1:] == [['' if value is None else str(value) for value in row]
+                        for row in projection.rows(json_cases)]
+    assert rows[2][3] == "['a', 'b']"
+
+
+def test_jsonl_export_keeps_json_values(core, json_cases, tmp_path):
+    output = tmp_path / "saida.jsonl"
+    core.export_cases(json_cases, output, 'padrao_gherkin')
+    lines = output.read_text(encoding='utf-8').splitlines()
+    projection = core.template_projection('padrao_gherkin')
+    assert [json.loads(line) for line in lines] == [dict(zip(projection.columns, row))
+                                                     for row in projection.rows(json_cases)]
+    assert json.loads(lines[1])['Quando'] == ['a', 'b']
+    assert 'vê o painel' in lines[0]
+
+
+def test_parquet_export(core, tmp_path, monkeypatch):
+    pytest.importorskip("pyarrow")
+    parquet = pytest.importorskip("pyarrow.parquet")
+    monkeypatch.setattr(core, 'PARQUET_BATCH_ROWS', 7)
+    output = tmp_path / "saida.parquet"
+    core.export_cases(CASES, output, 'padrao_gherkin')
+    table = parquet.read_table(output)
+    projection = core.template_projection('padrao_gherkin')
+    assert table.column_names == list(projection.columns)
+    assert [list(row.values()) for row in table.to_pylist()] == list(projection.rows(CASES))
+
+
+def test_unsupported_export_format(core, tmp_path):
+    with pytest.raises(conversor.UnsupportedFormatError):
+        core.export_cases(CASES, tmp_path / "saida.txt")
+
+
+def export_in_background(core, progress, filename, **options):
+    """``export_in_background`` da interface, que só usa métodos do core"""
+    return conversor.DocumentToExcelConverter.export_in_background(
+        core, progress, conversor.TestCaseStore(case.copy() for case in CASES), str(filename), 'padrao_gherkin',
+        options.get('collapse', False), options.get('selected'))
+
+
+def test_background_export_replaces_the_file(core, tmp_path):
+    output = tmp_path / "saida.csv"
+    output.write_text("antigo", encoding='utf-8')
+    export_in_background(core, conversor.TaskProgress(), output)
+    with open(output, encoding='utf-8-sig', newline='') as f:
+        assert len(list(csv.reader(f))) == len(CASES) + 1
+    assert [path.name for path in tmp_path.iterdir()] == ["saida.csv"]
+
+
+def test_background_export_of_selected_cases(core, tmp_path):
+    np = pytest.importorskip("numpy")
+    output = tmp_path / "saida.jsonl"
+    export_in_background(core, conversor.TaskProgress(), output, selected=np.array([3, 5]))
+    assert [json.loads(line)['Cenário'] for line in output.read_text(encoding='utf-8').splitlines()] == [
+        "Cenário 3", "Cenário 5"]
+
+
+@pytest.mark.parametrize("name", ["saida.csv", "saida.xlsx"])
+def test_cancelled_export_keeps_the_existing_file(core, tmp_path, name):
+    output = tmp_path / name
+    output.write_bytes(b"antigo")
+    progress = conversor.TaskProgress()
+    progress.cancel()
+    with pytest.raises(conversor.TaskCancelled):
+        export_in_background(core, progress, output)
+    assert output.read_bytes() == b"antigo"
+    assert [path.name for path in tmp_path.iterdir()] == [name]
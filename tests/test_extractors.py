@@ -0,0 +1,89 @@
+"""Registro de extratores: escolha pelo conteúdo e pela extensão."""
+import zipfile
+
+import pytest
+
+import conversor_documentos as conversor
+
+
+CSV_TEXT = "Cenário;Dado;Quando;Então\nLogin;usuário;entra;vê painel\n"
+FEATURE_TEXT = "# language: pt\nFuncionalidade: Login\n  Cenário: válido\n    Dado usuário\n"
+
+
+def write(tmp_path, name, content):
+    path = tmp_path / name
+    if isinstance(content, str):
+        path.write_text(content, encoding='utf-8')
+    else:
+        path.write_bytes(content)
+    return path
+
+
+def write_docx(tmp_path, name="documento.docx"):
+    path = tmp_path / name
+    with zipfile.ZipFile(path, 'w') as archive:
+        archive.writestr('[Content_Types].xml', '<Types/>')
+        archive.writestr('word/document.xml', '<w:document xmlns:w="http://schemas.openxmlformats.org/'
+                                              'wordprocessingml/2006/main"><w:body/></w:document>')
+    return path
+
+
+@pytest.mark.parametrize("name, content, expected", [
+    ("casos.json", '[{"test": "a"}]', 'json'),
+    ("casos.xml", '<?xml version="1.0"?><testsuite/>', 'xml'),
+    ("pagina.html", '<!DOCTYPE html><html><body>x</body></html>', 'html'),
+    ("login.feature", FEATURE_TEXT, 'feature'),
+    ("casos.csv", "qualquer coisa\n", 'csv'),
+    ("notas.txt", "Cenário: a\nDado b\n", 'text'),
+    ("notas.md", "# título\n", 'text'),
+])
+def test_extension_chooses_compatible_extractor(tmp_path, name, content, expected):
+    assert conversor.select_extractor(write(tmp_path, name, content)).name == expected
+
+
+@pytest.mark.parametrize("name, content, expected", [
+    # Extensão desconhecida ou ausente: só o conteúdo decide
+    ("export.dat", '{"test": "a"}', 'json'),
+    ("export", '<testsuite><testcase name="a"/></testsuite>', 'xml'),
+    ("planilha.dat", CSV_TEXT, 'csv'),
+    ("spec", FEATURE_TEXT, 'feature'),
+    ("leia", "Cenário: a\nDado b\n", 'text'),
+])
+def test_content_sniffing_without_known_extension(tmp_path, name, content, expected):
+    assert conversor.select_extractor(write(tmp_path, name, content)).name == expected
+
+
+def test_delimited_text_without_test_headers_is_not_csv(tmp_path):
+    path = write(tmp_path, "dados.dat", "nome;idade\nana;30\nbruno;41\n")
+    assert conversor.select_extractor(path).name == 'text'
+
+
+def test_binary_signatures_win_over_extension(tmp_path, make_pdf):
+    pdf = make_pdf(["Cenário: a"], name="relatorio.txt")
+    assert conversor.select_extractor(pdf).name == 'pdf'
+    docx = write_docx(tmp_path, "documento.zip")
+    assert conversor.select_extractor(docx).name == 'docx'
+
+
+def test_plain_zip_is_not_docx(tmp_path):
+    path = tmp_path / "arquivo.docx"
+    with zipfile.ZipFile(path, 'w') as archive:
+        archive.writestr('leia.txt', 'x')
+    with pytest.raises(conversor.UnsupportedFormatError):
+        conversor.select_extractor(path)
+
+
+def test_unsupported_formats(tmp_path):
+    with pytest.raises(conversor.UnsupportedFormatError, match=r"\.doc"):
+        conversor.select_extractor(write(tmp_path, "antigo.doc", conversor.OLE_SIGNATURE + b"\x00" * 100))
+    with pytest.raises(conversor.UnsupportedFormatError):
+        conversor.select_extractor(write(tmp_path, "imagem.png", b"\x89PNG\r\n\x1a\n\x00\x00"))
+
+
+def test_every_registered_extractor_is_reachable():
+    # Cada extrator é o mais barato para ao menos uma combinação de assinatura e extensão
+    for spec in conversor.EXTRACTORS:
+        rivals = [other for other in conversor.EXTRACTORS if other is not spec
+                  and other.signatures == spec.signatures and set(other.extensions) & set(spec.extensions)]
+        assert all(spec.cost <= other.cost for other in rivals), spec.name
+        assert hasattr(conversor.ConversionCore, spec.method), spec.method
@@ -0,0 +1,87 @@
+"""JsonCaseStream contra a decodificação completa com json.load."""
+import io
+import json
+import random
+
+import pytest
+
+import conversor_documentos as conversor
+
+
+def random_scalar(rng):
+    return rng.choice([
+        lambda: rng.choice(["login", "Dado que o usuário", "ação \"citada\"", "linha\nquebrada", "", "üç"])
+                * rng.randint(1, 40),
+        lambda: rng.randint(-10 ** 12, 10 ** 12),
+        lambda: rng.uniform(-1e6, 1e6),
+        lambda: rng.choice([1.5e-300, 2e300, 0.0]),
+        lambda: rng.choice([True, False, None]),
+    ])()
+
+
+def random_case(rng):
+    # A chave de teste vem primeiro (ver a limitação descrita em JsonCaseStream)
+    case = {rng.choice(conversor.JSON_TEST_KEYS): random_scalar(rng)}
+    for key in rng.sample(['given', 'when', 'then', 'requirement', 'steps', 'expected', 'extra'], rng.randint(0, 5)):
+        case[key] = random_scalar(rng) if rng.random() < 0.8 else [random_scalar(rng) for _ in range(3)]
+    return case
+
+
+def random_value(rng, depth=0):
+    roll = rng.random()
+    if depth > 3 or roll < 0.3:
+        return random_scalar(rng)
+    if roll < 0.55:
+        return random_case(rng)
+    if roll < 0.8:
+        return [random_value(rng, depth + 1) for _ in range(rng.randint(0, 6))]
+    return {f"chave{i}": random_value(rng, depth + 1) for i in range(rng.randint(0, 5))}
+
+
+def stream_cases(core, text, read_size, limit):
+    stream = conversor.JsonCaseStream(io.StringIO(text), core)
+    stream.READ_SIZE = read_size
+    stream.MATERIALIZE_LIMIT = limit
+    return [dict(case) for case in stream.iter_test_cases()]
+
+
+@pytest.fixture
+def core():
+    return conversor.ConversionCore(use_cache=False)
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_stream_matches_json_load(core, seed):
+    rng = random.Random(seed)
+    for _ in range(150):
+        document = [random_value(rng) for _ in range(rng.randint(0, 8))]
+        if rng.random() < 0.3:
+            document = {f"grupo{i}": item for i, item in enumerate(document)}
+        text = json.dumps(document, ensure_ascii=rng.random() < 0.5, indent=rng.choice([None, 0, 2]))
+        expected = [dict(case) for case in core.iter_json_object_cases(json.loads(text))]
+        # Blocos e limites pequenos forçam o percurso item a item e valores divididos entre leituras
+        for read_size, limit in ((1, 8), (7, 64), (64, 1024 * 1024)):
+            assert stream_cases(core, text, read_size, limit) == expected, (text, read_size, limit)
+
+
+def test_large_document_is_walked_item_by_item(core):
+    document = {"suite": [{"test": f"Caso {i}", "given": "x" * 50, "then": i} for i in range(200)]}
+    text = json.dumps(document)
+    expected = [dict(case) for case in core.iter_json_object_cases(document)]
+    assert stream_cases(core, text, 128, 256) == expected
+
+
+def test_extract_from_json_matches_json_load(core, tmp_path):
+    rng = random.Random(42)
+    document = [random_value(rng) for _ in range(50)]
+    path = tmp_path / "casos.json"
+    path.write_text(json.dumps(document, ensure_ascii=False), encoding='utf-8')
+    expected = [dict(case) for case in core.iter_json_object_cases(document)]
+    assert expected
+    assert [dict(case) for case in core.extract_from_json(path)] == expected
+
+
+@pytest.mark.parametrize("text", ['[1, 2', '{"test": 1', '[1] 2', '{"a" 1}', '[1,, 2]'])
+def test_invalid_json_is_rejected(core, text):
+    with pytest.raises(json.JSONDecodeError):
+        stream_cases(core, text, 2, 4)
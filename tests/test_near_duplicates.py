@@ -0,0 +1,124 @@
+"""Quase duplicados por MinHash/LSH: estimativa de Jaccard, grupos e descarte na exportação."""
+import itertools
+import json
+import random
+import re
+
+import pytest
+
+import conversor_documentos as conversor
+
+pytest.importorskip("numpy")
+
+
+WORDS = ("usuário cadastrado informa senha válida painel carrinho produto pagamento cartão boleto pedido "
+         "entrega endereço cupom desconto estoque catálogo busca filtro relatório perfil acesso").split()
+
+
+def shingles(text):
+    """Referência: trigramas de palavras (ou as palavras todas, em textos curtos)"""
+    words = tuple(re.findall(r'\w+', text.lower()))
+    size = conversor.NearDuplicateIndex.SHINGLE_SIZE
+    if len(words) < size:
+        return {words}
+    return {words[start:start + size] for start in range(len(words) - size + 1)}
+
+
+def jaccard(first, second):
+    first, second = shingles(first), shingles(second)
+    return len(first & second) / len(first | second)
+
+
+def mutate(rng, text, changes):
+    words = text.split()
+    for _ in range(changes):
+        words[rng.randrange(len(words))] = rng.choice(WORDS)
+    return ' '.join(words)
+
+
+def random_texts(rng, families, copies):
+    """Famílias de textos longos com cópias levemente alteradas, embaralhadas"""
+    texts = []
+    for _ in range(families):
+        base = ' '.join(rng.choice(WORDS) for _ in range(60))
+        texts.append(base)
+        texts.extend(mutate(rng, base, rng.randint(0, 1)) for _ in range(copies))
+    rng.shuffle(texts)
+    return texts
+
+
+def test_signatures_estimate_jaccard():
+    rng = random.Random(7)
+    texts = [' '.join(rng.choice(WORDS) for _ in range(40))]
+    texts += [mutate(rng, texts[0], changes) for changes in range(0, 20, 2)]
+    index = conversor.NearDuplicateIndex(texts)
+    errors = [abs((index.signatures[0] == index.signatures[other]).mean() - jaccard(texts[0], texts[other]))
+              for other in range(1, len(texts))]
+    assert max(errors) < 0.25
+    assert sum(errors) / len(errors) < 0.1
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_clusters_match_pairwise_comparison(seed):
+    rng = random.Random(seed)
+    texts = random_texts(rng, families=15, copies=3)
+    clusters = conversor.NearDuplicateIndex(texts).clusters()
+    group_of = {index: number for number, group in enumerate(clusters) for index in group}
+
+    for first, second in itertools.combinations(range(len(texts)), 2):
+        similarity = jaccard(texts[first], texts[second])
+        same = first in group_of and group_of.get(first) == group_of.get(second)
+        if similarity >= 0.9:
+            assert same, (first, second, similarity)
+        elif similarity < 0.3:
+            assert not same, (first, second, similarity)
+
+    # Grupos ordenados do maior para o menor, índices em ordem
+    assert [len(group) for group in clusters] == sorted((len(group) for group in clusters), reverse=True)
+    assert all(group == sorted(group) for group in clusters)
+
+
+def test_cases_without_words_and_empty_stores():
+    assert conversor.NearDuplicateIndex.from_cases(conversor.TestCaseStore()).clusters() == []
+    assert conversor.NearDuplicateIndex([]).clusters() == []
+    assert conversor.NearDuplicateIndex(["", "!!", "a"]).clusters() == []
+    index = conversor.NearDuplicateIndex(["", "Dado x", "", "Dado x"])
+    assert index.clusters() == [[1, 3]]
+    assert index.redundant_indexes() == {3}
+
+
+def test_from_cases_ignores_the_requirement():
+    cases = [
+        conversor.TestCase("Login", "Login válido", "usuário cadastrado", "informa a senha", "vê o painel"),
+        conversor.TestCase("Outro", "Login válido", "usuário cadastrado", "informa a senha", "vê o painel"),
+        conversor.TestCase("Login", "Busca", "catálogo", "procura", "vê resultados"),
+        conversor.TestCase("Login", "Login válido", "usuário cadastrado", ["informa", "a senha"], "vê o painel"),
+    ]
+    assert conversor.NearDuplicateIndex.from_cases(cases).clusters() == [[0, 1, 3]]
+
+
+def test_quality_and_collapse_on_export(tmp_path):
+    rng = random.Random(3)
+    texts = random_texts(rng, families=4, copies=2)
+    cases = [conversor.TestCase("Req", f"Caso {text[:30]}", text, "", "") for text in texts]
+    core = conversor.ConversionCore(use_cache=False)
+
+    metrics = core.quality_metrics(cases, duplicates=True)
+    expected = conversor.NearDuplicateIndex.from_cases(cases).clusters()
+    assert len(expected) == 4
+    assert metrics.duplicate_clusters == expected
+    assert metrics.redundant_cases == sum(len(group) - 1 for group in expected)
+
+    collapsed = core.collapse_duplicates(cases)
+    assert len(collapsed) == len(cases) - metrics.redundant_cases
+    assert [case['dado'] for case in collapsed] == [
+        case['dado'] for index, case in enumerate(cases)
+        if index not in {index for group in expected for index in group[1:]}]
+
+    source = tmp_path / "casos.json"
+    source.write_text(json.dumps([{'requirement': case['historia_requisito'], 'test': case['teste'],
+                                   'given': case['dado']} for case in cases], ensure_ascii=False), encoding='utf-8')
+    result = conversor.convert_file(source, tmp_path / "casos.csv", 'padrao_gherkin', use_cache=False,
+                                    collapse_duplicates=True)
+    assert result['erro'] is None
+    assert result['casos'] == len(collapsed)
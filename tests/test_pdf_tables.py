@@ -0,0 +1,102 @@
+"""Tabelas de PDF (tabula simulado): ordem dos casos, falhas e cache por página."""
+import pytest
+
+import conversor_documentos as conversor
+
+pd = pytest.importorskip("pandas")
+pytest.importorskip("PyPDF2")
+
+
+TABLE_PAGE = "ID Pré-condições Passos Resultado Esperado\n1 a b c"
+
+
+class FakeTabula:
+    """Substitui o tabula: ``tables[página]`` é uma lista de DataFrames ou uma exceção"""
+
+    def __init__(self, tables):
+        self.tables = tables
+        self.calls = []
+
+    def read_pdf(self, file_path, pages, multiple_tables, silent):
+        self.calls.append(pages)
+        result = self.tables.get(pages, [])
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+
+def table(*rows):
+    return pd.DataFrame(list(rows), columns=['Cenário', 'Dado', 'Quando', 'Então'])
+
+
+@pytest.fixture
+def tabula(monkeypatch):
+    fake = FakeTabula({})
+    load_library = conversor.load_library
+    monkeypatch.setattr(conversor, 'load_library',
+                        lambda *names: fake if names == ('tabula',) else load_library(*names))
+    monkeypatch.setattr(conversor.ConversionCore, 'tables_available', lambda self: True)
+    return fake
+
+
+@pytest.fixture
+def core(tmp_path):
+    core = conversor.ConversionCore(use_cache=False, languages=['pt'])
+    core.cache = conversor.ParsedCaseCache(tmp_path / "cache", 10 ** 9)
+    return core
+
+
+def titles(cases):
+    return [case['teste'] for case in cases]
+
+
+def test_open_text_case_comes_before_table_cases(core, tabula, make_pdf):
+    path = make_pdf(["Requisito: Login\nCenário: Texto\nDado x", TABLE_PAGE, "Cenário: Depois\nDado z"])
+    tabula.tables[2] = [table(['Tabela 1', 'a', 'b', 'c'], ['Tabela 2', 'd', 'e', 'f'])]
+    cases = core.extract_from_pdf(path, workers=1)
+    assert titles(cases) == ['Texto', 'Tabela 1', 'Tabela 2', 'Depois']
+    assert cases[0]['dado'] == 'x'
+    # O requisito aberto no texto continua valendo depois da tabela
+    assert cases[3]['historia_requisito'] == 'Login'
+
+
+def test_tabula_failure_becomes_warning(core, tabula, make_pdf):
+    path = make_pdf(["Cenário: Texto\nDado x", TABLE_PAGE])
+    tabula.tables[2] = RuntimeError("java ausente")
+    cases = core.extract_content(path)
+    assert titles(cases) == ['Texto']
+    assert core.extraction_warnings == ["Erro ao extrair tabelas da página 2: java ausente"]
+    # Resultado parcial não vai para o cache: a próxima extração tenta o tabula de novo
+    core.extract_content(path)
+    assert tabula.calls == [2, 2]
+
+
+def test_page_cache_survives_edits_to_other_pages(core, tabula, make_pdf, monkeypatch):
+    tabula.tables = {1: [table(['T1', 'a', 'b', 'c'])], 3: [table(['T3', 'a', 'b', 'c'])]}
+    path = make_pdf([TABLE_PAGE, "Cenário: Texto\nDado x", TABLE_PAGE + " 3"])
+    evictions = []
+    evict = conversor.ParsedCaseCache.evict
+    monkeypatch.setattr(conversor.ParsedCaseCache, 'evict', lambda self: evictions.append(1) or evict(self))
+
+    assert titles(core.extract_from_pdf(path, workers=1)) == ['T1', 'Texto', 'T3']
+    assert sorted(tabula.calls) == [1, 3]
+    assert len(evictions) == 1
+
+    # Outra página editada e as páginas-tabela trocadas de lugar: nenhuma chamada nova ao tabula
+    tabula.calls.clear()
+    path = make_pdf([TABLE_PAGE + " 3", "Cenário: Editado\nDado y", TABLE_PAGE], name="editado.pdf")
+    assert titles(core.extract_from_pdf(path, workers=1)) == ['T3', 'Editado', 'T1']
+    assert tabula.calls == []
+
+
+def test_page_cache_depends_on_template_headers(core, tabula, make_pdf):
+    tabula.tables = {1: [pd.DataFrame([['T1', 'a']], columns=['Caso', 'Obs'])]}
+    path = make_pdf([TABLE_PAGE])
+    # Cabeçalhos desconhecidos: a página fica com o fallback de texto
+    assert 'T1' not in titles(core.extract_from_pdf(path, workers=1))
+
+    core.templates['novo'] = {"name": "Novo", "columns": ['Caso', 'Obs'],
+                              "mappings": {"teste": 'Caso', "quando": 'Obs'}}
+    core.invalidate_templates()
+    assert titles(core.extract_from_pdf(path, workers=1)) == ['T1']
+    assert tabula.calls == [1, 1]
@@ -0,0 +1,171 @@
+"""Métricas de qualidade (passada colunar e contadores ao vivo) e o snapshot lido em segundo plano."""
+import random
+
+import pytest
+
+import conversor_documentos as conversor
+
+pytest.importorskip("numpy")
+
+
+CASES = [
+    conversor.TestCase("Login", "Login válido", "Dado usuário cadastrado", "Quando informa a senha",
+                       "Então vê o painel"),
+    conversor.TestCase("Login", "Senha inválida", "usuário cadastrado", "erra a senha", ""),
+    conversor.TestCase("Busca", "Busca", "", "", ""),
+]
+
+
+VALUES = ["", "  ", "Login", "Dado um usuário cadastrado", "quando clica", "Então vê o painel", "Given a cart",
+          "texto sem palavra-chave alguma", "resultado", "ação e reação", None, 42, ["Dado", "lista"]]
+
+
+@pytest.fixture
+def store():
+    return conversor.TestCaseStore(case.copy() for case in CASES)
+
+
+@pytest.fixture
+def core():
+    return conversor.ConversionCore(use_cache=False)
+
+
+def random_cases(rng, count):
+    return [conversor.TestCase(*(rng.choice(VALUES) for _ in conversor.CASE_FIELDS)) for _ in range(count)]
+
+
+def percentile(values, q):
+    """Percentil com interpolação linear, como ``numpy.percentile``"""
+    values = sorted(values)
+    position = (len(values) - 1) * q
+    low = int(position)
+    high = min(low + 1, len(values) - 1)
+    return values[low] + (values[high] - values[low]) * (position - low)
+
+
+def reference_metrics(cases, matcher):
+    """Referência: contadores calculados caso a caso, campo a campo"""
+    texts = [['' if value is None else str(value) for value in case.values()] for case in cases]
+    result = {'total_cases': len(texts), 'filled_counts': {}, 'present_counts': {}, 'length_sums': {},
+              'length_percentiles': {}}
+    for position, field in enumerate(conversor.CASE_FIELDS):
+        column = [values[position] for values in texts]
+        lengths = [len(value) for value in column if value]
+        result['filled_counts'][field] = sum(1 for value in column if value.strip())
+        result['present_counts'][field] = len(lengths)
+        result['length_sums'][field] = sum(lengths)
+        result['length_percentiles'][field] = {q: percentile(lengths, q) if lengths else 0
+                                               for q in conversor.QualityMetrics.PERCENTILES}
+    result['complete_cases'] = sum(1 for values in texts if all(value.strip() for value in values))
+    result['short_cases'] = sum(1 for values in texts if len(values[1]) < 10)
+    result['gherkin_cases'] = sum(1 for values in texts if any(matcher.contains(value) for value in values[2:]))
+    return result
+
+
+def counters(metrics, percentiles=True):
+    names = ['total_cases', 'filled_counts', 'present_counts', 'length_sums', 'complete_cases', 'short_cases',
+             'gherkin_cases'] + (['length_percentiles'] if percentiles else [])
+    return {name: getattr(metrics, name) for name in names}
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_columnar_metrics_match_reference(core, seed):
+    rng = random.Random(seed)
+    cases = random_cases(rng, rng.randint(1, 300))
+    metrics = core.quality_metrics(conversor.TestCaseStore(cases))
+    expected = reference_metrics(cases, core.keyword_matcher())
+    assert counters(metrics) == expected
+
+
+def test_derived_rates(core, store):
+    metrics = core.quality_metrics(store)
+    assert metrics.total_cases == 3
+    assert metrics.complete_cases == 1
+    assert metrics.empty_fields == 4
+    assert metrics.completeness == pytest.approx(1100 / 15)
+    assert metrics.fill_rates['entao'] == pytest.approx(100 / 3)
+    assert metrics.avg_lengths['historia_requisito'] == pytest.approx(len("LoginLoginBusca") / 3)
+    assert metrics.gherkin_cases == 1
+    assert metrics.gherkin_rate == pytest.approx(100 / 3)
+
+
+def test_empty_store(core):
+    metrics = core.quality_metrics(conversor.TestCaseStore())
+    assert metrics.total_cases == 0
+    assert metrics.completeness == 0.0
+    assert metrics.avg_lengths == dict.fromkeys(conversor.CASE_FIELDS, 0)
+    assert metrics.gherkin_rate == 0.0
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_live_metrics_follow_edits(core, seed):
+    rng = random.Random(seed)
+    store = conversor.TestCaseStore(random_cases(rng, 50))
+    metrics = core.quality_metrics(store)
+    store.add_listener(metrics.update)
+    for _ in range(200):
+        action = rng.random()
+        if action < 0.7:
+            store.set_value(rng.randrange(len(store)), rng.choice(conversor.CASE_FIELDS), rng.choice(VALUES))
+        elif action < 0.95:
+            store.append(random_cases(rng, 1)[0])
+        else:
+            store.clear()
+            store.extend(random_cases(rng, rng.randint(1, 5)))
+    assert counters(metrics, percentiles=False) == counters(core.quality_metrics(store), percentiles=False)
+
+
+def test_live_metrics_follow_outline_rows(core):
+    outline = conversor.ScenarioOutline(
+        conversor.TestCase("Login", "Login <perfil>", "Dado um <perfil>", "", ""),
+        [(["perfil"], [["admin"], ["leitor"], ["convidado"]])])
+    store = conversor.TestCaseStore([CASES[2].copy()])
+    metrics = core.quality_metrics(store)
+    store.add_listener(metrics.update)
+    store.append(outline)
+    store.set_value(2, 'entao', 'Então vê o painel')
+    store.set_value(2, 'dado', '')
+    assert counters(metrics, percentiles=False) == counters(core.quality_metrics(store), percentiles=False)
+
+
+def test_snapshot_ignores_later_edits(store):
+    store.set_value(1, 'entao', 'Então vê erro')
+    snapshot = store.snapshot()
+    assert snapshot.version == store.version
+
+    # Edição de um caso já editado (alterado no lugar) e de um ainda original
+    store.set_value(1, 'entao', 'Então vê outro erro')
+    store.set_value(2, 'dado', 'Dado catálogo carregado')
+    store.append(conversor.TestCase("Extra", "Novo"))
+
+    assert store.version != snapshot.version
+    assert len(snapshot) == 3
+    assert snapshot[1]['entao'] == 'Então vê erro'
+    assert snapshot[2]['dado'] == ''
+    assert store[1]['entao'] == 'Então vê outro erro'
+
+
+def test_snapshot_of_outline_rows():
+    outline = conversor.ScenarioOutline(
+        conversor.TestCase("Login", "Login <perfil>", "Dado um <perfil>", "Quando entra", "Então vê o painel"),
+        [(["perfil"], [["admin"], ["leitor"]])])
+    store = conversor.TestCaseStore([outline, CASES[2].copy()])
+    store.set_value(1, 'entao', 'Então vê o painel reduzido')
+    snapshot = store.snapshot()
+
+    store.set_value(1, 'entao', 'Então vê nada')
+    store.set_value(2, 'dado', 'Dado catálogo')
+
+    assert [case['entao'] for case in snapshot] == ['Então vê o painel', 'Então vê o painel reduzido', '']
+    assert snapshot[2]['dado'] == ''
+
+
+def test_metrics_of_snapshot_match_the_analyzed_state(store):
+    core = conversor.ConversionCore(use_cache=False)
+    snapshot = store.snapshot()
+    store.set_value(2, 'dado', 'Dado catálogo carregado')
+
+    metrics = core.quality_metrics(snapshot, duplicates=True)
+    expected = core.quality_metrics(conversor.TestCaseStore(case.copy() for case in CASES))
+    assert metrics.filled_counts == expected.filled_counts
+    assert metrics.total_cases == 3
@@ -0,0 +1,113 @@
+"""CaseSearchIndex: montagem, consultas, atualização após edição e detecção de índice desatualizado."""
+import json
+
+import pytest
+
+import conversor_documentos as conversor
+
+pytest.importorskip("numpy")
+pytest.importorskip("pandas")
+
+
+CASES = [
+    conversor.TestCase("Login", "Login válido", "usuário cadastrado", "informa a senha", "vê o painel"),
+    conversor.TestCase("Login", "Senha inválida", "usuário cadastrado", "erra a senha", "Então vê erro"),
+    conversor.TestCase("Busca", "Busca por termo", "catálogo carregado", "procura LOGOTIPO", "vê resultados"),
+    conversor.TestCase("Busca", "", "", "", ""),
+]
+
+
+def brute_force(store, query):
+    """Referência: avalia a consulta caso a caso, pelos mesmos termos do índice"""
+    index = conversor.CaseSearchIndex(conversor.TestCaseStore())
+    parsed = index.parse_query(query)
+    if not parsed:
+        return None
+    matches = []
+    for position, case in enumerate(store):
+        values = case.values()
+        if all(any(term in terms if not prefix else any(word.startswith(term) for word in terms)
+                   for terms in (conversor.CaseSearchIndex.terms(values[field]) for field in fields))
+               for fields, term, prefix in parsed):
+            matches.append(position)
+    return matches
+
+
+@pytest.fixture
+def store():
+    return conversor.TestCaseStore(case.copy() for case in CASES)
+
+
+def search(index, query):
+    found = index.search(query)
+    return None if found is None else found.tolist()
+
+
+def test_terms_ignore_case_and_accents(store):
+    index = conversor.CaseSearchIndex(store)
+    assert search(index, "LOGIN") == [0, 1]
+    assert search(index, "entao") == [1]
+    assert search(index, "catalogo") == [2]
+    assert search(index, "usuário senha") == [0, 1]
+    assert search(index, "inexistente") == []
+    assert search(index, "   ") is None
+
+
+def test_prefix_and_field_scoped_queries(store):
+    index = conversor.CaseSearchIndex(store)
+    assert search(index, "log*") == [0, 1, 2]
+    assert search(index, "teste:log*") == [0]
+    assert search(index, "cenario:senha") == [1]
+    assert search(index, "quando:senha") == [0, 1]
+    assert search(index, "requisito:busca") == [2, 3]
+    assert search(index, "given:usuario then:painel") == [0]
+
+
+@pytest.mark.parametrize("query", ["login", "log*", "dado:usuario", "vê", "busca termo", "v*", "quando:*"])
+def test_matches_brute_force(store, query):
+    assert search(conversor.CaseSearchIndex(store), query) == brute_force(store, query)
+
+
+def test_update_after_edit(store):
+    index = conversor.CaseSearchIndex(store)
+    old = store[2]['teste']
+    store.set_value(2, 'teste', 'Login por biometria')
+    assert index.stale(store)
+    index.update(2, 'teste', old, 'Login por biometria')
+    assert not index.stale(store)
+    fresh = conversor.CaseSearchIndex(store)
+    for query in ("login", "busca", "biometria", "teste:log*", "termo"):
+        assert search(index, query) == search(fresh, query), query
+    assert index.vocabulary == fresh.vocabulary
+
+
+def test_stale_after_changes(store):
+    index = conversor.CaseSearchIndex(store)
+    assert not index.stale(store)
+    assert index.stale(conversor.TestCaseStore(CASES))
+    store.append(conversor.TestCase("Novo", "Caso novo"))
+    assert index.stale(store)
+
+    index = conversor.CaseSearchIndex(store)
+    store.set_value(0, 'dado', 'outro')
+    assert index.stale(store)
+
+    index = conversor.CaseSearchIndex(store)
+    store.clear()
+    assert index.stale(store)
+
+
+def test_json_values_are_indexed_as_text(tmp_path):
+    # Valores crus do JSON (listas, objetos, números) nos campos dos casos
+    path = tmp_path / "casos.json"
+    path.write_text(json.dumps([
+        {"scenario": "s1", "steps": ["abrir", "fechar"]},
+        {"scenario": "s2", "given": {"perfil": "admin"}, "expected": 200},
+        {"scenario": "s3", "steps": "abrir"},
+    ]), encoding='utf-8')
+    store = conversor.ConversionCore(use_cache=False).extract_content(path)
+    index = conversor.CaseSearchIndex(store)
+    assert search(index, "abrir") == [0, 2]
+    assert search(index, "dado:admin") == [1]
+    assert search(index, "entao:200") == [1]
+    assert search(index, "quando:fec*") == [0]
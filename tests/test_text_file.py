@@ -0,0 +1,81 @@
+"""Leitura de TXT mapeada em memória: detecção da codificação por amostra e linhas sob demanda."""
+import pytest
+
+import conversor_documentos as conversor
+
+
+TEXT = "Cenário: Login válido\nDado usuário cadastrado\nQuando informa a senha\nEntão vê o painel ção\n"
+
+
+@pytest.fixture
+def core():
+    return conversor.ConversionCore(use_cache=False)
+
+
+def write(tmp_path, data, name="requisitos.txt"):
+    path = tmp_path / name
+    path.write_bytes(data)
+    return path
+
+
+def text_mode_lines(path, encoding):
+    """Referência: leitura em modo texto (quebras de linha universais)"""
+    with open(path, 'r', encoding=encoding) as file:
+        return list(file)
+
+
+@pytest.mark.parametrize("data, expected", [
+    (b'\xef\xbb\xbfCen\xc3\xa1rio', 'utf-8-sig'),
+    ('Cenário'.encode('utf-16'), 'utf-16'),
+    ('Cenário'.encode('utf-8'), 'utf-8'),
+    ('Cenário'.encode('latin-1'), 'latin-1'),
+    (b'ascii puro', 'utf-8'),
+    (b'', 'utf-8'),
+    # Caractere multibyte cortado no fim da amostra
+    ('abc ção'.encode('utf-8')[:-1], 'utf-8'),
+    # ... mas um byte inválido no meio não
+    (b'abc \xe7\xe3o fim', 'latin-1'),
+])
+def test_detect_text_encoding(data, expected):
+    assert conversor.detect_text_encoding(data) == expected
+
+
+@pytest.mark.parametrize("encoding", ['utf-8', 'utf-8-sig', 'latin-1', 'utf-16'])
+@pytest.mark.parametrize("newline", ['\n', '\r\n', '\r'])
+def test_lines_match_text_mode(core, tmp_path, encoding, newline):
+    path = write(tmp_path, TEXT.replace('\n', newline).encode(encoding))
+    assert list(core.iter_text_file(path)) == text_mode_lines(path, encoding) == TEXT.splitlines(keepends=True)
+
+
+def test_last_line_without_newline(core, tmp_path):
+    path = write(tmp_path, b"Dado a\nEntao b")
+    assert list(core.iter_text_file(path)) == ["Dado a\n", "Entao b"]
+
+
+def test_empty_file(core, tmp_path):
+    path = write(tmp_path, b"")
+    assert list(core.iter_text_file(path)) == []
+    assert core.extract_from_txt(path) == core.parse_test_cases("")
+
+
+def test_encoding_detected_from_the_sample_only(core, tmp_path):
+    # UTF-8 na amostra; uma linha Latin-1 depois dela é lida como Latin-1, sem reler o arquivo
+    head = ("Dado ação\n" * (conversor.SNIFF_SIZE // 10 + 1)).encode('utf-8')
+    path = write(tmp_path, head + "Então não\n".encode('latin-1') + "Quando ção\n".encode('utf-8'))
+    lines = list(core.iter_text_file(path))
+    assert lines[0] == "Dado ação\n"
+    assert lines[-2:] == ["Então não\n", "Quando ção\n"]
+
+
+def test_lines_are_lazy(core, tmp_path):
+    path = write(tmp_path, ("Cenário: caso\nDado estado\n" * 50000).encode('utf-8'))
+    lines = core.iter_text_file(path)
+    assert next(lines) == "Cenário: caso\n"
+    lines.close()
+
+
+@pytest.mark.parametrize("encoding", ['utf-8', 'latin-1', 'utf-16'])
+def test_extract_matches_whole_text_parse(core, tmp_path, encoding):
+    content = TEXT + "\nCenário: Senha inválida\nDado usuário\nEntão vê erro\n"
+    path = write(tmp_path, content.encode(encoding))
+    assert core.extract_from_txt(path) == core.parse_test_cases(content)
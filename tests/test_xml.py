@@ -0,0 +1,114 @@
+"""Extração de XML: leitura em uma passada (iterparse) contra a árvore inteira (ET.parse)."""
+import random
+import xml.etree.ElementTree as ET
+
+import pytest
+
+import conversor_documentos as conversor
+
+
+SUITE = ("<suite>"
+         + "".join(f'<testcase name="T{i}" requirement="R{i % 3}">Dado a {i}. Quando b. Então c'
+                   f"<step>extra</step></testcase>" for i in range(50))
+         + "</suite>")
+
+
+@pytest.fixture
+def core():
+    return conversor.ConversionCore(use_cache=False)
+
+
+def count_matcher_calls(core, monkeypatch):
+    calls = []
+    resolve = core.keyword_matcher
+
+    def keyword_matcher():
+        calls.append(1)
+        return resolve()
+    monkeypatch.setattr(core, "keyword_matcher", keyword_matcher)
+    return calls
+
+
+def test_matcher_resolved_once_per_extraction(core, tmp_path, monkeypatch):
+    path = tmp_path / "suite.xml"
+    path.write_text(SUITE, encoding="utf-8")
+    calls = count_matcher_calls(core, monkeypatch)
+
+    cases = core.extract_from_xml(str(path))
+    assert len(cases) == 50
+    assert cases[7] == {'historia_requisito': 'R1', 'teste': 'T7', 'dado': 'dado a 7', 'quando': 'quando b',
+                        'entao': 'então c extra'}
+    assert len(calls) == 1
+
+    del calls[:]
+    assert core.parse_xml_test_cases(ET.fromstring(SUITE)) == cases
+    assert len(calls) == 1
+
+
+def test_matcher_resolved_once_in_fallback(core, monkeypatch):
+    root = ET.fromstring("<doc><a>Dado x. Então y</a><b><c>Quando z</c></b></doc>")
+    calls = count_matcher_calls(core, monkeypatch)
+    cases = core.parse_xml_test_cases(root)
+    assert [case['teste'] for case in cases] == ['doc', 'a', 'b', 'c']
+    assert len(calls) == 1
+
+
+def random_xml(rng, test_tags):
+    """Árvore aleatória com elementos de teste, passos e texto Gherkin (ou não) entre eles"""
+    sentences = ["Dado um usuário", "Quando ele entra", "Então vê o painel", "Given a cart", "texto livre",
+                 "E outra coisa", ""]
+
+    def element(depth):
+        tag = rng.choice(test_tags + ["step", "group", "item"])
+        attributes = "".join(f' {name}="{rng.choice(["A", "B", "Login"])}"'
+                             for name in ("name", "title", "requirement", "story") if rng.random() < 0.3)
+        text = ". ".join(rng.choice(sentences) for _ in range(rng.randint(0, 3)))
+        children = "".join(element(depth + 1) for _ in range(rng.randint(0, 3) if depth < 4 else 0))
+        tail = rng.choice(["", " resto"])
+        return f"<{tag}{attributes}>{text}{children}</{tag}>{tail}"
+    return "<root>" + "".join(element(1) for _ in range(rng.randint(1, 6))) + "</root>"
+
+
+def as_counts(cases):
+    return sorted(tuple(case[field] for field in conversor.CASE_FIELDS) for case in cases)
+
+
+@pytest.mark.parametrize("seed", range(40))
+def test_iterparse_matches_tree_parse(core, tmp_path, seed):
+    rng = random.Random(seed)
+    # Sem etiquetas de teste o resultado vem do fallback, um caso por elemento em pré-ordem
+    test_tags = rng.choice([[], ["testcase"], ["testcase", "test", "scenario"]])
+    document = random_xml(rng, test_tags)
+    path = tmp_path / "suite.xml"
+    path.write_text(document, encoding="utf-8")
+
+    streamed = core.extract_from_xml(str(path))
+    expected = core.parse_xml_test_cases(ET.parse(path).getroot())
+    if not test_tags:
+        assert streamed == expected
+    else:
+        # findall agrupa por etiqueta e o iterparse segue o fechamento dos elementos
+        assert as_counts(streamed) == as_counts(expected)
+
+
+def test_iterparse_emits_in_document_order(core, tmp_path):
+    path = tmp_path / "suite.xml"
+    path.write_text('<suite><scenario name="S1"/><testcase name="T1"/><test name="X1"/>'
+                    '<group><testcase name="T2"/></group></suite>', encoding="utf-8")
+    assert [case['teste'] for case in core.extract_from_xml(str(path))] == ['S1', 'T1', 'X1', 'T2']
+
+
+def test_iterparse_releases_processed_elements(core, tmp_path, monkeypatch):
+    path = tmp_path / "suite.xml"
+    path.write_text(SUITE, encoding="utf-8")
+    seen = []
+    create = core.create_test_case_from_xml
+
+    def create_test_case_from_xml(element, matcher=None):
+        seen.append(element)
+        return create(element, matcher)
+    monkeypatch.setattr(core, "create_test_case_from_xml", create_test_case_from_xml)
+
+    assert len(core.extract_from_xml(str(path))) == 50
+    # Cada elemento de teste é esvaziado depois de virar caso
+    assert all(len(element) == 0 for element in seen)